@@ -0,0 +1,42 @@
+"""Búsqueda en grafos con estados enteros, compartida por los puntos de la Entrega 1.
+
+- grafo: Grafo en formato CSR (arreglos de inicio, destinos y costos).
+- algoritmos: A* / costo uniforme con heap de borrado perezoso, BFS, BFS
+  bidireccional e IDS con poda de ciclos.
+- heuristicas: tabla por nombre, Manhattan en grillas, euclidiana con coordenadas.
+- rutas: consultas entre cualquier par de estados (tabla de todos los pares
+  o A* con landmarks), con las tablas guardables en disco.
+- casos: Rumania, el laberinto y el metro como casos de regresión.
+- grilla: A*, JPS y BFS vectorizado en grillas de NumPy (no se importa aquí
+  para que el resto del paquete no dependa de NumPy).
+"""
+
+from .algoritmos import (
+    Resultado,
+    best_first_search,
+    bidirectional_breadth_first_search,
+    breadth_first_search,
+    iterative_deepening_search,
+    uniform_cost_search,
+)
+from .grafo import INF, Grafo
+from .heuristicas import Heuristica, euclidiana, manhattan, tabla
+from .rutas import Landmarks, Planificador, TablaRutas
+
+__all__ = [
+    "INF",
+    "Grafo",
+    "Heuristica",
+    "Landmarks",
+    "Planificador",
+    "Resultado",
+    "TablaRutas",
+    "best_first_search",
+    "bidirectional_breadth_first_search",
+    "breadth_first_search",
+    "euclidiana",
+    "iterative_deepening_search",
+    "manhattan",
+    "tabla",
+    "uniform_cost_search",
+]
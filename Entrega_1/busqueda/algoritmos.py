@@ -0,0 +1,269 @@
+from array import array
+from collections import deque
+from heapq import heappop, heappush
+from typing import Hashable, Iterable, List, Optional, Union
+
+from .grafo import INF, Grafo
+from .heuristicas import Heuristica
+
+Metas = Union[int, Iterable[int], None]
+
+
+class Resultado:
+    """Lo que deja una búsqueda: la meta alcanzada, su costo y el árbol de caminos.
+
+    g[u] es el mejor costo encontrado hasta u y padre[u] su antecesor (-1 en
+    el inicio y en los estados no alcanzados), así que el árbol sirve para
+    reconstruir el camino a cualquier estado alcanzado, no solo a la meta.
+    """
+
+    __slots__ = ("grafo", "inicio", "meta", "g", "padre", "expandidos")
+
+    def __init__(self, grafo: Grafo, inicio: int, meta: Optional[int], g: array, padre: array, expandidos: int):
+        self.grafo = grafo
+        self.inicio = inicio
+        self.meta = meta
+        self.g = g
+        self.padre = padre
+        self.expandidos = expandidos
+
+    @property
+    def costo(self) -> float:
+        return INF if self.meta is None else self.g[self.meta]
+
+    def camino(self, u: Optional[int] = None) -> List[int]:
+        """Estados del inicio a u (por defecto la meta); vacío si no se alcanzó."""
+        u = self.meta if u is None else u
+        if u is None or self.g[u] == INF:
+            return []
+        camino = []
+        while u != -1:
+            camino.append(u)
+            u = self.padre[u]
+        camino.reverse()
+        return camino
+
+    def ruta(self, u: Optional[int] = None) -> List[Hashable]:
+        """Como camino(), pero con los nombres de los estados."""
+        return [self.grafo.nombre(v) for v in self.camino(u)]
+
+
+class _Disperso(dict):
+    """g o padre con solo algunos estados; los demás valen ``defecto``."""
+
+    __slots__ = ("defecto",)
+
+    def __init__(self, defecto):
+        super().__init__()
+        self.defecto = defecto
+
+    def __missing__(self, u):
+        return self.defecto
+
+
+def _metas(meta: Metas) -> frozenset:
+    if meta is None:
+        return frozenset()
+    if isinstance(meta, int):
+        return frozenset((meta,))
+    return frozenset(meta)
+
+
+def best_first_search(grafo: Grafo, inicio: int, meta: Metas = None, h: Optional[Heuristica] = None) -> Resultado:
+    """A* (o costo uniforme con h=None) con estados enteros.
+
+    La frontera es un heap de (f, g, estado) con borrado perezoso: cuando se
+    mejora el costo de un estado se agrega otra entrada y las viejas se
+    descartan al salir (su g ya no es el mejor).  Así no hace falta
+    decrease-key y, con una heurística inconsistente, un estado mejorado se
+    vuelve a expandir.  Los costos y antecesores van en arreglos de n
+    posiciones.  A igual f sale primero el de menor g, como en Punto_1.
+
+    meta puede ser un estado, varios (se detiene en el primero que sale de
+    la frontera, que es el más barato) o None (explora todo lo alcanzable).
+    """
+    metas = _metas(meta)
+    g = array("d", [INF]) * grafo.n
+    padre = array("i", [-1]) * grafo.n
+    inicio_aristas, destinos, costos = grafo.inicio, grafo.destinos, grafo.costos
+    g[inicio] = 0.0
+    frontera = [(0.0 if h is None else h(inicio), 0.0, inicio)]
+    expandidos = 0
+    alcanzada = None
+    while frontera:
+        _, gu, u = heappop(frontera)
+        if gu > g[u]:
+            continue  # entrada vieja: u ya salió con un costo menor
+        if u in metas:
+            alcanzada = u
+            break
+        expandidos += 1
+        for k in range(inicio_aristas[u], inicio_aristas[u + 1]):
+            v = destinos[k]
+            gv = gu + costos[k]
+            if gv < g[v]:
+                g[v] = gv
+                padre[v] = u
+                heappush(frontera, (gv if h is None else gv + h(v), gv, v))
+    return Resultado(grafo, inicio, alcanzada, g, padre, expandidos)
+
+
+def uniform_cost_search(grafo: Grafo, inicio: int, meta: Metas = None) -> Resultado:
+    """Dijkstra: best_first_search sin heurística."""
+    return best_first_search(grafo, inicio, meta)
+
+
+def breadth_first_search(grafo: Grafo, inicio: int, meta: Metas = None) -> Resultado:
+    """Menor número de aristas (ignora los costos); g cuenta los pasos.
+
+    Un estado se marca al entrar a la frontera, así que cada uno entra una
+    sola vez y la prueba de pertenencia es O(1).
+    """
+    metas = _metas(meta)
+    g = array("d", [INF]) * grafo.n
+    padre = array("i", [-1]) * grafo.n
+    inicio_aristas, destinos = grafo.inicio, grafo.destinos
+    g[inicio] = 0.0
+    if inicio in metas:
+        return Resultado(grafo, inicio, inicio, g, padre, 0)
+    frontera = deque([inicio])
+    expandidos = 0
+    while frontera:
+        u = frontera.popleft()
+        expandidos += 1
+        pasos = g[u] + 1
+        for k in range(inicio_aristas[u], inicio_aristas[u + 1]):
+            v = destinos[k]
+            if g[v] == INF:
+                g[v] = pasos
+                padre[v] = u
+                if v in metas:
+                    return Resultado(grafo, inicio, v, g, padre, expandidos)
+                frontera.append(v)
+    return Resultado(grafo, inicio, None, g, padre, expandidos)
+
+
+def bidirectional_breadth_first_search(
+    grafo: Grafo, inicio: int, meta: int, inverso: Optional[Grafo] = None
+) -> Resultado:
+    """BFS desde el inicio y desde la meta a la vez, hasta que se encuentran.
+
+    Cada vuelta expande un nivel completo del lado con la frontera más
+    chica; al terminar el nivel en que los dos lados se tocan se elige el
+    cruce con menos pasos, así que el camino es el más corto.  Con b vecinos
+    por estado y la meta a d pasos explora del orden de 2·b^(d/2) estados en
+    vez de b^d.  inverso es el grafo con las aristas al revés; None sirve
+    para grafos no dirigidos (como el metro), donde es el mismo grafo.
+    """
+    inverso = grafo if inverso is None else inverso
+    g = array("d", [INF]) * grafo.n
+    padre = array("i", [-1]) * grafo.n
+    g_meta = array("d", [INF]) * grafo.n
+    siguiente = array("i", [-1]) * grafo.n  # hacia la meta
+    g[inicio] = 0.0
+    g_meta[meta] = 0.0
+    if inicio == meta:
+        return Resultado(grafo, inicio, meta, g, padre, 0)
+    lados = (
+        (grafo, g, padre, g_meta),  # hacia adelante: aristas u -> v
+        (inverso, g_meta, siguiente, g),  # desde la meta: aristas v -> u al revés
+    )
+    fronteras = [[inicio], [meta]]
+    expandidos = 0
+    while fronteras[0] and fronteras[1]:
+        lado = 0 if len(fronteras[0]) <= len(fronteras[1]) else 1
+        red, propio, antecesor, otro = lados[lado]
+        inicio_aristas, destinos = red.inicio, red.destinos
+        mejor, cruce = INF, None
+        nuevo = []
+        for u in fronteras[lado]:
+            expandidos += 1
+            pasos = propio[u] + 1
+            for k in range(inicio_aristas[u], inicio_aristas[u + 1]):
+                v = destinos[k]
+                if otro[v] != INF and pasos + otro[v] < mejor:
+                    mejor, cruce = pasos + otro[v], (u, v)
+                if propio[v] == INF:
+                    propio[v] = pasos
+                    antecesor[v] = u
+                    nuevo.append(v)
+        fronteras[lado] = nuevo
+        if cruce is not None:
+            u, v = cruce if lado == 0 else cruce[::-1]
+            # Une las dos mitades en g/padre: del inicio a u y de v a la meta
+            padre[v] = u
+            g[v] = g[u] + 1
+            while v != meta:
+                w = siguiente[v]
+                padre[w] = v
+                g[w] = g[v] + 1
+                v = w
+            return Resultado(grafo, inicio, meta, g, padre, expandidos)
+    return Resultado(grafo, inicio, None, g, padre, expandidos)
+
+
+def iterative_deepening_search(
+    grafo: Grafo, inicio: int, meta: Metas, limite: Optional[int] = None
+) -> Resultado:
+    """Búsqueda en profundidad limitada con límites 0, 1, 2... (hasta limite).
+
+    Solo guarda el camino actual: una pila de estados y, por cada uno, la
+    próxima arista que falta probar.  No hay conjunto de visitados (es lo
+    que ahorra memoria), pero un vecino que ya está en el camino se poda,
+    así que no hay ciclos y cada rama es un camino simple.  Si en una vuelta
+    ninguna rama llega al límite ya se exploró todo y no hay solución.
+    Devuelve el camino de menos pasos; g cuenta pasos.  La memoria es
+    proporcional a la profundidad: el camino actual se marca en un set y g y
+    padre del resultado solo tienen los estados de la solución.
+    """
+    metas = _metas(meta)
+    inicio_aristas, destinos = grafo.inicio, grafo.destinos
+    limite = grafo.n if limite is None else limite
+    en_camino = set()
+    expandidos = 0
+    camino = None
+    if inicio in metas:
+        camino = [inicio]
+    profundidad = 0
+    while camino is None and profundidad <= limite:
+        cortado = False
+        pila = [inicio]
+        proxima = [inicio_aristas[inicio]]
+        en_camino.add(inicio)
+        expandidos += 1
+        while pila:
+            u = pila[-1]
+            k = proxima[-1]
+            if len(pila) > profundidad or k == inicio_aristas[u + 1]:
+                # En el límite o sin más vecinos: retroceder.  Si en el límite
+                # quedaba algún vecino fuera del camino, la rama se cortó
+                if not cortado and len(pila) > profundidad:
+                    cortado = any(destinos[j] not in en_camino for j in range(k, inicio_aristas[u + 1]))
+                en_camino.discard(u)
+                pila.pop()
+                proxima.pop()
+                continue
+            proxima[-1] = k + 1
+            v = destinos[k]
+            if v in en_camino:
+                continue  # ya está en el camino: sería un ciclo
+            if v in metas:
+                camino = pila + [v]
+                break
+            pila.append(v)
+            proxima.append(inicio_aristas[v])
+            en_camino.add(v)
+            expandidos += 1
+        if not cortado:
+            break
+        profundidad += 1
+    g = _Disperso(INF)
+    padre = _Disperso(-1)
+    if camino is None:
+        g[inicio] = 0.0
+        return Resultado(grafo, inicio, None, g, padre, expandidos)
+    for pasos, u in enumerate(camino):
+        g[u] = pasos
+        if pasos:
+            padre[u] = camino[pasos - 1]
+    return Resultado(grafo, inicio, camino[-1], g, padre, expandidos)
@@ -0,0 +1,190 @@
+"""Benchmark del paquete busqueda sobre grafos generados.
+
+Para cada tamaño mide, de una esquina a la opuesta:
+- carreteras: A* con la distancia euclidiana y costo uniforme (Dijkstra);
+- laberinto: A* con Manhattan y BFS sobre una grilla con 25 % de paredes;
+- legado: el best_first_search de Punto_1 (objetos Node, reached en un
+  dict, heurística en un dict) sobre las mismas carreteras, hasta
+  --max-legado estados, para comparar.
+
+Informa tiempo, estados expandidos, costo (que debe coincidir entre los
+algoritmos exactos) y, con --memoria, el pico de memoria de la búsqueda
+medido con tracemalloc (más lento).
+
+Con --consultas Q también mide Q consultas entre pares al azar de las
+carreteras: Dijkstra, A* euclidiana y A* con landmarks (ALT), más la tabla
+de todos los pares si el grafo tiene hasta --max-tabla estados.  Informa el
+tiempo de preparación y el tiempo y los expandidos medios por consulta.
+
+Uso (desde Entrega_1):
+    python -m busqueda.bench
+    python -m busqueda.bench --tamanos 10000 1000000 --memoria --salida bench.json
+    python -m busqueda.bench --tamanos 1000 100000 --consultas 100
+"""
+
+import argparse
+import heapq
+import json
+import math
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+from .algoritmos import best_first_search, breadth_first_search, uniform_cost_search
+from .generadores import carreteras, laberinto_aleatorio
+from .grafo import Grafo
+from .heuristicas import euclidiana, manhattan
+from .rutas import Landmarks, TablaRutas
+
+
+# --- El best_first_search original de Punto_1, tal cual, para comparar ---
+class Node:
+    def __init__(self, state, parent=None, path_cost=0):
+        self.state = state
+        self.parent = parent
+        self.path_cost = path_cost
+
+    def __lt__(self, other):
+        return self.path_cost < other.path_cost
+
+
+def legado(acciones, costos, heuristica, inicio, meta):
+    def f(node):
+        return node.path_cost + heuristica.get(node.state, float('inf'))
+
+    node = Node(inicio)
+    frontier = [(f(node), node)]
+    reached = {inicio: node}
+    while frontier:
+        _, node = heapq.heappop(frontier)
+        if node.state == meta:
+            return node.path_cost
+        for s in acciones[node.state]:
+            child = Node(s, node, node.path_cost + costos[(node.state, s)])
+            if s not in reached or child.path_cost < reached[s].path_cost:
+                reached[s] = child
+                heapq.heappush(frontier, (f(child), child))
+    return None
+
+
+def a_dicts(grafo: Grafo, xs, ys, meta):
+    """El grafo con las estructuras de Punto_1: adyacencias, costos y heurística en dicts."""
+    acciones = {u: [] for u in range(grafo.n)}
+    costos = {}
+    for u in range(grafo.n):
+        for v, c in grafo.vecinos(u):
+            acciones[u].append(v)
+            costos[(u, v)] = c
+    heuristica = {u: math.hypot(xs[u] - xs[meta], ys[u] - ys[meta]) for u in range(grafo.n)}
+    return acciones, costos, heuristica
+
+
+def medir(nombre, fn, memoria):
+    if memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    r = fn()
+    segundos = time.perf_counter() - inicio
+    fila = {"algoritmo": nombre, "segundos": round(segundos, 4)}
+    if memoria:
+        fila["pico_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        tracemalloc.stop()
+    if hasattr(r, "costo"):
+        fila["costo"] = round(r.costo, 4)
+        fila["expandidos"] = r.expandidos
+    else:
+        fila["costo"] = None if r is None else round(r, 4)
+    return fila
+
+
+def consultas(grafo: Grafo, xs, ys, q: int, max_tabla: int):
+    """Tiempo medio por consulta entre q pares al azar (los mismos para todos)."""
+    rnd = random.Random(0)
+    pares = [(rnd.randrange(grafo.n), rnd.randrange(grafo.n)) for _ in range(q)]
+    metodos = [
+        ("Dijkstra", None, lambda s, t: uniform_cost_search(grafo, s, t)),
+        ("A* euclidiana", None, lambda s, t: best_first_search(grafo, s, t, euclidiana(xs, ys, t))),
+    ]
+    inicio = time.perf_counter()
+    landmarks = Landmarks.calcular(grafo)
+    metodos.append(("A* ALT (8 landmarks)", time.perf_counter() - inicio, landmarks.consulta))
+    if grafo.n <= max_tabla:
+        inicio = time.perf_counter()
+        tabla = TablaRutas.calcular(grafo)
+        metodos.append(("tabla de todos los pares", time.perf_counter() - inicio, tabla.consulta))
+    filas = []
+    for nombre, preparacion, consulta in metodos:
+        inicio = time.perf_counter()
+        resultados = [consulta(s, t) for s, t in pares]
+        segundos = time.perf_counter() - inicio
+        filas.append({
+            "algoritmo": nombre,
+            "preparacion_s": None if preparacion is None else round(preparacion, 3),
+            "ms_por_consulta": round(1000 * segundos / q, 3),
+            "expandidos_medios": round(sum(r.expandidos for r in resultados) / q, 1),
+            "costo_total": round(sum(r.costo for r in resultados), 4),
+        })
+    return filas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--max-legado", type=int, default=100_000)
+    parser.add_argument("--memoria", action="store_true", help="mide el pico de memoria (tracemalloc)")
+    parser.add_argument("--salida", help="archivo JSON con los resultados")
+    parser.add_argument("--consultas", type=int, default=0, help="consultas entre pares al azar (0 = no medir)")
+    parser.add_argument("--max-tabla", type=int, default=2000, help="tamaño máximo para la tabla de todos los pares")
+    args = parser.parse_args()
+    resultados = []
+    for n in args.tamanos:
+        inicio = time.perf_counter()
+        grafo, xs, ys = carreteras(n)
+        construccion = time.perf_counter() - inicio
+        origen, meta = 0, grafo.n - 1
+        filas = [
+            medir("A* euclidiana", lambda: best_first_search(grafo, origen, meta, euclidiana(xs, ys, meta)), args.memoria),
+            medir("costo uniforme", lambda: uniform_cost_search(grafo, origen, meta), args.memoria),
+        ]
+        if grafo.n <= args.max_legado:
+            datos = a_dicts(grafo, xs, ys, meta)
+            filas.append(medir("legado (Punto_1)", lambda: legado(*datos, origen, meta), args.memoria))
+            del datos
+        print(f"carreteras: {grafo.n} estados, {grafo.aristas} aristas (construcción {construccion:.2f} s)")
+        for fila in filas:
+            print("   ", fila)
+        resultados.append({"grafo": "carreteras", "estados": grafo.n, "aristas": grafo.aristas, "filas": filas})
+        if args.consultas:
+            filas = consultas(grafo, xs, ys, args.consultas, args.max_tabla)
+            print(f"consultas: {args.consultas} pares al azar")
+            for fila in filas:
+                print("   ", fila)
+            resultados.append({"grafo": "carreteras (consultas)", "estados": grafo.n, "consultas": args.consultas, "filas": filas})
+        del grafo, xs, ys
+
+        lado = math.isqrt(n)
+        inicio = time.perf_counter()
+        grafo = Grafo.desde_grilla(laberinto_aleatorio(lado, lado))
+        construccion = time.perf_counter() - inicio
+        origen, meta = 0, grafo.n - 1
+        filas = [
+            medir("A* Manhattan", lambda: best_first_search(grafo, origen, meta, manhattan(lado, meta)), args.memoria),
+            medir("BFS", lambda: breadth_first_search(grafo, origen, meta), args.memoria),
+        ]
+        print(f"laberinto: {lado}x{lado}, {grafo.aristas} aristas (construcción {construccion:.2f} s)")
+        for fila in filas:
+            print("   ", fila)
+        resultados.append({"grafo": "laberinto", "estados": grafo.n, "aristas": grafo.aristas, "filas": filas})
+        del grafo
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if sys.platform == "darwin" else 2**10)
+    print(f"Pico de RSS del proceso: {pico:.1f} MB")
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"resultados": resultados, "pico_rss_mb": round(pico, 1)}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
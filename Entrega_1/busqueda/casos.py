@@ -0,0 +1,116 @@
+"""Problemas de Punto_1, Punto_2 y Punto_3 como casos de regresión.
+
+Cada caso arma el grafo con los mismos datos que el script original y
+guarda la respuesta que da ese script.  python -m busqueda.regresion los
+resuelve con el paquete y compara.
+"""
+
+from .grafo import INF, Grafo
+
+# --- Punto_1: mapa de Rumania ---
+ROMANIA_ACCIONES = {
+    'Arad': ['Sibiu', 'Timisoara', 'Zerind'],
+    'Sibiu': ['Arad', 'Fagaras', 'Rimnicu Vilcea'],
+    'Timisoara': ['Arad', 'Lugoj'],
+    'Zerind': ['Arad', 'Oradea'],
+    'Fagaras': ['Sibiu', 'Bucharest'],
+    'Rimnicu Vilcea': ['Sibiu', 'Pitesti', 'Craiova'],
+    'Lugoj': ['Timisoara', 'Mehadia'],
+    'Oradea': ['Zerind', 'Sibiu'],
+    'Pitesti': ['Rimnicu Vilcea', 'Bucharest'],
+    'Craiova': ['Rimnicu Vilcea', 'Drobeta', 'Pitesti'],
+    'Mehadia': ['Lugoj', 'Drobeta'],
+    'Drobeta': ['Mehadia', 'Craiova'],
+    'Bucharest': ['Fagaras', 'Pitesti', 'Urziceni', 'Giurgiu'],
+    'Giurgiu': ['Bucharest'],
+    'Urziceni': ['Bucharest', 'Hirsova', 'Vaslui'],
+    'Hirsova': ['Urziceni', 'Eforie'],
+    'Eforie': ['Hirsova'],
+    'Vaslui': ['Urziceni', 'Iasi'],
+    'Iasi': ['Vaslui', 'Neamt'],
+    'Neamt': ['Iasi']
+}
+
+ROMANIA_COSTOS = {
+    ('Arad', 'Sibiu'): 140, ('Arad', 'Timisoara'): 118, ('Arad', 'Zerind'): 75,
+    ('Sibiu', 'Fagaras'): 99, ('Sibiu', 'Rimnicu Vilcea'): 80,
+    ('Timisoara', 'Lugoj'): 111, ('Zerind', 'Oradea'): 71,
+    ('Fagaras', 'Bucharest'): 211, ('Rimnicu Vilcea', 'Pitesti'): 97,
+    ('Rimnicu Vilcea', 'Craiova'): 146, ('Lugoj', 'Mehadia'): 70,
+    ('Oradea', 'Sibiu'): 151, ('Pitesti', 'Bucharest'): 101,
+    ('Craiova', 'Drobeta'): 120, ('Craiova', 'Pitesti'): 138,
+    ('Mehadia', 'Drobeta'): 75, ('Bucharest', 'Urziceni'): 85,
+    ('Bucharest', 'Giurgiu'): 90, ('Urziceni', 'Hirsova'): 98,
+    ('Urziceni', 'Vaslui'): 142, ('Hirsova', 'Eforie'): 86,
+    ('Vaslui', 'Iasi'): 92, ('Iasi', 'Neamt'): 87
+}
+
+# Heurística: distancia aérea estimada a Bucharest
+ROMANIA_HEURISTICA = {
+    'Arad': 366, 'Bucharest': 0, 'Craiova': 160, 'Drobeta': 242, 'Eforie': 161,
+    'Fagaras': 176, 'Giurgiu': 77, 'Hirsova': 151, 'Iasi': 226, 'Lugoj': 244,
+    'Mehadia': 241, 'Neamt': 234, 'Oradea': 380, 'Pitesti': 100, 'Rimnicu Vilcea': 193,
+    'Sibiu': 253, 'Timisoara': 329, 'Urziceni': 80, 'Vaslui': 199, 'Zerind': 374
+}
+
+# Salida de Punto_1 (140 + 80 + 97 + 101 = 418 km)
+ROMANIA_RUTA = ['Arad', 'Sibiu', 'Rimnicu Vilcea', 'Pitesti', 'Bucharest']
+ROMANIA_COSTO = 418
+
+
+def romania(no_dirigido: bool = False) -> Grafo:
+    """Grafo de Punto_1.  Ahí solo tienen costo los pares de ROMANIA_COSTOS
+    (el resto vale infinito), así que por defecto las aristas van en esa
+    dirección; no_dirigido=True usa cada carretera en los dos sentidos."""
+    def costo(s, t):
+        c = ROMANIA_COSTOS.get((s, t), INF)
+        if no_dirigido and c == INF:
+            c = ROMANIA_COSTOS.get((t, s), INF)
+        return c
+
+    return Grafo.desde_dict(ROMANIA_ACCIONES, costo)
+
+
+# --- Punto_2: laberinto ---
+LABERINTO = [
+    ["#", "#", "#", "#", "#", "#", "#", "#"],
+    ["#", "S", "#", " ", "#", " ", "E", "#"],
+    ["#", " ", " ", " ", "#", " ", " ", "#"],
+    ["#", " ", "#", " ", " ", " ", "#", "#"],
+    ["#", "#", "#", "#", "#", "#", "#", "#"],
+    ["#", "#", "#", "#", "#", "#", "#", "#"]
+]
+
+# Salida de Punto_2
+LABERINTO_RUTA = [(1, 1), (2, 1), (2, 2), (2, 3), (3, 3), (3, 4), (3, 5), (2, 5), (1, 5), (1, 6)]
+
+
+def laberinto():
+    """(grafo, inicio, salida, ancho) del laberinto de Punto_2."""
+    ancho = len(LABERINTO[0])
+    celdas = [(r, c) for r, fila in enumerate(LABERINTO) for c in range(len(fila))]
+    inicio = next(r * ancho + c for r, c in celdas if LABERINTO[r][c] == "S")
+    salida = next(r * ancho + c for r, c in celdas if LABERINTO[r][c] == "E")
+    return Grafo.desde_grilla(LABERINTO), inicio, salida, ancho
+
+
+# --- Punto_3: metro ---
+METRO_ACCIONES = {
+    'Estacion A': ['Estacion B', 'Estacion C'],
+    'Estacion B': ['Estacion A', 'Estacion D', 'Estacion E'],
+    'Estacion C': ['Estacion A', 'Estacion F'],
+    'Estacion D': ['Estacion B', 'Estacion G'],
+    'Estacion E': ['Estacion B', 'Estacion H', 'Estacion I'],
+    'Estacion F': ['Estacion C', 'Estacion J'],
+    'Estacion G': ['Estacion D'],
+    'Estacion H': ['Estacion E'],
+    'Estacion I': ['Estacion E', 'Estacion J'],
+    'Estacion J': ['Estacion F', 'Estacion I']
+}
+
+# Salida de Punto_3 (BFS e IDS)
+METRO_RUTA = ['Estacion A', 'Estacion C', 'Estacion F', 'Estacion J']
+
+
+def metro() -> Grafo:
+    return Grafo.desde_dict(METRO_ACCIONES)
@@ -0,0 +1,85 @@
+"""Grafos grandes generados, para los benchmarks.
+
+- carreteras: red vial sintética (cuadrícula deformada con atajos), con
+  coordenadas para la heurística euclidiana.
+- laberinto_aleatorio: grilla con paredes al azar y S/E en esquinas opuestas.
+- metro: red de metro no dirigida (líneas de estaciones con transbordos).
+"""
+
+import math
+import random
+from array import array
+from typing import List, Tuple
+
+from .grafo import Grafo
+
+
+def carreteras(n: int, semilla: int = 0) -> Tuple[Grafo, array, array]:
+    """(grafo, xs, ys) de una red vial de unos n cruces.
+
+    Los cruces son una cuadrícula de lado ~sqrt(n) con las posiciones
+    desplazadas al azar; cada uno se une a su vecino de la derecha y al de
+    abajo, y algunos también en diagonal.  Las calles van en los dos
+    sentidos y cuestan su longitud por un factor entre 1 y 1.5, así que la
+    distancia en línea recta es una heurística admisible.
+    """
+    rng = random.Random(semilla)
+    lado = max(2, math.isqrt(n))
+    total = lado * lado
+    xs = array("d", (i % lado + rng.uniform(-0.3, 0.3) for i in range(total)))
+    ys = array("d", (i // lado + rng.uniform(-0.3, 0.3) for i in range(total)))
+
+    def aristas():
+        for u in range(total):
+            r, c = divmod(u, lado)
+            vecinos = []
+            if c < lado - 1:
+                vecinos.append(u + 1)
+            if r < lado - 1:
+                vecinos.append(u + lado)
+                if c < lado - 1 and rng.random() < 0.2:
+                    vecinos.append(u + lado + 1)
+            for v in vecinos:
+                largo = math.hypot(xs[u] - xs[v], ys[u] - ys[v])
+                yield u, v, largo * rng.uniform(1.0, 1.5)
+
+    return Grafo.desde_aristas(total, aristas(), no_dirigido=True), xs, ys
+
+
+def laberinto_aleatorio(alto: int, ancho: int, paredes: float = 0.25, semilla: int = 0) -> List[str]:
+    """Filas de texto ('#' pared, ' ' libre) con S arriba a la izquierda y E abajo a la derecha.
+
+    Con pocas paredes (menos de ~0.4) casi siempre hay salida.
+    """
+    rng = random.Random(semilla)
+    filas = [
+        "".join("#" if rng.random() < paredes else " " for _ in range(ancho))
+        for _ in range(alto)
+    ]
+    filas[0] = "S" + filas[0][1:]
+    filas[-1] = filas[-1][:-1] + "E"
+    return filas
+
+
+def metro(n: int, largo: int = 50, transbordos: float = 0.1, semilla: int = 0) -> Grafo:
+    """Red de metro no dirigida de n estaciones, de costo 1 por tramo.
+
+    Las estaciones forman líneas de ``largo`` estaciones seguidas (i con
+    i + 1) y cada estación, con probabilidad ``transbordos``, conecta con
+    una estación al azar de otra línea.  La primera estación de cada línea
+    conecta con una estación anterior al azar, así que la red es conexa.
+    """
+    rng = random.Random(semilla)
+
+    def aristas():
+        for u in range(n):
+            if u % largo:
+                yield u - 1, u, 1.0
+            elif u > 0:
+                yield rng.randrange(u), u, 1.0
+            if rng.random() < transbordos:
+                v = rng.randrange(n)
+                if v // largo != u // largo:
+                    yield u, v, 1.0
+
+    return Grafo.desde_aristas(n, aristas(), no_dirigido=True)
@@ -0,0 +1,157 @@
+from array import array
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+INF = float("inf")
+
+
+class Grafo:
+    """Grafo dirigido con estados enteros 0..n-1 en formato CSR.
+
+    Las aristas que salen de u son las posiciones k de inicio[u] a
+    inicio[u + 1]: van a destinos[k] y cuestan costos[k].  Todo se guarda en
+    arreglos de array (4 bytes por estado y 12 por arista), sin un objeto de
+    Python por nodo, así que caben grafos de millones de estados.
+    """
+
+    __slots__ = ("inicio", "destinos", "costos", "nombres", "_ids")
+
+    def __init__(self, inicio: array, destinos: array, costos: array, nombres: Optional[List[Hashable]] = None):
+        self.inicio = inicio
+        self.destinos = destinos
+        self.costos = costos
+        # Nombre de cada estado (p. ej. la ciudad); None si los estados son solo números
+        self.nombres = nombres
+        self._ids: Optional[Dict[Hashable, int]] = None
+
+    @property
+    def n(self) -> int:
+        return len(self.inicio) - 1
+
+    @property
+    def aristas(self) -> int:
+        return len(self.destinos)
+
+    def id(self, nombre: Hashable) -> int:
+        if self.nombres is None:
+            return nombre
+        if self._ids is None:
+            self._ids = {nombre: u for u, nombre in enumerate(self.nombres)}
+        return self._ids[nombre]
+
+    def nombre(self, u: int) -> Hashable:
+        return u if self.nombres is None else self.nombres[u]
+
+    def vecinos(self, u: int) -> Iterable[Tuple[int, float]]:
+        """(destino, costo) de las aristas que salen de u."""
+        for k in range(self.inicio[u], self.inicio[u + 1]):
+            yield self.destinos[k], self.costos[k]
+
+    def invertido(self) -> "Grafo":
+        """El mismo grafo con las aristas al revés (para buscar desde la meta)."""
+        origenes = array("i", bytes(4 * self.aristas))
+        for u in range(self.n):
+            for k in range(self.inicio[u], self.inicio[u + 1]):
+                origenes[k] = u
+        return Grafo.desde_arreglos(self.n, self.destinos, origenes, self.costos, self.nombres)
+
+    @classmethod
+    def desde_arreglos(
+        cls,
+        n: int,
+        origenes: Sequence[int],
+        destinos: Sequence[int],
+        costos: Sequence[float],
+        nombres: Optional[List[Hashable]] = None,
+    ) -> "Grafo":
+        """Construye el CSR a partir de las aristas (origenes[k], destinos[k], costos[k]).
+
+        Ordena por origen con un conteo (O(n + aristas)); las aristas de un
+        mismo origen mantienen su orden.
+        """
+        inicio = array("i", bytes(4 * (n + 1)))
+        for u in origenes:
+            inicio[u + 1] += 1
+        for u in range(n):
+            inicio[u + 1] += inicio[u]
+        siguiente = array("i", inicio[:-1])
+        m = len(origenes)
+        dest = array("i", bytes(4 * m))
+        cost = array("d", bytes(8 * m))
+        for u, v, c in zip(origenes, destinos, costos):
+            k = siguiente[u]
+            dest[k] = v
+            cost[k] = c
+            siguiente[u] = k + 1
+        return cls(inicio, dest, cost, nombres)
+
+    @classmethod
+    def desde_aristas(
+        cls,
+        n: int,
+        aristas: Iterable[Tuple[int, int, float]],
+        no_dirigido: bool = False,
+        nombres: Optional[List[Hashable]] = None,
+    ) -> "Grafo":
+        """Grafo de n estados con las aristas (u, v, costo); no_dirigido agrega (v, u, costo)."""
+        origenes, destinos, costos = array("i"), array("i"), array("d")
+        for u, v, c in aristas:
+            origenes.append(u)
+            destinos.append(v)
+            costos.append(c)
+            if no_dirigido:
+                origenes.append(v)
+                destinos.append(u)
+                costos.append(c)
+        return cls.desde_arreglos(n, origenes, destinos, costos, nombres)
+
+    @classmethod
+    def desde_dict(
+        cls,
+        acciones: Dict[Hashable, Sequence[Hashable]],
+        costo: Optional[Callable[[Hashable, Hashable], float]] = None,
+        no_dirigido: bool = False,
+    ) -> "Grafo":
+        """Grafo de un diccionario de adyacencias, como los de Punto_1 y Punto_3.
+
+        costo(estado, vecino) da el costo de cada arista (1 si no se indica);
+        las aristas de costo infinito no se pueden usar, así que se omiten.
+        """
+        ids: Dict[Hashable, int] = {}
+        for s, vecinos in acciones.items():
+            ids.setdefault(s, len(ids))
+            for t in vecinos:
+                ids.setdefault(t, len(ids))
+
+        def aristas():
+            for s, vecinos in acciones.items():
+                for t in vecinos:
+                    c = 1 if costo is None else costo(s, t)
+                    if c != INF:
+                        yield ids[s], ids[t], c
+
+        return cls.desde_aristas(len(ids), aristas(), no_dirigido, list(ids))
+
+    @classmethod
+    def desde_grilla(cls, celdas: Sequence[Sequence[str]], pared: str = "#") -> "Grafo":
+        """Grilla 4-conectada de costo 1: la celda (fila, col) es el estado fila * ancho + col.
+
+        Las paredes también son estados (sin aristas) para que el número de
+        una celda sea siempre fila * ancho + col.  Los vecinos van en el orden
+        de Punto_2: arriba, abajo, izquierda, derecha.
+        """
+        alto, ancho = len(celdas), len(celdas[0])
+        libre = bytearray(alto * ancho)
+        for r, fila in enumerate(celdas):
+            for c, valor in enumerate(fila):
+                libre[r * ancho + c] = valor != pared
+        origenes, destinos = array("i"), array("i")
+        for u in range(alto * ancho):
+            if not libre[u]:
+                continue
+            r, c = divmod(u, ancho)
+            for v, dentro in ((u - ancho, r > 0), (u + ancho, r < alto - 1), (u - 1, c > 0), (u + 1, c < ancho - 1)):
+                if dentro and libre[v]:
+                    origenes.append(u)
+                    destinos.append(v)
+        costos = array("d", [1.0]) * len(origenes)
+        return cls.desde_arreglos(alto * ancho, origenes, destinos, costos)
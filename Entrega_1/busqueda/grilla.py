@@ -0,0 +1,424 @@
+"""Búsqueda en grillas 4-conectadas de costo uniforme sobre arreglos de NumPy.
+
+Una grilla es un arreglo uint8 de alto x ancho con 1 en las paredes y 0 en
+las celdas libres.  Grilla le agrega un borde de paredes y numera las celdas
+con un índice plano, u = (fila + 1) * W + (col + 1) con W = ancho + 2, así
+que los vecinos de u son u - W, u + W, u - 1 y u + 1 sin revisar límites:
+
+- astar: A* con Manhattan; g y padre en arreglos de N posiciones asignados
+  una sola vez, sin objetos Node ni diccionarios.
+- jps: Jump Point Search para grillas 4-conectadas.  Solo expande los
+  "puntos de salto"; los saltos se precalculan con NumPy (como en JPS+), así
+  que cada salto es una consulta a una tabla en vez de un recorrido.
+- bfs: BFS por niveles vectorizado: cada nivel procesa toda la frontera con
+  operaciones de NumPy.
+
+A diferencia del resto del paquete, este módulo necesita NumPy (y Pillow
+para leer imágenes que no sean PGM/PBM/PPM).
+"""
+
+import os
+from heapq import heappop, heappush
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+PARED = 1
+LIBRE = 0
+
+Celda = Tuple[int, int]
+
+# Nombre de cada movimiento, en el orden en que Punto_2 prueba los vecinos
+ACCIONES = {(-1, 0): 'Up', (1, 0): 'Down', (0, -1): 'Left', (0, 1): 'Right'}
+
+
+class Solucion:
+    """Camino encontrado en una grilla: celdas (fila, col) del inicio a la salida."""
+
+    __slots__ = ("celdas", "expandidos")
+
+    def __init__(self, celdas: List[Celda], expandidos: int):
+        self.celdas = celdas
+        self.expandidos = expandidos
+
+    @property
+    def costo(self) -> float:
+        return len(self.celdas) - 1 if self.celdas else float("inf")
+
+    def acciones(self) -> List[str]:
+        return [ACCIONES[(r2 - r1, c2 - c1)] for (r1, c1), (r2, c2) in zip(self.celdas, self.celdas[1:])]
+
+
+class Grilla:
+    """Grilla de ocupación (1 = pared) con inicio y salida opcionales.
+
+    inicio y salida vienen de las marcas S/E al leer un archivo (ver
+    leer_texto y leer_imagen); las búsquedas también los aceptan como
+    argumentos.
+    """
+
+    def __init__(self, ocupacion: np.ndarray, inicio: Optional[Celda] = None, salida: Optional[Celda] = None):
+        ocupacion = np.asarray(ocupacion, dtype=np.uint8)
+        self.alto, self.ancho = ocupacion.shape
+        self.W = self.ancho + 2
+        self.libre = np.zeros((self.alto + 2, self.W), dtype=bool)
+        self.libre[1:-1, 1:-1] = ocupacion == LIBRE
+        self.inicio = inicio
+        self.salida = salida
+        # Tablas de saltos de jps (se calculan en el primer uso)
+        self._saltos = None
+
+    @property
+    def ocupacion(self) -> np.ndarray:
+        return (~self.libre[1:-1, 1:-1]).astype(np.uint8)
+
+    def indice(self, celda: Celda) -> int:
+        r, c = celda
+        if not (0 <= r < self.alto and 0 <= c < self.ancho) or not self.libre[r + 1, c + 1]:
+            raise ValueError(f"La celda {celda} no es una celda libre de la grilla")
+        return (r + 1) * self.W + c + 1
+
+    def celda(self, u: int) -> Celda:
+        r, c = divmod(int(u), self.W)
+        return r - 1, c - 1
+
+    def _extremos(self, inicio: Optional[Celda], salida: Optional[Celda]) -> Tuple[int, int]:
+        inicio = self.inicio if inicio is None else inicio
+        salida = self.salida if salida is None else salida
+        if inicio is None or salida is None:
+            raise ValueError("Faltan el inicio o la salida")
+        return self.indice(inicio), self.indice(salida)
+
+    def _camino(self, padre, s: int, t: int) -> List[Celda]:
+        if s != t and padre[t] < 0:
+            return []
+        camino = [t]
+        while camino[-1] != s:
+            camino.append(padre[camino[-1]])
+        camino.reverse()
+        return [self.celda(u) for u in camino]
+
+    def astar(self, inicio: Optional[Celda] = None, salida: Optional[Celda] = None) -> Solucion:
+        """A* con la distancia de Manhattan y estados planos.
+
+        g y padre son arreglos int32 de todas las celdas, leídos y escritos a
+        través de memoryview (acceso de a un elemento sin crear escalares de
+        NumPy).  Los vecinos se prueban en el orden de Punto_2 (arriba, abajo,
+        izquierda, derecha).  A igual f sale primero el de mayor g (el más
+        cercano a la salida): en zonas abiertas hay muchísimos empates y así
+        A* avanza en línea recta en vez de expandir todo el rombo.
+        """
+        s, t = self._extremos(inicio, salida)
+        W = self.W
+        libre = memoryview(self.libre.reshape(-1))
+        g_arr = np.full(self.libre.size, -1, dtype=np.int32)
+        padre_arr = np.full(self.libre.size, -1, dtype=np.int32)
+        g, padre = memoryview(g_arr), memoryview(padre_arr)
+        tr, tc = divmod(t, W)
+        sr, sc = divmod(s, W)
+        g[s] = 0
+        frontera = [(abs(sr - tr) + abs(sc - tc), 0, s)]
+        expandidos = 0
+        while frontera:
+            _, gu, u = heappop(frontera)
+            gu = -gu
+            if gu > g[u]:
+                continue  # entrada vieja (borrado perezoso)
+            if u == t:
+                break
+            expandidos += 1
+            gv = gu + 1
+            for v in (u - W, u + W, u - 1, u + 1):
+                if libre[v] and (g[v] < 0 or gv < g[v]):
+                    g[v] = gv
+                    padre[v] = u
+                    r, c = divmod(v, W)
+                    heappush(frontera, (gv + abs(r - tr) + abs(c - tc), -gv, v))
+        return Solucion(self._camino(padre, s, t), expandidos)
+
+    def bfs(self, inicio: Optional[Celda] = None, salida: Optional[Celda] = None) -> Solucion:
+        """BFS por niveles: cada nivel genera los vecinos de toda la frontera de una vez.
+
+        Con costo uniforme el primer nivel que toca la salida da un camino
+        mínimo.  El trabajo en Python es por nivel (el largo del camino), no
+        por celda.
+        """
+        s, t = self._extremos(inicio, salida)
+        libre = self.libre.reshape(-1)
+        padre = np.full(self.libre.size, -1, dtype=np.int32)
+        padre[s] = s
+        desplazamientos = np.array([-self.W, self.W, -1, 1], dtype=np.int32)
+        frontera = np.array([s], dtype=np.int32)
+        expandidos = 0
+        while frontera.size and padre[t] < 0:
+            expandidos += frontera.size
+            vecinos = (frontera[:, None] + desplazamientos).ravel()
+            origen = np.repeat(frontera, 4)
+            nuevos = libre[vecinos] & (padre[vecinos] < 0)
+            vecinos, origen = vecinos[nuevos], origen[nuevos]
+            # Un vecino alcanzado desde varias celdas se queda con la primera
+            vecinos, primero = np.unique(vecinos, return_index=True)
+            padre[vecinos] = origen[primero]
+            frontera = vecinos
+        padre[s] = -1
+        return Solucion(self._camino(memoryview(padre), s, t), expandidos)
+
+    def _tablas(self):
+        """Tablas de saltos de jps, independientes del inicio y la salida.
+
+        Para cada celda y dirección guardan la fila o columna donde se detiene
+        un salto que empieza en ella: el primer punto de salto (una celda con
+        un vecino forzado) o la primera pared.  Al moverse en vertical también
+        es punto de salto una celda desde la que un salto horizontal encuentra
+        uno.
+        """
+        if self._saltos is not None:
+            return self._saltos
+        L = self.libre
+        arriba, abajo = np.roll(L, 1, 0), np.roll(L, -1, 0)  # L[r-1, c], L[r+1, c]
+        izq, der = np.roll(L, 1, 1), np.roll(L, -1, 1)  # L[r, c-1], L[r, c+1]
+        arriba_izq, arriba_der = np.roll(arriba, 1, 1), np.roll(arriba, -1, 1)
+        abajo_izq, abajo_der = np.roll(abajo, 1, 1), np.roll(abajo, -1, 1)
+        # Vecinos forzados según la dirección en que se llega a la celda
+        forzado_der = L & ((arriba & ~arriba_izq) | (abajo & ~abajo_izq))
+        forzado_izq = L & ((arriba & ~arriba_der) | (abajo & ~abajo_der))
+        forzado_abajo = L & ((izq & ~arriba_izq) | (der & ~arriba_der))
+        forzado_arriba = L & ((izq & ~abajo_izq) | (der & ~abajo_der))
+        del arriba, abajo, izq, der, arriba_izq, arriba_der, abajo_izq, abajo_der
+        tipo = np.int16 if max(L.shape) < 2**15 else np.int32
+
+        def siguiente(parada, eje, avance):
+            # Índice (fila o columna) de la primera parada desde cada celda en la dirección indicada
+            largo = parada.shape[eje]
+            posiciones = np.arange(largo, dtype=tipo).reshape((-1, 1) if eje == 0 else (1, -1))
+            if avance > 0:
+                idx = np.where(parada, posiciones, largo - 1).astype(tipo)
+                idx = np.flip(np.minimum.accumulate(np.flip(idx, eje), axis=eje), eje)
+            else:
+                idx = np.maximum.accumulate(np.where(parada, posiciones, 0).astype(tipo), axis=eje)
+            return np.ascontiguousarray(idx)
+
+        der_ = siguiente(forzado_der | ~L, 1, 1)
+        izq_ = siguiente(forzado_izq | ~L, 1, -1)
+        # Desde cada celda, ¿un salto horizontal encuentra un punto de salto?
+        filas = np.arange(L.shape[0])[:, None]
+        hay_der = L[filas, der_]
+        hay_izq = L[filas, izq_]
+        horizontal = np.roll(hay_der, -1, 1) | np.roll(hay_izq, 1, 1)  # desde (r, c+1) o (r, c-1)
+        del hay_der, hay_izq, forzado_der, forzado_izq
+        abajo_ = siguiente(((forzado_abajo | horizontal) & L) | ~L, 0, 1)
+        arriba_ = siguiente(((forzado_arriba | horizontal) & L) | ~L, 0, -1)
+        self._saltos = tuple(memoryview(t.reshape(-1)) for t in (der_, izq_, abajo_, arriba_))
+        return self._saltos
+
+    def jps(self, inicio: Optional[Celda] = None, salida: Optional[Celda] = None) -> Solucion:
+        """Jump Point Search para grillas 4-conectadas de costo uniforme.
+
+        Desde cada punto de salto se sigue solo en las direcciones que
+        pueden dar un camino mínimo (la misma dirección y, si se llegó en
+        horizontal, las verticales, o al revés), saltando hasta el siguiente
+        punto de salto.  Los caminos entre puntos de salto son rectos y se
+        completan al final.  La primera llamada calcula las tablas de saltos
+        (O(N) con NumPy); las siguientes las reutilizan.
+        """
+        s, t = self._extremos(inicio, salida)
+        der_, izq_, abajo_, arriba_ = self._tablas()
+        W = self.W
+        libre = memoryview(self.libre.reshape(-1))
+        tr, tc = divmod(t, W)
+        # Columnas del tramo libre de la fila de la salida: un salto vertical
+        # que cruza esa fila dentro del tramo debe detenerse ahí
+        paredes = np.flatnonzero(~self.libre[tr])
+        lo = int(paredes[paredes < tc].max()) + 1
+        hi = int(paredes[paredes > tc].min()) - 1
+
+        def saltar(r, c, dr, dc):
+            if dc > 0:
+                parada = der_[r * W + c + 1]
+                if r == tr and c < tc <= parada:
+                    return t
+                return r * W + parada if libre[r * W + parada] else -1
+            if dc < 0:
+                parada = izq_[r * W + c - 1]
+                if r == tr and parada <= tc < c:
+                    return t
+                return r * W + parada if libre[r * W + parada] else -1
+            if dr > 0:
+                parada = abajo_[(r + 1) * W + c]
+                final = parada if libre[parada * W + c] else parada - 1
+                if lo <= c <= hi and r < tr <= final:
+                    return tr * W + c
+                return parada * W + c if final == parada else -1
+            parada = arriba_[(r - 1) * W + c]
+            final = parada if libre[parada * W + c] else parada + 1
+            if lo <= c <= hi and final <= tr < r:
+                return tr * W + c
+            return parada * W + c if final == parada else -1
+
+        g_arr = np.full(self.libre.size, -1, dtype=np.int32)
+        padre_arr = np.full(self.libre.size, -1, dtype=np.int32)
+        g, padre = memoryview(g_arr), memoryview(padre_arr)
+        sr, sc = divmod(s, W)
+        g[s] = 0
+        frontera = [(abs(sr - tr) + abs(sc - tc), 0, s)]
+        expandidos = 0
+        todas = ((-1, 0), (1, 0), (0, -1), (0, 1))
+        while frontera:
+            _, gu, u = heappop(frontera)
+            gu = -gu
+            if gu > g[u]:
+                continue
+            if u == t:
+                break
+            expandidos += 1
+            r, c = divmod(u, W)
+            p = padre[u]
+            if p < 0:
+                direcciones = todas
+            else:
+                pr, pc = divmod(p, W)
+                if pr == r:
+                    dc = 1 if c > pc else -1
+                    direcciones = ((-1, 0), (1, 0), (0, dc))
+                else:
+                    dr = 1 if r > pr else -1
+                    direcciones = ((0, -1), (0, 1), (dr, 0))
+            for dr, dc in direcciones:
+                v = saltar(r, c, dr, dc)
+                if v < 0:
+                    continue
+                vr, vc = divmod(v, W)
+                gv = gu + abs(vr - r) + abs(vc - c)
+                if g[v] < 0 or gv < g[v]:
+                    g[v] = gv
+                    padre[v] = u
+                    heappush(frontera, (gv + abs(vr - tr) + abs(vc - tc), -gv, v))
+        puntos = self._camino(padre, s, t)
+        # Completa los tramos rectos entre puntos de salto
+        celdas = puntos[:1]
+        for (r1, c1), (r2, c2) in zip(puntos, puntos[1:]):
+            paso_r, paso_c = (r2 > r1) - (r2 < r1), (c2 > c1) - (c2 < c1)
+            for k in range(1, abs(r2 - r1) + abs(c2 - c1) + 1):
+                celdas.append((r1 + k * paso_r, c1 + k * paso_c))
+        return Solucion(celdas, expandidos)
+
+    def resolver(self, modo: str = "jps", inicio: Optional[Celda] = None, salida: Optional[Celda] = None) -> Solucion:
+        if modo not in ("astar", "jps", "bfs"):
+            raise ValueError(f"Modo desconocido: {modo} (astar, jps o bfs)")
+        return getattr(self, modo)(inicio, salida)
+
+
+# --- Lectura y escritura de laberintos ---
+
+def desde_filas(filas, pared: str = "#") -> Grilla:
+    """Grilla de filas de texto o listas de caracteres (como el laberinto de Punto_2)."""
+    texto = ["".join(fila) for fila in filas]
+    return _desde_bytes([fila.encode("utf-8") for fila in texto], pared.encode("utf-8"))
+
+
+def _desde_bytes(lineas: List[bytes], pared: bytes) -> Grilla:
+    ancho = max((len(linea) for linea in lineas), default=0)
+    # Las filas cortas se completan con paredes
+    datos = np.frombuffer(b"".join(linea.ljust(ancho, pared) for linea in lineas), dtype=np.uint8)
+    datos = datos.reshape(len(lineas), ancho)
+    marcas = {}
+    for marca in (b"S", b"E"):
+        posiciones = np.argwhere(datos == marca[0])
+        marcas[marca] = tuple(int(x) for x in posiciones[0]) if len(posiciones) else None
+    ocupacion = (datos == pared[0]).astype(np.uint8)
+    return Grilla(ocupacion, marcas[b"S"], marcas[b"E"])
+
+
+def leer_texto(path: str, pared: str = "#") -> Grilla:
+    """Laberinto en un archivo de texto: una fila por línea, pared = '#', S y E marcan inicio y salida."""
+    with open(path, "rb") as f:
+        lineas = f.read().splitlines()
+    return _desde_bytes(lineas, pared.encode("utf-8"))
+
+
+def guardar_texto(grilla: Grilla, path: str) -> None:
+    datos = np.where(grilla.ocupacion == PARED, ord("#"), ord(" ")).astype(np.uint8)
+    for marca, celda in ((b"S", grilla.inicio), (b"E", grilla.salida)):
+        if celda is not None:
+            datos[celda] = marca[0]
+    with open(path, "wb") as f:
+        for fila in datos:
+            f.write(fila.tobytes() + b"\n")
+
+
+def _leer_netpbm(path: str) -> np.ndarray:
+    """PBM (P4), PGM (P5) o PPM (P6) binarios, sin dependencias."""
+    with open(path, "rb") as f:
+        datos = f.read()
+    campos, pos = [], 0
+    while len(campos) < (3 if datos[:2] == b"P4" else 4):
+        while datos[pos:pos + 1].isspace():
+            pos += 1
+        if datos[pos:pos + 1] == b"#":
+            pos = datos.index(b"\n", pos)
+            continue
+        fin = pos
+        while not datos[fin:fin + 1].isspace():
+            fin += 1
+        campos.append(datos[pos:fin])
+        pos = fin
+    pos += 1
+    tipo, ancho, alto = campos[0], int(campos[1]), int(campos[2])
+    if tipo == b"P4":
+        bits = np.unpackbits(np.frombuffer(datos, np.uint8, offset=pos).reshape(alto, -1), axis=1)[:, :ancho]
+        return np.where(bits == 1, 0, 255).astype(np.uint8)  # en PBM 1 es negro
+    if int(campos[3]) > 255:
+        raise ValueError("Solo se leen imágenes de 8 bits")
+    canales = {b"P5": 1, b"P6": 3}.get(tipo)
+    if canales is None:
+        raise ValueError(f"Formato Netpbm no soportado: {tipo.decode()}")
+    pixeles = np.frombuffer(datos, np.uint8, count=alto * ancho * canales, offset=pos)
+    return pixeles.reshape(alto, ancho, canales) if canales == 3 else pixeles.reshape(alto, ancho)
+
+
+def leer_imagen(path: str, umbral: int = 128) -> Grilla:
+    """Laberinto en una imagen: los píxeles oscuros son paredes.
+
+    En imágenes a color un píxel rojo marca el inicio y uno verde la salida.
+    PGM/PBM/PPM se leen directamente; otros formatos (PNG, BMP...) necesitan
+    Pillow.
+    """
+    if os.path.splitext(path)[1].lower() in (".pbm", ".pgm", ".ppm"):
+        pixeles = _leer_netpbm(path)
+    else:
+        try:
+            from PIL import Image
+        except ImportError as e:
+            raise ImportError("Para leer imágenes PNG/BMP/... hace falta Pillow (pip install pillow)") from e
+        with Image.open(path) as imagen:
+            pixeles = np.asarray(imagen.convert("RGB") if imagen.mode not in ("L", "1") else imagen.convert("L"))
+    marcas = {"S": None, "E": None}
+    if pixeles.ndim == 3:
+        r, g, b = (pixeles[..., i].astype(np.int32) for i in range(3))
+        rojo = (r > 200) & (g < 80) & (b < 80)
+        verde = (g > 200) & (r < 80) & (b < 80)
+        for marca, mascara in (("S", rojo), ("E", verde)):
+            posiciones = np.argwhere(mascara)
+            if len(posiciones):
+                marcas[marca] = tuple(int(x) for x in posiciones[0])
+        # Las marcas son celdas libres aunque el rojo y el verde sean oscuros
+        gris = (r * 299 + g * 587 + b * 114) // 1000
+        ocupacion = ((gris < umbral) & ~rojo & ~verde).astype(np.uint8)
+    else:
+        ocupacion = (pixeles < umbral).astype(np.uint8)
+    return Grilla(ocupacion, marcas["S"], marcas["E"])
+
+
+def leer(path: str) -> Grilla:
+    """Laberinto de un archivo de texto (.txt u otro) o de una imagen (.png, .pgm, ...)."""
+    if os.path.splitext(path)[1].lower() in (".png", ".bmp", ".gif", ".jpg", ".jpeg", ".pbm", ".pgm", ".ppm"):
+        return leer_imagen(path)
+    return leer_texto(path)
+
+
+def aleatoria(alto: int, ancho: int, paredes: float = 0.25, semilla: int = 0) -> Grilla:
+    """Grilla con paredes al azar, inicio arriba a la izquierda y salida abajo a la derecha."""
+    rng = np.random.default_rng(semilla)
+    ocupacion = (rng.random((alto, ancho)) < paredes).astype(np.uint8)
+    ocupacion[0, 0] = ocupacion[-1, -1] = LIBRE
+    return Grilla(ocupacion, (0, 0), (alto - 1, ancho - 1))
@@ -0,0 +1,47 @@
+import math
+from array import array
+from typing import Callable, Dict, Hashable, Sequence
+
+from .grafo import INF, Grafo
+
+# Una heurística es una función h(u) -> costo estimado de u a la meta.
+# best_first_search también acepta h=None (costo uniforme, sin llamar a nada)
+Heuristica = Callable[[int], float]
+
+
+def tabla(grafo: Grafo, valores: Dict[Hashable, float], defecto: float = INF) -> Heuristica:
+    """Heurística escrita a mano por nombre de estado (p. ej. la distancia aérea a Bucharest).
+
+    Se pasa a un arreglo por id una sola vez; los estados que no están en la
+    tabla valen ``defecto`` (infinito, como en Punto_1, los deja sin explorar).
+    """
+    h = array("d", [defecto]) * grafo.n
+    for nombre, valor in valores.items():
+        h[grafo.id(nombre)] = valor
+    return h.__getitem__
+
+
+def manhattan(ancho: int, meta: int, costo: float = 1.0) -> Heuristica:
+    """Distancia de Manhattan en una grilla de ``ancho`` columnas (estado = fila * ancho + col)."""
+    mr, mc = divmod(meta, ancho)
+
+    def h(u: int) -> float:
+        r, c = divmod(u, ancho)
+        return (abs(r - mr) + abs(c - mc)) * costo
+
+    return h
+
+
+def euclidiana(xs: Sequence[float], ys: Sequence[float], meta: int, escala: float = 1.0) -> Heuristica:
+    """Distancia en línea recta a la meta con las coordenadas de cada estado.
+
+    Es admisible si ningún costo es menor que ``escala`` por la distancia
+    entre los extremos de la arista (p. ej. carreteras: costo = longitud).
+    """
+    mx, my = xs[meta], ys[meta]
+    hypot = math.hypot
+
+    def h(u: int) -> float:
+        return hypot(xs[u] - mx, ys[u] - my) * escala
+
+    return h
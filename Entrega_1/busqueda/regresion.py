@@ -0,0 +1,85 @@
+"""Comprueba que el paquete da las mismas respuestas que Punto_1, Punto_2 y Punto_3.
+
+Uso (desde Entrega_1):
+    python -m busqueda.regresion
+"""
+
+import sys
+
+from . import casos
+from .algoritmos import (
+    best_first_search,
+    bidirectional_breadth_first_search,
+    breadth_first_search,
+    iterative_deepening_search,
+    uniform_cost_search,
+)
+from .heuristicas import manhattan, tabla
+from .rutas import Landmarks, Planificador, TablaRutas
+
+
+def comprobar(nombre, obtenido, esperado):
+    if obtenido == esperado:
+        print(f"[OK] {nombre}")
+        return True
+    print(f"[ERROR] {nombre}: se obtuvo {obtenido}, se esperaba {esperado}")
+    return False
+
+
+def main() -> int:
+    resultados = []
+
+    grafo = casos.romania()
+    arad, bucharest = grafo.id('Arad'), grafo.id('Bucharest')
+    h = tabla(grafo, casos.ROMANIA_HEURISTICA)
+    for nombre, r in (
+        ("Rumania A*", best_first_search(grafo, arad, bucharest, h)),
+        ("Rumania costo uniforme", uniform_cost_search(grafo, arad, bucharest)),
+        ("Rumania A* no dirigido", best_first_search(casos.romania(no_dirigido=True), arad, bucharest, h)),
+    ):
+        resultados.append(comprobar(nombre, (r.ruta(), r.costo), (casos.ROMANIA_RUTA, casos.ROMANIA_COSTO)))
+    for nombre, planificador in (
+        ("Rumania tabla de rutas", Planificador(grafo)),
+        ("Rumania ALT", Planificador(grafo, max_tabla=0)),
+    ):
+        r = planificador.consulta('Arad', 'Bucharest')
+        resultados.append(comprobar(nombre, (r.ruta(), r.costo), (casos.ROMANIA_RUTA, casos.ROMANIA_COSTO)))
+    # Todos los pares: la tabla y A* con landmarks deben dar los costos de Dijkstra
+    no_dirigido = casos.romania(no_dirigido=True)
+    tabla_rutas, landmarks = TablaRutas.calcular(no_dirigido), Landmarks.calcular(no_dirigido, 4)
+    pares = [(s, t) for s in range(no_dirigido.n) for t in range(no_dirigido.n)]
+    dijkstra = [uniform_cost_search(no_dirigido, s, t).costo for s, t in pares]
+    resultados.append(comprobar("Rumania tabla, todos los pares", [tabla_rutas.costo(s, t) for s, t in pares], dijkstra))
+    resultados.append(comprobar("Rumania ALT, todos los pares", [landmarks.consulta(s, t).costo for s, t in pares], dijkstra))
+
+    grafo, inicio, salida, ancho = casos.laberinto()
+    for nombre, r in (
+        ("Laberinto A*", best_first_search(grafo, inicio, salida, manhattan(ancho, salida))),
+        ("Laberinto BFS", breadth_first_search(grafo, inicio, salida)),
+        ("Laberinto BFS bidireccional", bidirectional_breadth_first_search(grafo, inicio, salida)),
+    ):
+        ruta = [divmod(u, ancho) for u in r.camino()]
+        resultados.append(comprobar(nombre, (ruta, r.costo), (casos.LABERINTO_RUTA, len(casos.LABERINTO_RUTA) - 1)))
+    try:
+        from . import grilla
+    except ImportError:
+        print("[--] Laberinto en grilla: falta NumPy")
+    else:
+        laberinto = grilla.desde_filas(casos.LABERINTO)
+        for modo in ("astar", "jps", "bfs"):
+            resultados.append(comprobar(f"Laberinto grilla {modo}", laberinto.resolver(modo).celdas, casos.LABERINTO_RUTA))
+
+    grafo = casos.metro()
+    a, j = grafo.id('Estacion A'), grafo.id('Estacion J')
+    for nombre, r in (
+        ("Metro BFS", breadth_first_search(grafo, a, j)),
+        ("Metro BFS bidireccional", bidirectional_breadth_first_search(grafo, a, j)),
+        ("Metro IDS", iterative_deepening_search(grafo, a, j)),
+    ):
+        resultados.append(comprobar(nombre, r.ruta(), casos.METRO_RUTA))
+
+    return 0 if all(resultados) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""Consultas de ruta entre cualquier par de estados de un grafo.
+
+Punto_1 resuelve una sola consulta (Arad -> Bucharest) y su heurística es
+una tabla escrita a mano para esa meta.  Para responder muchas consultas:
+
+- TablaRutas: Dijkstra desde cada estado, una vez.  Guarda la distancia y el
+  antecesor de todos los pares en dos arreglos de n * n (12 bytes por par),
+  así que una consulta es una lectura y el camino se arma siguiendo
+  antecesores.  Sirve mientras n * n quepa en memoria (n = 2000: 48 MB).
+- Landmarks: ALT (A*, landmarks y desigualdad triangular).  Guarda las
+  distancias desde y hacia k estados de referencia (16 * k bytes por
+  estado) y con ellas da una heurística admisible para cualquier meta.
+- Planificador: elige una de las dos según el tamaño, responde por nombre y
+  puede guardar las tablas en disco para no recalcularlas.
+
+Las consultas devuelven un Resultado, igual que las búsquedas de algoritmos.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from array import array
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from .algoritmos import Resultado, best_first_search, uniform_cost_search
+from .grafo import INF, Grafo
+from .heuristicas import Heuristica
+
+
+def huella(grafo: Grafo) -> str:
+    """Resumen del grafo (aristas, costos y nombres) para validar tablas guardadas en disco."""
+    h = hashlib.sha256()
+    for arreglo in (grafo.inicio, grafo.destinos, grafo.costos):
+        h.update(arreglo.tobytes())
+    h.update(repr(grafo.nombres).encode("utf-8"))
+    return h.hexdigest()
+
+
+# Formato de las tablas en disco: una línea con un encabezado JSON (tipo,
+# huella del grafo, parámetros y la lista de arreglos) y después los bytes
+# de cada arreglo.  Leerlo no ejecuta código, a diferencia de pickle, así
+# que un archivo dañado o ajeno solo hace que se recalculen las tablas.
+_FORMATO = "busqueda.rutas/1"
+
+
+def _guardar(path: str, grafo: Grafo, encabezado: dict, arreglos: Dict[str, array]) -> None:
+    cabecera = {
+        "formato": _FORMATO,
+        "huella": huella(grafo),
+        "orden": sys.byteorder,
+        **encabezado,
+        "arreglos": [[nombre, a.typecode, a.itemsize, len(a)] for nombre, a in arreglos.items()],
+    }
+    # Se escribe a un temporal propio y se renombra: no quedan archivos a
+    # medias y dos procesos que guardan a la vez no se pisan el temporal
+    fd, temporal = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(json.dumps(cabecera).encode("utf-8") + b"\n")
+            for a in arreglos.values():
+                a.tofile(f)
+        os.replace(temporal, path)
+    except BaseException:
+        try:
+            os.unlink(temporal)
+        except OSError:
+            pass
+        raise
+
+
+def _cargar(path: str, grafo: Grafo, tipo: str, **parametros) -> Optional[Tuple[dict, Dict[str, array]]]:
+    """(encabezado, arreglos) guardados con _guardar, o None si no existen,
+    están dañados, son de otro grafo o se calcularon con otros parámetros
+    (cada clave de parametros debe tener el mismo valor en el archivo)."""
+    try:
+        with open(path, "rb") as f:
+            cabecera = json.loads(f.readline())
+            if (
+                not isinstance(cabecera, dict)
+                or cabecera.get("formato") != _FORMATO
+                or cabecera.get("tipo") != tipo
+                or cabecera.get("huella") != huella(grafo)
+                or any(cabecera.get(clave) != valor for clave, valor in parametros.items())
+            ):
+                return None
+            lista = [(str(nombre), str(codigo), int(tamano), int(largo)) for nombre, codigo, tamano, largo in cabecera["arreglos"]]
+            # Los tamaños deben cubrir justo el resto del archivo (y no leer de más si mienten)
+            if sum(tamano * largo for _, _, tamano, largo in lista) != os.fstat(f.fileno()).st_size - f.tell():
+                return None
+            arreglos = {}
+            for nombre, codigo, tamano, largo in lista:
+                a = array(codigo)
+                if a.itemsize != tamano or largo < 0:
+                    return None
+                a.fromfile(f, largo)
+                if cabecera.get("orden") != sys.byteorder:
+                    a.byteswap()
+                arreglos[nombre] = a
+    except (OSError, EOFError, ValueError, TypeError, KeyError):
+        return None
+    return cabecera, arreglos
+
+
+class TablaRutas:
+    """Distancias y antecesores de todos los pares (Dijkstra desde cada estado).
+
+    La fila s de ``distancia`` y ``padre`` (posiciones s * n a s * n + n - 1)
+    es el resultado de uniform_cost_search desde s.  Calcularla cuesta n
+    búsquedas; después cada consulta es O(1) y el camino O(largo).
+    """
+
+    __slots__ = ("grafo", "distancia", "padre")
+
+    def __init__(self, grafo: Grafo, distancia: array, padre: array):
+        self.grafo = grafo
+        self.distancia = distancia
+        self.padre = padre
+
+    @classmethod
+    def calcular(cls, grafo: Grafo) -> "TablaRutas":
+        n = grafo.n
+        distancia = array("d", bytes(8 * n * n))
+        padre = array("i", bytes(4 * n * n))
+        for s in range(n):
+            r = uniform_cost_search(grafo, s)
+            distancia[s * n:(s + 1) * n] = r.g
+            padre[s * n:(s + 1) * n] = r.padre
+        return cls(grafo, distancia, padre)
+
+    def costo(self, inicio: int, meta: int) -> float:
+        return self.distancia[inicio * self.grafo.n + meta]
+
+    def consulta(self, inicio: int, meta: int) -> Resultado:
+        """Resultado de inicio a meta sin buscar: g y padre son vistas de la fila de inicio."""
+        n = self.grafo.n
+        fila = slice(inicio * n, (inicio + 1) * n)
+        g = memoryview(self.distancia)[fila]
+        padre = memoryview(self.padre)[fila]
+        return Resultado(self.grafo, inicio, meta if g[meta] != INF else None, g, padre, 0)
+
+    def guardar(self, path: str) -> None:
+        _guardar(path, self.grafo, {"tipo": "tabla"}, {"distancia": self.distancia, "padre": self.padre})
+
+    @classmethod
+    def cargar(cls, path: str, grafo: Grafo) -> Optional["TablaRutas"]:
+        datos = _cargar(path, grafo, "tabla")
+        if datos is None:
+            return None
+        arreglos = datos[1]
+        distancia, padre = arreglos.get("distancia"), arreglos.get("padre")
+        n = grafo.n
+        if distancia is None or padre is None or distancia.typecode != "d" or padre.typecode != "i":
+            return None
+        if len(distancia) != n * n or len(padre) != n * n:
+            return None
+        return cls(grafo, distancia, padre)
+
+
+class Landmarks:
+    """Heurísticas ALT para cualquier meta a partir de k estados de referencia.
+
+    Para un landmark L la desigualdad triangular da dos cotas inferiores de
+    d(u, t): d(L, t) - d(L, u) y d(u, L) - d(t, L).  La heurística es la
+    mayor de todas, así que es admisible y consistente para cualquier meta
+    t, sin tablas escritas a mano.  Con un landmark "detrás" del inicio y
+    otro "detrás" de la meta las cotas son casi exactas.
+    """
+
+    __slots__ = ("grafo", "marcas", "desde", "hacia", "k")
+
+    def __init__(self, grafo: Grafo, marcas: Sequence[int], desde: List[array], hacia: List[array], k: Optional[int] = None):
+        self.grafo = grafo
+        self.marcas = list(marcas)
+        # Landmarks pedidos a calcular() (puede ser más que len(marcas) si el
+        # grafo tiene menos estados); None si las marcas se dieron a mano
+        self.k = k
+        # desde[i][u] = d(marcas[i], u); hacia[i][u] = d(u, marcas[i])
+        self.desde = desde
+        self.hacia = hacia
+
+    @classmethod
+    def calcular(cls, grafo: Grafo, k: int = 8, marcas: Optional[Sequence[int]] = None, inverso: Optional[Grafo] = None) -> "Landmarks":
+        """Elige k landmarks (si no se dan) y calcula sus distancias: 2k búsquedas.
+
+        La elección es "el más lejano": cada nuevo landmark es el estado más
+        lejano de los ya elegidos (en cualquiera de los dos sentidos), así
+        quedan en la periferia del grafo, que es donde dan mejores cotas.  Un
+        estado que no se conecta con ningún landmark cuenta como infinitamente
+        lejano, así que cada componente recibe el suyo.
+        """
+        inverso = grafo.invertido() if inverso is None else inverso
+        desde, hacia = [], []
+
+        def agregar(L):
+            desde.append(uniform_cost_search(grafo, L).g)
+            hacia.append(uniform_cost_search(inverso, L).g)
+
+        if marcas is not None:
+            for L in marcas:
+                agregar(L)
+            return cls(grafo, marcas, desde, hacia)
+        # El primero es el más lejano del estado 0; después, el más lejano de todos los elegidos
+        lejania = array("d", map(min, uniform_cost_search(grafo, 0).g, uniform_cost_search(inverso, 0).g))
+        elegidos: List[int] = []
+        while len(elegidos) < min(k, grafo.n):
+            candidato = max((u for u in range(grafo.n) if u not in elegidos), key=lejania.__getitem__)
+            elegidos.append(candidato)
+            agregar(candidato)
+            if len(elegidos) == 1:
+                lejania = array("d", map(min, desde[0], hacia[0]))
+            else:
+                for u, d in enumerate(map(min, desde[-1], hacia[-1])):
+                    if d < lejania[u]:
+                        lejania[u] = d
+        return cls(grafo, elegidos, desde, hacia, k)
+
+    def cota(self, i: int, u: int, meta: int) -> float:
+        """Cota inferior de d(u, meta) que da el landmark i (puede ser negativa)."""
+        cotas = (self.desde[i][meta] - self.desde[i][u], self.hacia[i][u] - self.hacia[i][meta])
+        # inf - inf es nan: ese lado no dice nada
+        return max((c for c in cotas if c == c), default=-INF)
+
+    def heuristica(self, meta: int, inicio: Optional[int] = None, activos: Optional[int] = 4) -> Heuristica:
+        """h(u) para llegar a meta.
+
+        Con inicio, solo se usan los ``activos`` landmarks que mejor acotan
+        d(inicio, meta): cada llamada a h cuesta proporcional al número de
+        landmarks, y los demás casi nunca dan la mayor cota.
+        """
+        usados = range(len(self.marcas))
+        if inicio is not None and activos is not None and activos < len(self.marcas):
+            usados = sorted(usados, key=lambda i: self.cota(i, inicio, meta), reverse=True)[:activos]
+        pares = [(self.desde[i], self.desde[i][meta], self.hacia[i], self.hacia[i][meta]) for i in usados]
+
+        def h(u: int) -> float:
+            mejor = 0.0
+            for desde, d_meta, hacia, d_meta_hacia in pares:
+                # Comparaciones con nan dan False, así que las cotas inf - inf se ignoran
+                c = d_meta - desde[u]
+                if c > mejor:
+                    mejor = c
+                c = hacia[u] - d_meta_hacia
+                if c > mejor:
+                    mejor = c
+            return mejor
+
+        return h
+
+    def consulta(self, inicio: int, meta: int) -> Resultado:
+        return best_first_search(self.grafo, inicio, meta, self.heuristica(meta, inicio))
+
+    def guardar(self, path: str) -> None:
+        arreglos = {}
+        for i in range(len(self.marcas)):
+            arreglos[f"desde{i}"] = self.desde[i]
+            arreglos[f"hacia{i}"] = self.hacia[i]
+        _guardar(path, self.grafo, {"tipo": "landmarks", "k": self.k, "marcas": self.marcas}, arreglos)
+
+    @classmethod
+    def cargar(cls, path: str, grafo: Grafo, k: int = 8, marcas: Optional[Sequence[int]] = None) -> Optional["Landmarks"]:
+        """Landmarks guardados para los mismos k y marcas que pediría calcular(grafo, k, marcas)."""
+        if marcas is None:
+            datos = _cargar(path, grafo, "landmarks", k=k)
+        else:
+            datos = _cargar(path, grafo, "landmarks", k=None, marcas=list(marcas))
+        if datos is None:
+            return None
+        cabecera, arreglos = datos
+        guardadas = cabecera.get("marcas")
+        if not isinstance(guardadas, list) or not all(isinstance(L, int) and 0 <= L < grafo.n for L in guardadas):
+            return None
+        desde = [arreglos.get(f"desde{i}") for i in range(len(guardadas))]
+        hacia = [arreglos.get(f"hacia{i}") for i in range(len(guardadas))]
+        if any(a is None or a.typecode != "d" or len(a) != grafo.n for a in desde + hacia):
+            return None
+        return cls(grafo, guardadas, desde, hacia, cabecera["k"])
+
+
+class Planificador:
+    """Servicio de rutas sobre un grafo: responde consultas (origen, destino) por nombre.
+
+    Hasta ``max_tabla`` estados precalcula la TablaRutas completa (cada
+    consulta es una lectura); en grafos más grandes usa A* con Landmarks.
+    Con ``cache`` (un archivo) guarda las tablas la primera vez y las
+    vuelve a cargar mientras el grafo no cambie.
+    """
+
+    def __init__(self, grafo: Grafo, max_tabla: int = 2000, landmarks: int = 8, cache: Optional[str] = None):
+        self.grafo = grafo
+        tabla = grafo.n <= max_tabla
+        self.tablas = None
+        if cache:
+            self.tablas = TablaRutas.cargar(cache, grafo) if tabla else Landmarks.cargar(cache, grafo, landmarks)
+        if self.tablas is None:
+            self.tablas = TablaRutas.calcular(grafo) if tabla else Landmarks.calcular(grafo, landmarks)
+            if cache:
+                self.tablas.guardar(cache)
+
+    def consulta(self, origen: Hashable, destino: Hashable) -> Resultado:
+        return self.tablas.consulta(self.grafo.id(origen), self.grafo.id(destino))
+
+    def consultas(self, pares: Iterable[Tuple[Hashable, Hashable]]) -> List[Resultado]:
+        return [self.consulta(origen, destino) for origen, destino in pares]
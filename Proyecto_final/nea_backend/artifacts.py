@@ -0,0 +1,273 @@
+"""Persisted recommender artifacts (fitted TF‑IDF model and matrices).
+
+Fitting ``TfidfVectorizer`` over the whole catalog costs seconds of CPU in
+every uvicorn worker on every start.  After a fit, :func:`save_bundle`
+writes everything the recommender needs into a versioned directory::
+
+    artifacts/v2-<hash>/
+        manifest.json      format version, content hash, category row ranges
+        vocabulary.json    term -> column of the TF‑IDF matrix
+        idf.npy            IDF weight of each column
+        tfidf_data.npy     CSR matrix: ``data``, ``indices`` and ``indptr``
+        tfidf_indices.npy  arrays, stored as plain ``.npy`` files
+        tfidf_indptr.npy
+        ratings.npy        ratings normalised to 0–1
+        ratings_raw.npy    ratings as stored in the catalog
+        neighbours.npy     (optional) ids of the most similar items, int32
+        neighbour_scores.npy  (optional) their cosine similarity, float16
+        tfidf_data32.npy   (optional) ``data`` as float32, for compact mode
+
+``<hash>`` is the content hash of the catalog, so a bundle is only
+reused for the exact database it was fitted on; any change to the file makes
+the recommender refit and write a new bundle.  Bundles are written to a
+temporary directory and renamed into place, so concurrent workers never read
+a partial one.
+
+Every array is opened with ``mmap_mode="r"``: processes serving the same
+bundle (uvicorn workers, scoring processes) share its pages through the OS
+page cache instead of each holding a private copy.  :func:`bundle_lock`
+serialises fitting across processes, so only one of them fits a new
+catalog while the others wait and then load the result.
+
+After an incremental import, ``delta.json`` records the previous catalog
+hash and the categories that changed.  If no bundle matches the new catalog
+but one matches the previous, the recommender keeps its vocabulary/IDF and
+re-vectorizes only the changed categories.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, workers may fit in parallel
+    fcntl = None
+
+ARTIFACTS_VERSION = 2
+ARTIFACTS_DIR = os.path.join(os.path.dirname(__file__), "artifacts")
+DELTA_NAME = "delta.json"
+LOCK_NAME = ".lock"
+
+
+def bundle_path(directory: str, db_hash: str) -> str:
+    return os.path.join(directory, f"v{ARTIFACTS_VERSION}-{db_hash[:16]}")
+
+
+def save_bundle(
+    directory: str,
+    db_hash: str,
+    vectorizer: TfidfVectorizer,
+    tfidf_matrix: csr_matrix,
+    rating_array: np.ndarray,
+    ratings_raw: np.ndarray,
+    category_ranges: Dict[str, Tuple[int, int]],
+) -> str:
+    """Write a bundle for ``db_hash`` and remove bundles of other databases."""
+    final = bundle_path(directory, db_hash)
+    if os.path.isdir(final):
+        return final
+    os.makedirs(directory, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=directory)
+    try:
+        manifest = {
+            "version": ARTIFACTS_VERSION,
+            "db_hash": db_hash,
+            "n_items": int(tfidf_matrix.shape[0]),
+            "n_features": int(tfidf_matrix.shape[1]),
+            "category_ranges": {cat: list(r) for cat, r in category_ranges.items()},
+        }
+        vocabulary = {term: int(col) for term, col in vectorizer.vocabulary_.items()}
+        with open(os.path.join(tmp, "vocabulary.json"), "w", encoding="utf-8") as f:
+            json.dump(vocabulary, f, ensure_ascii=False)
+        np.save(os.path.join(tmp, "idf.npy"), vectorizer.idf_)
+        tfidf_matrix = tfidf_matrix.tocsr()
+        for name in ("data", "indices", "indptr"):
+            np.save(os.path.join(tmp, f"tfidf_{name}.npy"), getattr(tfidf_matrix, name))
+        np.save(os.path.join(tmp, "ratings.npy"), rating_array)
+        np.save(os.path.join(tmp, "ratings_raw.npy"), ratings_raw)
+        # The manifest goes last: a directory without it is never loaded
+        with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        # mkdtemp creates it 0700: the server may run as another user than the import
+        os.chmod(tmp, 0o755)
+        try:
+            os.rename(tmp, final)
+        except OSError:
+            # Another worker published the same bundle first
+            shutil.rmtree(tmp, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    prune_bundles(directory, keep=final)
+    return final
+
+
+@contextmanager
+def bundle_lock(directory: str) -> Iterator[None]:
+    """Exclusive lock shared by every process using ``directory``."""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_NAME), "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _save_array(path: str, name: str, array: np.ndarray) -> None:
+    """Write ``<name>.npy`` into the bundle at ``path`` atomically.
+
+    The array goes to a uniquely named temporary file first, so processes
+    adding the same file concurrently never share (or remove) each other's
+    temporary file.
+    """
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".npy", dir=path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+        # mkstemp creates it 0600, like the rest of the bundle it must be readable by all
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, os.path.join(path, f"{name}.npy"))
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def save_neighbours(
+    directory: str, db_hash: str, neighbour_ids: np.ndarray, neighbour_scores: np.ndarray
+) -> None:
+    """Add the precomputed neighbour lists to the bundle of ``db_hash``.
+
+    Callers hold :func:`bundle_lock`; see ``MultimodalRecommender.build_neighbours``.
+    """
+    path = bundle_path(directory, db_hash)
+    for name, array in (("neighbour_scores", neighbour_scores), ("neighbours", neighbour_ids)):
+        _save_array(path, name, array)
+
+
+def load_neighbours(directory: str, db_hash: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Memory-mapped neighbour ids and scores of a bundle; ``None`` if not saved."""
+    path = bundle_path(directory, db_hash)
+    # Scores are written first, so the ids file implies both are complete
+    if not os.path.exists(os.path.join(path, "neighbours.npy")):
+        return None
+    try:
+        return (
+            np.load(os.path.join(path, "neighbours.npy"), mmap_mode="r"),
+            np.load(os.path.join(path, "neighbour_scores.npy"), mmap_mode="r"),
+        )
+    except (OSError, ValueError):
+        return None
+
+
+def save_compact_data(directory: str, db_hash: str, data: np.ndarray) -> None:
+    """Add the float32 copy of the TF‑IDF ``data`` array to the bundle of ``db_hash``."""
+    _save_array(bundle_path(directory, db_hash), "tfidf_data32", np.asarray(data, dtype=np.float32))
+
+
+def load_compact_data(directory: str, db_hash: str) -> Optional[np.ndarray]:
+    """Memory-mapped float32 TF‑IDF ``data`` of a bundle; ``None`` if not saved."""
+    try:
+        return np.load(os.path.join(bundle_path(directory, db_hash), "tfidf_data32.npy"), mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+
+def prune_bundles(directory: str, keep: str) -> None:
+    """Delete every bundle in ``directory`` except ``keep``."""
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if path != keep and name.startswith("v") and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def save_delta(directory: str, delta: Dict) -> None:
+    """Store the delta between two catalogs written by ``import_datasets.py``.
+
+    ``delta`` holds ``base_hash`` and ``new_hash`` (catalog content hashes)
+    and ``changed`` (categories re-imported in between).
+    """
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(delta, f, ensure_ascii=False, indent=2)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, os.path.join(directory, DELTA_NAME))
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_delta(directory: str, db_hash: str) -> Optional[Dict]:
+    """Return the saved delta leading to ``db_hash``, if there is one."""
+    try:
+        with open(os.path.join(directory, DELTA_NAME), encoding="utf-8") as f:
+            delta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if delta.get("new_hash") != db_hash:
+        return None
+    return delta
+
+
+def load_bundle(directory: str, db_hash: str) -> Optional[Dict]:
+    """Load the bundle fitted on ``db_hash``; ``None`` if there is none.
+
+    The returned dict has the keys ``vectorizer``, ``tfidf_matrix``,
+    ``rating_array``, ``ratings_raw``, ``category_ranges`` and
+    ``neighbour_ids``/``neighbour_scores`` (``None`` until
+    :func:`save_neighbours` was called).
+    """
+    path = bundle_path(directory, db_hash)
+    try:
+        with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != ARTIFACTS_VERSION or manifest.get("db_hash") != db_hash:
+            return None
+        with open(os.path.join(path, "vocabulary.json"), encoding="utf-8") as f:
+            vocabulary = json.load(f)
+        vectorizer = TfidfVectorizer(stop_words=None, max_features=len(vocabulary))
+        vectorizer.vocabulary_ = vocabulary
+        vectorizer.idf_ = np.load(os.path.join(path, "idf.npy"))
+        # Zero-copy CSR matrix over the memory-mapped arrays
+        tfidf_matrix = csr_matrix(
+            tuple(
+                np.load(os.path.join(path, f"tfidf_{name}.npy"), mmap_mode="r")
+                for name in ("data", "indices", "indptr")
+            ),
+            shape=(manifest["n_items"], manifest["n_features"]),
+            copy=False,
+        )
+        rating_array = np.load(os.path.join(path, "ratings.npy"), mmap_mode="r")
+        ratings_raw = np.load(os.path.join(path, "ratings_raw.npy"), mmap_mode="r")
+        neighbour_ids, neighbour_scores = load_neighbours(directory, db_hash) or (None, None)
+    except (OSError, ValueError, KeyError):
+        return None
+    return {
+        "vectorizer": vectorizer,
+        "tfidf_matrix": tfidf_matrix,
+        "rating_array": rating_array,
+        "ratings_raw": ratings_raw,
+        "category_ranges": {cat: tuple(r) for cat, r in manifest["category_ranges"].items()},
+        "neighbour_ids": neighbour_ids,
+        "neighbour_scores": neighbour_scores,
+    }
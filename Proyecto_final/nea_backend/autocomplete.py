@@ -0,0 +1,126 @@
+"""Prefix autocomplete over item names.
+
+:class:`PrefixIndex` answers "the ``k`` most popular items whose name starts
+with this prefix" without scanning the catalog:
+
+* names are normalised (lower case, accents removed, spaces collapsed) and
+  the distinct keys are kept sorted in one UTF-8 blob with an ``offsets``
+  array, so every key costs its bytes plus 8 bytes;
+* a prefix is the contiguous range ``[lo, hi)`` of that order, found with
+  two binary searches;
+* each key keeps its most popular item (more reviews, then higher rating)
+  and that item's global popularity rank, so the best ``k`` keys of a range
+  are the ``k`` smallest ranks (``np.argpartition``);
+* answers for one- and two-character prefixes, whose ranges are the
+  largest, are computed at build time.
+"""
+
+from __future__ import annotations
+
+import bisect
+import unicodedata
+from collections.abc import Sequence
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Prefixes up to this length have precomputed answers
+PRECOMPUTED_PREFIX = 2
+
+
+def normalize_name(text: str) -> str:
+    """Lower-cased name without accents and with single spaces."""
+    text = unicodedata.normalize("NFKD", str(text or "").lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.split())
+
+
+class _Keys(Sequence):
+    """Sorted strings stored as one UTF-8 blob (enough for ``bisect``)."""
+
+    def __init__(self, keys: List[str]) -> None:
+        data = [key.encode("utf-8") for key in keys]
+        self.offsets = np.zeros(len(data) + 1, dtype=np.int64)
+        np.cumsum([len(d) for d in data], out=self.offsets[1:])
+        self.blob = b"".join(data)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx: int) -> str:
+        return self.blob[self.offsets[idx]:self.offsets[idx + 1]].decode("utf-8")
+
+
+class PrefixIndex:
+    """Top-k prefix completion over the names of one category.
+
+    Parameters
+    ----------
+    names: List[str]
+        Name of each item (its position is the item id).
+    popularity: np.ndarray
+        Primary ranking signal of each item (e.g. ``num_reseñas``).
+    rating: np.ndarray, optional
+        Tie-break (e.g. ``calificacion``).
+    k: int, optional
+        Size of the precomputed answers for short prefixes.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        popularity: np.ndarray,
+        rating: Optional[np.ndarray] = None,
+        k: int = 50,
+    ) -> None:
+        n = len(names)
+        rating = np.zeros(n) if rating is None else np.asarray(rating)
+        # Global rank of every item: more reviews first, then higher rating, then position
+        by_popularity = np.lexsort((np.arange(n), -rating, -np.asarray(popularity)))
+        rank = np.empty(n, dtype=np.int64)
+        rank[by_popularity] = np.arange(n)
+        # Each distinct key keeps its most popular item
+        best: Dict[str, int] = {}
+        for idx in by_popularity:
+            key = normalize_name(names[idx])
+            if key and key not in best:
+                best[key] = int(idx)
+        keys = sorted(best)
+        self.keys = _Keys(keys)
+        self.items = np.array([best[key] for key in keys], dtype=np.int32)
+        self.ranks = rank[self.items] if len(keys) else np.empty(0, dtype=np.int64)
+        self.k = k
+        self._short: Dict[str, np.ndarray] = {}
+        prefixes = {key[:size] for key in keys for size in range(1, PRECOMPUTED_PREFIX + 1)}
+        for prefix in prefixes:
+            self._short[prefix] = self._top(prefix, k)
+
+    def _range(self, prefix: str) -> slice:
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\U0010ffff", lo)
+        return slice(lo, hi)
+
+    def _top(self, prefix: str, k: int) -> np.ndarray:
+        span = self._range(prefix)
+        ranks = self.ranks[span]
+        if k < len(ranks):
+            best = np.argpartition(ranks, k - 1)[:k]
+        else:
+            best = np.arange(len(ranks))
+        best = best[np.argsort(ranks[best])]
+        return self.items[span][best]
+
+    def complete(self, prefix: str, k: int = 10) -> np.ndarray:
+        """Item ids of the ``k`` most popular names starting with ``prefix``."""
+        # A trailing space means the last word is complete ("mario " != "marion")
+        trailing = " " if prefix[-1:].isspace() else ""
+        prefix = normalize_name(prefix)
+        prefix += trailing if prefix else ""
+        if not prefix or k <= 0:
+            return np.empty(0, dtype=np.int32)
+        short = self._short.get(prefix)
+        if short is not None and k <= self.k:
+            return short[:k]
+        if len(prefix) <= PRECOMPUTED_PREFIX and short is None:
+            return np.empty(0, dtype=np.int32)
+        return self._top(prefix, k)
@@ -0,0 +1,118 @@
+"""Recall and latency of the recommender's ANN mode against exact scoring.
+
+Builds the recommender with ``ann=True`` over a catalog (the shipped one
+by default, or the synthetic catalogs of ``bench_datos.py``) and, for
+queries made of words of item names, compares ``recommend`` with
+``exact=True`` (the verification fallback) against the approximate mode
+for every ``nprobe``.  Reported per category and ``nprobe``:
+
+* ``recall``: :func:`ann.recall_at_k` of the approximate top-k against the
+  exact one (mean share of the exact items also returned);
+* the p50/p90/p99 latency of ``recommend`` in both modes.
+
+With ``--objetivo`` it also prints, per category, the smallest ``nprobe``
+that reaches that recall.  ``--salida`` writes everything as JSON.
+
+Usage:
+    python bench_ann.py                                    # shipped catalog
+    python bench_ann.py --tamanos 100000 --nprobe 8 16 32 64 --metodo cbf
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+import bench_datos
+from ann import recall_at_k
+from artifacts import ARTIFACTS_DIR
+from bench_micro import palabras
+from recommender import MultimodalRecommender
+
+NPROBES = [1, 2, 4, 8, 16, 32, 64]
+
+
+def consultar(rec: MultimodalRecommender, cat: str, gustos: List[List[str]], metodo: str, k: int, exact: bool):
+    """``(ids, latencias)`` of ``recommend`` for every query."""
+    ids, latencias = [], []
+    for g in gustos:
+        inicio = time.perf_counter()
+        items = rec.recommend(cat, g, metodo, top_k=k, exact=exact)
+        latencias.append(time.perf_counter() - inicio)
+        ids.append([item.get("id") or item.get("nombre") for item in items])
+    return ids, latencias
+
+
+def medir(rec: MultimodalRecommender, nprobes: List[int], metodo: str, k: int, n_consultas: int) -> Dict:
+    categorias = [cat for cat in rec.ann_indexes if len(rec.db.get(cat, ()))]
+    rng = random.Random(0)
+    vocab = palabras(rec, categorias, rng)
+    resultados: Dict = {}
+    for cat in categorias:
+        _, index = rec.ann_indexes[cat]
+        gustos = [[rng.choice(vocab[cat]) for _ in range(2)] for _ in range(n_consultas)]
+        exactos, latencias = consultar(rec, cat, gustos, metodo, k, exact=True)
+        r = {"items": len(rec.db[cat]), "listas": len(index.centroids), "exacto": bench_datos.resumen(latencias)}
+        for nprobe in nprobes:
+            index.nprobe = nprobe
+            aproximados, latencias = consultar(rec, cat, gustos, metodo, k, exact=False)
+            r[f"nprobe={nprobe}"] = {
+                "recall": round(recall_at_k(exactos, aproximados), 3),
+                **bench_datos.resumen(latencias),
+            }
+        index.nprobe = rec.ann_nprobe
+        resultados[cat] = r
+    return resultados
+
+
+def minimo_nprobe(r: Dict, objetivo: float) -> Optional[int]:
+    for clave, s in r.items():
+        if clave.startswith("nprobe=") and s["recall"] >= objetivo:
+            return int(clave.split("=")[1])
+    return None
+
+
+def mostrar(nombre: str, resultados: Dict, objetivo: Optional[float]) -> None:
+    print(nombre)
+    for cat, r in resultados.items():
+        print(f"  {cat}: {r['items']} items, {r['listas']} listas, exacto p50 {r['exacto']['p50_ms']} ms")
+        for clave, s in r.items():
+            if clave.startswith("nprobe="):
+                print(f"    {clave:<11} recall {s['recall']:.3f}  p50 {s['p50_ms']} ms  p99 {s['p99_ms']} ms")
+        if objetivo is not None:
+            print(f"    recall >= {objetivo}: nprobe {minimo_nprobe(r, objetivo) or 'no alcanzado'}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="*", default=[], help="catálogos sintéticos (por defecto, el real)")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=NPROBES)
+    parser.add_argument("--metodo", choices=["cbf", "multimodal"], default="multimodal")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--min-items", type=int, default=1000, help="categorías con menos elementos no se indexan")
+    parser.add_argument("--objetivo", type=float, default=0.95, help="recall buscado")
+    parser.add_argument("--salida", help="archivo JSON con los resultados")
+    args = parser.parse_args()
+    catalogos = {"real": {"db": os.path.join(os.path.dirname(__file__), "entertainment_db.col"), "artefactos": ARTIFACTS_DIR}}
+    if args.tamanos:
+        catalogos = {str(n): bench_datos.catalogo_sintetico(n) for n in args.tamanos}
+    salida = {"metadatos": bench_datos.metadatos(), "metodo": args.metodo, "k": args.k, "catalogos": {}}
+    for nombre, paths in catalogos.items():
+        rec = MultimodalRecommender(
+            paths["db"], artifacts_dir=paths["artefactos"], cache_size=0, ann=True, ann_min_items=args.min_items
+        )
+        resultados = medir(rec, sorted(args.nprobe), args.metodo, args.k, args.consultas)
+        mostrar(nombre, resultados, args.objetivo)
+        salida["catalogos"][nombre] = resultados
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(salida, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""Load generator for the API, in process, through its ASGI interface.
+
+The FastAPI app of ``main.py`` is started on a synthetic catalog (see
+``bench_datos.py``) with its lifespan (scoring pool included) and called
+directly as an ASGI application, without sockets or an HTTP client, so the
+numbers measure the app and not the network stack.  ``--concurrencia``
+coroutines send requests back to back for ``--duracion`` seconds, choosing
+the endpoint by the weights of ``--mezcla``:
+
+* ``recomendar``: ``POST /recomendar`` with two words of item names;
+* ``buscar``: ``POST /buscar`` with one word (file order, 20 results);
+* ``top10``: ``GET /top10/{categoria}``;
+* ``autocompletar``: ``GET /autocompletar/{categoria}`` with a name prefix;
+* ``similares``: ``GET /similares/{categoria}/{id}``.
+
+Every catalog size runs in its own process.  Reported per size and
+concurrency level: throughput, p50/p90/p99/max latency and errors (status
+other than 200), in total and per endpoint, and the peak RSS of the API
+process and of its scoring workers.  ``--salida`` writes them as JSON.
+
+Usage:
+    python bench_carga.py                                  # 10k items, 1/8/32 concurrent
+    python bench_carga.py --tamanos 10000 100000 --concurrencia 16 --duracion 30
+    python bench_carga.py --mezcla recomendar=1 --procesos 0 --salida carga.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import quote, urlencode
+
+import bench_datos
+
+MEZCLA = "recomendar=4,buscar=2,top10=2,autocompletar=1,similares=1"
+
+
+async def peticion(app, metodo: str, ruta: str, cuerpo=None, query=None) -> int:
+    """Send one request to the ASGI ``app`` and return the response status."""
+    body = json.dumps(cuerpo).encode("utf-8") if cuerpo is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": metodo,
+        "scheme": "http",
+        "path": ruta,
+        "raw_path": quote(ruta).encode("ascii"),
+        "query_string": urlencode(query or {}).encode("ascii"),
+        "root_path": "",
+        "headers": [
+            (b"host", b"bench"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    pendiente = True
+    estado = 500
+
+    async def receive():
+        nonlocal pendiente
+        if pendiente:
+            pendiente = False
+            return {"type": "http.request", "body": body, "more_body": False}
+        # The client never disconnects; the app stops listening when it responds
+        await asyncio.Future()
+
+    async def send(mensaje):
+        nonlocal estado
+        if mensaje["type"] == "http.response.start":
+            estado = mensaje["status"]
+
+    await app(scope, receive, send)
+    return estado
+
+
+class Generador:
+    """Random requests of every kind of the mix, built from the catalog."""
+
+    def __init__(self, rec, categorias: List[str], seed: int = 0) -> None:
+        self.rng = random.Random(seed)
+        self.categorias = categorias
+        self.nombres: Dict[str, List[str]] = {}
+        self.ids: Dict[str, List[str]] = {}
+        for cat in categorias:
+            items = rec.db[cat]
+            muestra = [items[self.rng.randrange(len(items))] for _ in range(500)]
+            self.nombres[cat] = [item.get("nombre", "") for item in muestra]
+            self.ids[cat] = [item.get("id") for item in muestra]
+        self.palabras = {
+            cat: [w for nombre in nombres for w in nombre.split() if len(w) > 2] or ["a"]
+            for cat, nombres in self.nombres.items()
+        }
+
+    def crear(self, endpoint: str, cat: str) -> Tuple[str, str, object, object]:
+        """(method, path, JSON body, query parameters) of one request."""
+        rng = self.rng
+        if endpoint == "recomendar":
+            gustos = [rng.choice(self.palabras[cat]) for _ in range(2)]
+            return "POST", "/recomendar", {"categoria": cat, "gustos": gustos}, None
+        if endpoint == "buscar":
+            consulta = {"categoria": cat, "query": rng.choice(self.palabras[cat]), "limite": 20}
+            return "POST", "/buscar", consulta, None
+        if endpoint == "top10":
+            return "GET", f"/top10/{cat}", None, None
+        if endpoint == "autocompletar":
+            return "GET", f"/autocompletar/{cat}", None, {"q": rng.choice(self.nombres[cat])[:3]}
+        if endpoint == "similares":
+            return "GET", f"/similares/{cat}/{rng.choice(self.ids[cat])}", None, None
+        raise ValueError(f"Endpoint desconocido: {endpoint}")
+
+
+async def nivel(app, generador: Generador, mezcla: Dict[str, float], concurrencia: int, duracion: float) -> Dict:
+    """Run ``concurrencia`` clients for ``duracion`` seconds and summarize."""
+    endpoints = list(mezcla)
+    pesos = [mezcla[e] for e in endpoints]
+    registros: List[Tuple[str, float, int]] = []
+    fin = time.perf_counter() + duracion
+
+    async def cliente():
+        rng = generador.rng
+        while time.perf_counter() < fin:
+            endpoint = rng.choices(endpoints, pesos)[0]
+            metodo, ruta, cuerpo, query = generador.crear(endpoint, rng.choice(generador.categorias))
+            inicio = time.perf_counter()
+            estado = await peticion(app, metodo, ruta, cuerpo, query)
+            registros.append((endpoint, time.perf_counter() - inicio, estado))
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concurrencia)))
+    total = time.perf_counter() - inicio
+
+    def resumir(filas):
+        return {
+            **bench_datos.resumen([lat for _, lat, _ in filas], total),
+            "errores": sum(1 for _, _, estado in filas if estado != 200),
+        }
+
+    return {
+        "concurrencia": concurrencia,
+        "duracion_s": round(total, 3),
+        "total": resumir(registros),
+        "endpoints": {e: resumir([r for r in registros if r[0] == e]) for e in endpoints},
+    }
+
+
+async def medir_async(conf: Dict) -> Dict:
+    import main  # after usar_catalogo: loads the synthetic catalog
+
+    rec = main.recomendador
+    categorias = [cat for cat in main.DATASET_PATHS if len(rec.db.get(cat, ()))]
+    generador = Generador(rec, categorias, seed=conf["items"])
+    inicio = time.perf_counter()
+    async with main.ciclo_de_vida(main.app):
+        arranque = time.perf_counter() - inicio
+        # Warm-up: the first call of each kind and category builds its index
+        # (CSV search, prefixes, item positions), which is not steady state
+        inicio = time.perf_counter()
+        for endpoint in conf["mezcla"]:
+            for cat in categorias:
+                await peticion(main.app, *generador.crear(endpoint, cat))
+        calentamiento = time.perf_counter() - inicio
+        niveles = [
+            await nivel(main.app, generador, conf["mezcla"], c, conf["duracion"]) for c in conf["concurrencia"]
+        ]
+        rss = bench_datos.pico_rss_mb()
+    return {
+        "items": conf["items"],
+        "procesos": main.PROCESOS_RECOMENDACION,
+        "arranque_s": round(arranque, 3),
+        "calentamiento_s": round(calentamiento, 3),
+        "niveles": niveles,
+        "pico_rss_mb": rss,
+    }
+
+
+def medir(conf: Dict) -> Dict:
+    """Load test of the catalog of ``conf["items"]`` items, in this process."""
+    bench_datos.usar_catalogo(bench_datos.catalogo_sintetico(conf["items"]))
+    if conf["procesos"] is not None:
+        os.environ["NEA_PROCESOS"] = str(conf["procesos"])
+    return asyncio.run(medir_async(conf))
+
+
+def leer_mezcla(texto: str) -> Dict[str, float]:
+    mezcla = {}
+    for parte in texto.split(","):
+        endpoint, _, peso = parte.partition("=")
+        mezcla[endpoint.strip()] = float(peso or 1)
+    return mezcla
+
+
+def mostrar(r: Dict) -> None:
+    rss = r["pico_rss_mb"]
+    print(
+        f"{r['items']:>9} items  {r['procesos']} procesos  arranque {r['arranque_s']} s  "
+        f"pico RSS {rss['proceso']} MB (+{rss['hijos']} MB en procesos de puntuación)"
+    )
+    for n in r["niveles"]:
+        t = n["total"]
+        print(
+            f"{'':>9} concurrencia {n['concurrencia']:>3}: {t['ops_s']} pet/s  p50 {t['p50_ms']} ms  "
+            f"p90 {t['p90_ms']} ms  p99 {t['p99_ms']} ms  máx {t['max_ms']} ms  errores {t['errores']}"
+        )
+        for endpoint, s in n["endpoints"].items():
+            if s["n"]:
+                print(f"{'':>13} {endpoint:<14} {s['n']:>7}  p50 {s['p50_ms']} ms  p99 {s['p99_ms']} ms")
+
+
+def main() -> int:
+    if sys.argv[1:2] == ["--hijo"]:
+        print(json.dumps(medir(json.loads(sys.argv[2]))))
+        return 0
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--concurrencia", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duracion", type=float, default=10.0, help="segundos por nivel de concurrencia")
+    parser.add_argument("--mezcla", default=MEZCLA, help=f"endpoint=peso separados por comas (por defecto {MEZCLA})")
+    parser.add_argument("--procesos", type=int, help="NEA_PROCESOS de la API (0 = hilos)")
+    parser.add_argument("--salida", help="archivo JSON con los resultados")
+    args = parser.parse_args()
+    conf = {
+        "concurrencia": args.concurrencia,
+        "duracion": args.duracion,
+        "mezcla": leer_mezcla(args.mezcla),
+        "procesos": args.procesos,
+    }
+    resultados = []
+    for n in args.tamanos:
+        # Genera el catálogo aquí, para que su tiempo y memoria no cuenten en la medición
+        bench_datos.catalogo_sintetico(n)
+        r = bench_datos.en_subproceso(__file__, [json.dumps({**conf, "items": n})])
+        mostrar(r)
+        resultados.append(r)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(
+                {"metadatos": bench_datos.metadatos(), "configuracion": conf, "resultados": resultados},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
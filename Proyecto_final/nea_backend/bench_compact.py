@@ -0,0 +1,157 @@
+"""Benchmark of the recommender's compact mode (float32 TF‑IDF and ratings).
+
+For every catalog size a synthetic category is generated (names, genres,
+tags and synopses drawn from a Zipf-distributed vocabulary) and the
+recommender is built twice, once in the default mode and once with
+``compact=True``.  Each build runs in its own process so the resident memory
+(RSS) of one does not leak into the other.  Reported per size and mode:
+
+* ``rss_mb``: RSS growth from the catalog alone to the built recommender;
+* ``peak_rss_mb``: peak RSS of the process (includes fitting);
+* ``arrays_mb``: ``MultimodalRecommender.memory_usage()["total"]``;
+* ``build_s`` and the p50/p95 latency of ``recommend`` (cache disabled);
+* ``top10_agreement``: share of the default top 10 that compact mode returns.
+
+Usage:
+    python bench_compact.py                         # 10k, 100k and 1M items
+    python bench_compact.py --tamanos 10000 50000 --consultas 100
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+VOCABULARIO = 20_000
+GENEROS = ["Acción", "Aventura", "Drama", "Comedia", "Terror", "Romance", "Misterio", "Historia"]
+
+
+def rss_mb() -> Optional[float]:
+    """Current resident memory of this process (Linux), in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return None
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def palabras(rng: np.random.Generator, n: int) -> List[str]:
+    ids = np.minimum(rng.zipf(1.3, size=n), VOCABULARIO)
+    return [f"w{i}" for i in ids]
+
+
+def catalogo_sintetico(n: int, seed: int = 0) -> Dict[str, List[Dict]]:
+    rng = np.random.default_rng(seed)
+    words = iter(palabras(rng, n * 26))
+    genres = rng.integers(0, len(GENEROS), size=n)
+    ratings = np.round(rng.uniform(1.0, 5.0, size=n), 2)
+    items = []
+    for i in range(n):
+        items.append(
+            {
+                "id": str(i),
+                "nombre": " ".join(next(words) for _ in range(3)),
+                "calificacion": float(ratings[i]),
+                "reseña": GENEROS[genres[i]],
+                "sinopsis": " ".join(next(words) for _ in range(20)),
+                "tags": [next(words) for _ in range(3)],
+                "link": "",
+                "num_reseñas": i % 5000,
+            }
+        )
+    return {"libros": items}
+
+
+def consultas(n: int, seed: int = 1) -> List[List[str]]:
+    rng = np.random.default_rng(seed)
+    return [palabras(rng, 3) for _ in range(n)]
+
+
+def medir(n: int, compact: bool, n_consultas: int) -> Dict:
+    """Build one recommender in this process and measure it."""
+    from recommender import MultimodalRecommender
+
+    db = catalogo_sintetico(n)
+    base = rss_mb()
+    start = time.perf_counter()
+    rec = MultimodalRecommender("", db=db, cache_size=0, compact=compact)
+    build = time.perf_counter() - start
+    after = rss_mb()
+    latencies = []
+    ranked = []
+    for gustos in consultas(n_consultas):
+        start = time.perf_counter()
+        items = rec.recommend("libros", gustos, top_k=10)
+        latencies.append(time.perf_counter() - start)
+        ranked.append([item["id"] for item in items])
+    return {
+        "items": n,
+        "compact": compact,
+        "rss_mb": None if base is None else round(after - base, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "arrays_mb": round(rec.memory_usage()["total"] / 2**20, 1),
+        "build_s": round(build, 2),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 2),
+        "ranked": ranked,
+    }
+
+
+def en_proceso(n: int, compact: bool, n_consultas: int) -> Dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--hijo", str(n), str(int(compact)), str(n_consultas)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    if sys.argv[1:2] == ["--hijo"]:
+        n, compact, n_consultas = map(int, sys.argv[2:5])
+        print(json.dumps(medir(n, bool(compact), n_consultas)))
+        return 0
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--consultas", type=int, default=50)
+    parser.add_argument("--salida", help="archivo JSON con los resultados")
+    args = parser.parse_args()
+    resultados = []
+    for n in args.tamanos:
+        normal = en_proceso(n, False, args.consultas)
+        compacto = en_proceso(n, True, args.consultas)
+        hits = [
+            len(set(a) & set(b)) / len(a)
+            for a, b in zip(normal.pop("ranked"), compacto.pop("ranked"))
+            if a
+        ]
+        compacto["top10_agreement"] = round(float(np.mean(hits)), 4) if hits else 1.0
+        for r in (normal, compacto):
+            print(
+                f"{r['items']:>9} items  {'compacto' if r['compact'] else 'normal  '}  "
+                f"RSS +{r['rss_mb']} MB (pico {r['peak_rss_mb']} MB)  arreglos {r['arrays_mb']} MB  "
+                f"construcción {r['build_s']} s  p50 {r['p50_ms']} ms  p95 {r['p95_ms']} ms"
+            )
+        print(f"{'':>9} coincidencia top 10: {compacto['top10_agreement']:.2%}")
+        resultados.extend([normal, compacto])
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""Synthetic catalogs and helpers shared by the benchmarks.
+
+:func:`catalogo_sintetico` builds a catalog of ``n`` items in total from the
+schemas of the real datasets: for every category whose CSV is in
+``datasets/``, rows are sampled from it and their name is numbered, so every
+row (and item id) is distinct.  The CSVs are imported with the same pipeline
+as ``import_datasets.py`` and the recommender bundle is fitted once, so the
+benchmarks measure serving, not the first fit.  Everything is kept under
+``bench_data/<n>/`` and reused by later runs::
+
+    bench_data/10000/
+        datasets/        CSVs with the real file names and columns
+        catalogo.col     columnar catalog
+        artifacts/       TF‑IDF bundle of the catalog
+
+The benchmark scripts (``bench_micro.py``, ``bench_carga.py``) report
+latencies with :func:`resumen` and the environment with :func:`metadatos`.
+"""
+
+import csv
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+import import_datasets as imp
+from columnar import write_catalog
+
+BENCH_DIR = os.path.join(os.path.dirname(__file__), "bench_data")
+
+
+def leer_filas(path: str) -> List[List[str]]:
+    """Header and rows of a real dataset (UTF-8, or latin-1 like the import)."""
+    for encoding in ("utf-8", "latin-1"):
+        try:
+            with open(path, encoding=encoding) as f:
+                return [row for row in csv.reader(f) if row]
+        except UnicodeDecodeError:
+            continue
+    return []
+
+
+def escribir_csv(path: str, header: List[str], rows: List[List[str]], n: int, name_col: int, seed: int) -> None:
+    """Write ``n`` rows sampled from ``rows``; repeated rows get a numbered name."""
+    rng = random.Random(seed)
+    order = list(range(len(rows)))
+    rng.shuffle(order)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(n):
+            row = list(rows[order[i % len(rows)]])
+            copy = i // len(rows)
+            if copy:
+                row[name_col] = f"{row[name_col]} ({copy})"
+            writer.writerow(row)
+
+
+def catalogo_sintetico(n: int, directorio: str = BENCH_DIR, seed: int = 0) -> Dict[str, str]:
+    """Build (or reuse) a synthetic catalog of ``n`` items.
+
+    Returns the paths ``db``, ``datasets`` and ``artefactos``, which
+    ``main.py`` reads from ``NEA_DB``, ``NEA_DATASETS`` and ``NEA_ARTEFACTOS``.
+    """
+    base = os.path.join(directorio, str(n))
+    paths = {
+        "db": os.path.join(base, "catalogo.col"),
+        "datasets": os.path.join(base, "datasets"),
+        "artefactos": os.path.join(base, "artifacts"),
+    }
+    listo = os.path.join(base, "listo.json")
+    if os.path.exists(listo):
+        return paths
+    os.makedirs(paths["datasets"], exist_ok=True)
+    fuentes = {}
+    for cat, conf in imp.CONFIG.items():
+        real = os.path.join(imp.DATASETS_PATH, conf["csv"])
+        if os.path.exists(real):
+            fuentes[cat] = (conf, leer_filas(real))
+    sizes = {cat: n // len(fuentes) + (1 if i < n % len(fuentes) else 0) for i, cat in enumerate(fuentes)}
+    print(f"[INFO] Generando catálogo sintético de {n} elementos en {base}...")
+    for i, (cat, (conf, filas)) in enumerate(fuentes.items()):
+        header = filas[0]
+        name_col = header.index(conf["fields"]["nombre"])
+        # Only well-formed rows with a name, so every generated row yields an item
+        rows = [r for r in filas[1:] if len(r) == len(header) and r[name_col].strip()]
+        escribir_csv(
+            os.path.join(paths["datasets"], conf["csv"]), header, rows, sizes[cat], name_col, seed + i
+        )
+
+    def items(cat: str):
+        conf = imp.CONFIG[cat]
+        path = os.path.join(paths["datasets"], conf["csv"])
+        if not os.path.exists(path):
+            return
+        for line in imp.iter_lines(cat, path, conf, "utf-8"):
+            yield json.loads(line)
+
+    write_catalog(paths["db"], {cat: items(cat) for cat in imp.CONFIG})
+    print("[INFO] Ajustando el recomendador del catálogo sintético...")
+    from recommender import MultimodalRecommender
+
+    MultimodalRecommender(paths["db"], artifacts_dir=paths["artefactos"], cache_size=0)
+    with open(listo, "w", encoding="utf-8") as f:
+        json.dump({"items": sizes, "seed": seed}, f, ensure_ascii=False, indent=2)
+    return paths
+
+
+def usar_catalogo(paths: Dict[str, str]) -> None:
+    """Make ``main.py`` (imported afterwards) serve the catalog ``paths``."""
+    os.environ["NEA_DB"] = paths["db"]
+    os.environ["NEA_DATASETS"] = paths["datasets"]
+    os.environ["NEA_ARTEFACTOS"] = paths["artefactos"]
+
+
+def resumen(latencias: Sequence[float], duracion: Optional[float] = None) -> Dict:
+    """Throughput and latency percentiles (ms) of a list of durations in seconds.
+
+    ``duracion`` is the wall time of the run (concurrent calls overlap);
+    without it the calls are assumed to have run one after the other.
+    """
+    if not len(latencias):
+        return {"n": 0}
+    lat = np.asarray(latencias) * 1000
+    total = duracion if duracion is not None else float(np.sum(latencias))
+    return {
+        "n": int(len(lat)),
+        "ops_s": round(len(lat) / total, 2) if total > 0 else None,
+        "media_ms": round(float(lat.mean()), 3),
+        "p50_ms": round(float(np.percentile(lat, 50)), 3),
+        "p90_ms": round(float(np.percentile(lat, 90)), 3),
+        "p99_ms": round(float(np.percentile(lat, 99)), 3),
+        "max_ms": round(float(lat.max()), 3),
+    }
+
+
+def pico_rss_hijos_mb() -> Optional[float]:
+    """Sum of the peak RSS of the live child processes (Linux), in MB.
+
+    The scoring pool workers are still running when the load test ends, so
+    ``RUSAGE_CHILDREN`` (finished children only) would not count them.
+    """
+    try:
+        pids = set()
+        for tid in os.listdir("/proc/self/task"):
+            with open(f"/proc/self/task/{tid}/children") as f:
+                pids.update(f.read().split())
+        total = 0
+        for pid in pids:
+            with open(f"/proc/{pid}/status") as f:
+                total += next((int(line.split()[1]) for line in f if line.startswith("VmHWM:")), 0)
+    except OSError:
+        return None
+    return round(total / 2**10, 1)
+
+
+def pico_rss_mb() -> Dict[str, Optional[float]]:
+    """Peak RSS of this process and of its live children, in MB."""
+    unidad = 2**20 if sys.platform == "darwin" else 2**10  # ru_maxrss: bytes on macOS, KB on Linux
+    return {
+        "proceso": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unidad, 1),
+        "hijos": pico_rss_hijos_mb(),
+    }
+
+
+def metadatos() -> Dict:
+    """Where and on what code a run was made, to compare result files."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def en_subproceso(script: str, args: List[str]) -> Dict:
+    """Run ``script --hijo args`` and return the JSON it prints last.
+
+    Each catalog size runs in its own process, so peak RSS is per size.
+    """
+    out = subprocess.run(
+        [sys.executable, script, "--hijo", *args], check=True, stdout=subprocess.PIPE, text=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
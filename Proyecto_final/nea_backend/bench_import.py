@@ -0,0 +1,116 @@
+"""Benchmark of the category import: baseline importer vs. columnar.
+
+Imports one category with the importer as it was before the columnar path
+(copied below: ``csv.DictReader``, one ``build_item`` and one seeded
+``random.Random`` per row, one ``json.dumps`` per item) and with the
+columnar path used by ``import_datasets.py`` (``iter_lines``), checks that
+both write exactly the same lines and prints the best time of each.
+
+Usage:
+    python bench_import.py                  # libros (books.csv)
+    python bench_import.py videojuegos --repeat 5
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+import import_datasets as imp
+
+
+# --- Baseline importer, row by row ---
+def build_item(row: Dict, conf: Dict, rng: random.Random) -> Optional[Dict]:
+    """Convert one CSV row into a catalog item (``None`` if it has no name)."""
+    item: Dict = {}
+    for k, v in conf["fields"].items():
+        if v == "":
+            item[k] = ""
+        elif k == "tags":
+            item[k] = imp.parse_tags(row.get(v, ""))
+        elif k == "calificacion":
+            # Use provided rating if available; otherwise assign random between 2.4 and 5.0
+            try:
+                rating_str = row.get(v, "")
+                item[k] = float(rating_str) if rating_str else round(rng.uniform(2.4, 5.0), 2)
+            except ValueError:
+                item[k] = round(rng.uniform(2.4, 5.0), 2)
+        else:
+            item[k] = row.get(v, "")
+    # Normalize the genre/reseña field
+    genero_raw = (item.get("reseña", "") or "").lower()
+    genero_final: List[str] = []
+    for g in imp.GENEROS_COMUNES:
+        if g in genero_raw:
+            genero_final.append(g.capitalize())
+    if not genero_final and genero_raw:
+        genero_final = [genero_raw.capitalize()]
+    item["reseña"] = ", ".join(genero_final) if genero_final else "N/A"
+    # Assign a random number of reviews to simulate popularity
+    item["num_reseñas"] = rng.randint(10, 5000)
+    if item.get("nombre", "").strip():
+        return item
+    return None
+
+
+def iter_items(cat: str, path: str, conf: Dict, encoding: str) -> Iterator[Dict]:
+    """Stream the items of a CSV file one row at a time."""
+    seen: Dict[str, int] = {}
+    with open(path, encoding=encoding) as f:
+        for row in csv.DictReader(f):
+            item = build_item(row, conf, random.Random(imp.row_seed(cat, imp.row_key(row))))
+            if item is not None:
+                # Duplicated rows get a numbered id so every id is unique
+                base_id = imp.row_id(cat, row)
+                seen[base_id] = seen.get(base_id, 0) + 1
+                item_id = base_id if seen[base_id] == 1 else f"{base_id}-{seen[base_id]}"
+                yield {"id": item_id, **item}
+
+
+def best_time(fn: Callable[[], List[str]], repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("categoria", nargs="?", default="libros", choices=sorted(imp.CONFIG))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    cat = args.categoria
+    conf = imp.CONFIG[cat]
+    path = os.path.join(imp.DATASETS_PATH, conf["csv"])
+    if not os.path.exists(path):
+        print(f"[ERROR] No se encontró el archivo {path}")
+        return 1
+
+    def por_filas() -> List[str]:
+        return [
+            json.dumps(item, ensure_ascii=False) + "\n"
+            for item in iter_items(cat, path, conf, "utf-8")
+        ]
+
+    def por_columnas() -> List[str]:
+        return list(imp.iter_lines(cat, path, conf, "utf-8"))
+
+    t_filas, filas = best_time(por_filas, args.repeat)
+    t_columnas, columnas = best_time(por_columnas, args.repeat)
+    if filas != columnas:
+        print("[ERROR] Las dos importaciones no producen las mismas líneas")
+        return 1
+    print(f"{cat} ({conf['csv']}): {len(columnas)} elementos, salida idéntica")
+    print(f"  por filas (original): {t_filas * 1000:8.1f} ms")
+    print(f"  por columnas:         {t_columnas * 1000:8.1f} ms  ({t_filas / t_columnas:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
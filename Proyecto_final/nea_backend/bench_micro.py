@@ -0,0 +1,152 @@
+"""Microbenchmarks of the recommender and the search over synthetic catalogs.
+
+For every catalog size (see ``bench_datos.py``), in its own process so the
+peak RSS is per size, it times:
+
+* ``_load_data``: fitting TF‑IDF from the catalog (``frio``) and loading
+  the persisted bundle (``artefactos``);
+* ``recommend`` with each method (``cbf``, ``cf``, ``multimodal``), cache off;
+* ``top10`` and ``search`` (BM25; building the index is reported apart);
+* the CSV search of ``/buscar`` (``main.buscar_pagina``, the successor of
+  ``buscar_en_csv``) in file order and by relevance, index build apart and
+  result cache off.
+
+Results (ops/s and p50/p90/p99/max latency per operation, peak RSS) are
+printed and, with ``--salida``, written as JSON so runs can be compared.
+
+Usage:
+    python bench_micro.py                            # 10k, 100k and 1M items
+    python bench_micro.py --tamanos 10000 --consultas 100 --salida micro.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Sequence
+
+import bench_datos
+
+METODOS = ["cbf", "cf", "multimodal"]
+
+
+def cronometrar(fn: Callable, argumentos: Sequence) -> Dict:
+    """Call ``fn(*args)`` for every ``args`` and summarize the latencies."""
+    latencias = []
+    for args in argumentos:
+        inicio = time.perf_counter()
+        fn(*args)
+        latencias.append(time.perf_counter() - inicio)
+    return bench_datos.resumen(latencias)
+
+
+def una_vez(fn: Callable, *args) -> float:
+    inicio = time.perf_counter()
+    fn(*args)
+    return round(time.perf_counter() - inicio, 4)
+
+
+def palabras(rec, categorias: List[str], rng: random.Random) -> Dict[str, List[str]]:
+    """Words of the names of a sample of items, to build the queries from."""
+    vocab = {}
+    for cat in categorias:
+        items = rec.db[cat]
+        muestra = [items[rng.randrange(len(items))].get("nombre", "") for _ in range(200)]
+        vocab[cat] = [w for nombre in muestra for w in nombre.split() if len(w) > 2] or ["a"]
+    return vocab
+
+
+def medir(n: int, n_consultas: int) -> Dict:
+    """Run every microbenchmark on the catalog of ``n`` items, in this process."""
+    bench_datos.usar_catalogo(bench_datos.catalogo_sintetico(n))
+    import main  # after usar_catalogo: loads the synthetic catalog
+
+    rec = main.recomendador
+    rec.cache = None
+    categorias = [cat for cat in main.DATASET_PATHS if len(rec.db.get(cat, ()))]
+    rng = random.Random(n)
+    vocab = palabras(rec, categorias, rng)
+    gustos = [
+        (cat, [rng.choice(vocab[cat]) for _ in range(2)])
+        for cat in (rng.choice(categorias) for _ in range(n_consultas))
+    ]
+    resultados = {"items": n}
+
+    # _load_data: without artifacts it fits TF-IDF; with them it only maps the bundle
+    artefactos = rec.artifacts_dir
+    rec.artifacts_dir = None
+    frio = una_vez(rec._load_data, False)
+    rec.artifacts_dir = artefactos
+    resultados["_load_data"] = {
+        "frio_s": frio,
+        "artefactos": cronometrar(rec._load_data, [(False,)] * 3),
+    }
+
+    for metodo in METODOS:
+        resultados[f"recommend[{metodo}]"] = cronometrar(
+            rec.recommend, [(cat, g, metodo) for cat, g in gustos]
+        )
+    resultados["top10"] = cronometrar(rec.top10, [(cat,) for cat, _ in gustos])
+
+    consultas = [(cat, g[0]) for cat, g in gustos]
+    construccion = {cat: una_vez(rec.search, cat, "") for cat in categorias}
+    resultados["search"] = {"construccion_s": construccion, **cronometrar(rec.search, consultas)}
+
+    # The CSV index is built on the first search and its BM25 ranking on the first by relevance
+    construccion = {
+        cat: una_vez(main.buscar_pagina, cat, vocab[cat][0], None, None, 1, None, "relevancia")
+        for cat in categorias
+    }
+    resultados["buscar_pagina"] = {"construccion_s": construccion}
+    # Like rec.cache above: every query is computed, none served from the cache
+    for index in main.indices_csv.indexes():
+        index.cache = None
+    for orden in ("archivo", "relevancia"):
+        resultados["buscar_pagina"][orden] = cronometrar(
+            lambda cat, q, orden=orden: main.buscar_pagina(cat, q, limite=50, orden=orden), consultas
+        )
+    resultados["pico_rss_mb"] = bench_datos.pico_rss_mb()["proceso"]
+    return resultados
+
+
+def mostrar(r: Dict) -> None:
+    print(f"{r['items']:>9} items  pico RSS {r['pico_rss_mb']} MB")
+    print(f"{'':>9} _load_data  frío {r['_load_data']['frio_s']} s  "
+          f"artefactos p50 {r['_load_data']['artefactos']['p50_ms']} ms")
+    filas = [(k, v) for k, v in r.items() if isinstance(v, dict) and "p50_ms" in v]
+    filas += [(f"buscar_pagina[{orden}]", r["buscar_pagina"][orden]) for orden in ("archivo", "relevancia")]
+    for nombre, s in filas:
+        print(
+            f"{'':>9} {nombre:<24} {s['ops_s']:>9} ops/s  p50 {s['p50_ms']} ms  "
+            f"p90 {s['p90_ms']} ms  p99 {s['p99_ms']} ms  máx {s['max_ms']} ms"
+        )
+
+
+def main() -> int:
+    if sys.argv[1:2] == ["--hijo"]:
+        n, n_consultas = map(int, sys.argv[2:4])
+        print(json.dumps(medir(n, n_consultas)))
+        return 0
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--consultas", type=int, default=200)
+    parser.add_argument("--salida", help="archivo JSON con los resultados")
+    args = parser.parse_args()
+    resultados = []
+    for n in args.tamanos:
+        # Genera el catálogo aquí, para que su tiempo y memoria no cuenten en la medición
+        bench_datos.catalogo_sintetico(n)
+        r = bench_datos.en_subproceso(__file__, [str(n), str(args.consultas)])
+        mostrar(r)
+        resultados.append(r)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(
+                {"metadatos": bench_datos.metadatos(), "resultados": resultados}, f, ensure_ascii=False, indent=2
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""BM25 ranked retrieval with MaxScore-style early termination.
+
+Substring search returns every match in file order, so clients fetch all of
+them to sort by themselves.  :class:`BM25Index` ranks documents by Okapi
+BM25 instead and returns only the top ``k``:
+
+* documents are tokenised with the analyzer of the recommender's
+  ``TfidfVectorizer`` (lower case, ``\\b\\w\\w+\\b`` tokens), so search and
+  recommendations agree on what a term is;
+* the BM25 contribution ("impact") of every term in every document is
+  computed once at build time and stored as a CSC matrix, i.e. one sorted
+  posting list of ``(document, impact)`` per term, plus the maximum impact of
+  each term;
+* :meth:`BM25Index.top_k` processes the query terms from the highest upper
+  bound down.  As soon as the sum of the remaining upper bounds cannot lift
+  an unseen document to the current k-th score, the remaining lists are only
+  probed for the candidates already found, and candidates that cannot reach
+  the k-th score any more are dropped (MaxScore).  Results are exact;
+* filters are boolean masks over the documents ("bitsets"), applied to each
+  posting list before scoring.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+Analyzer = Callable[[str], List[str]]
+
+
+def default_analyzer() -> Analyzer:
+    """Tokenizer of the recommender's ``TfidfVectorizer`` (same settings)."""
+    return TfidfVectorizer(stop_words=None).build_analyzer()
+
+
+class BM25Index:
+    """Okapi BM25 index over a list of documents.
+
+    Parameters
+    ----------
+    documents: Iterable[str]
+        Text of each document; its position is the document id.
+    analyzer: callable, optional
+        Text -> list of terms (defaults to :func:`default_analyzer`).
+    k1, b: float, optional
+        BM25 term-frequency saturation and length normalisation.
+    """
+
+    def __init__(
+        self,
+        documents: Iterable[str],
+        analyzer: Optional[Analyzer] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ) -> None:
+        self.analyzer = analyzer or default_analyzer()
+        counter = CountVectorizer(analyzer=self.analyzer, dtype=np.float32)
+        try:
+            counts = counter.fit_transform(documents).tocsc()
+        except ValueError:
+            # No document has a single term
+            counts = None
+        if counts is None:
+            self.n_docs = 0
+            self.vocabulary = {}
+            self.impacts = None
+            self.max_impact = np.empty(0, dtype=np.float32)
+            return
+        self.n_docs = counts.shape[0]
+        self.vocabulary = counter.vocabulary_
+        doc_len = np.asarray(counts.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() or 1.0
+        df = np.diff(counts.indptr)
+        idf = np.log1p((self.n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        # BM25 contribution of every (document, term) pair
+        tf = counts.data
+        norm = (k1 * (1 - b + b * doc_len / avg_len)).astype(np.float32)
+        term_of_entry = np.repeat(np.arange(counts.shape[1]), df)
+        counts.data = idf[term_of_entry] * tf * (k1 + 1) / (tf + norm[counts.indices])
+        self.impacts = counts
+        self.max_impact = np.maximum.reduceat(counts.data, counts.indptr[:-1]).astype(np.float32)
+
+    def _postings(self, term: int) -> Tuple[np.ndarray, np.ndarray]:
+        lo, hi = self.impacts.indptr[term], self.impacts.indptr[term + 1]
+        return self.impacts.indices[lo:hi], self.impacts.data[lo:hi]
+
+    def query_terms(self, query: str) -> List[int]:
+        """Distinct vocabulary ids of the query's terms."""
+        ids = {self.vocabulary[t] for t in self.analyzer(query or "") if t in self.vocabulary}
+        return sorted(ids)
+
+    def top_k(
+        self, query: str, k: int, mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(document ids, scores)`` of the ``k`` best matches.
+
+        Only documents containing at least one query term are returned,
+        ordered by descending score and then by id.  ``mask`` (boolean,
+        one entry per document) excludes the documents where it is False.
+        """
+        terms = self.query_terms(query)
+        if k <= 0 or not terms:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+        # Highest upper bound first; remaining[i] bounds what terms i.. can add
+        terms.sort(key=lambda t: -self.max_impact[t])
+        remaining = np.cumsum(self.max_impact[terms][::-1])[::-1]
+        ids = np.empty(0, dtype=np.int32)
+        scores = np.empty(0, dtype=np.float32)
+        threshold = -np.inf
+        for i, term in enumerate(terms):
+            post_ids, post_scores = self._postings(term)
+            if mask is not None:
+                keep = mask[post_ids]
+                post_ids, post_scores = post_ids[keep], post_scores[keep]
+            if len(ids) >= k and remaining[i] < threshold:
+                # No unseen document can reach the top k: only score the
+                # candidates, and drop those that can no longer get there
+                alive = scores + remaining[i] >= threshold
+                ids, scores = ids[alive], scores[alive]
+                pos = np.searchsorted(post_ids, ids)
+                pos[pos == len(post_ids)] = 0
+                hit = post_ids[pos] == ids if len(post_ids) else np.zeros(len(ids), dtype=bool)
+                scores[hit] += post_scores[pos[hit]]
+            else:
+                merged = np.union1d(ids, post_ids)
+                merged_scores = np.zeros(len(merged), dtype=np.float32)
+                merged_scores[np.searchsorted(merged, ids)] += scores
+                merged_scores[np.searchsorted(merged, post_ids)] += post_scores
+                ids, scores = merged, merged_scores
+            if len(ids) >= k:
+                threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        order = np.lexsort((ids, -scores))[:k]
+        return ids[order].astype(np.int32), scores[order]
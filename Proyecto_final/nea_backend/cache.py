@@ -0,0 +1,104 @@
+"""Bounded LRU/TTL cache for query results of the NEA backend.
+
+Recommendation and search requests repeat a lot (the frontend sends a few
+preset genre chips), so their results are memoised by a normalised key.  A
+cache belongs to the object whose data it memoises (the recommender, a CSV
+index); when the catalog reloads a new object with an empty cache replaces
+the old one, so stale entries can never be served.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+_MISSING = object()
+
+
+class QueryCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds.
+
+    Parameters
+    ----------
+    maxsize: int, optional
+        Maximum number of entries; the least recently used one is evicted.
+    ttl: float, optional
+        Lifetime of an entry in seconds (``None`` keeps entries until
+        evicted).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 300.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value of ``key``, computing and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def merge_stats(caches: Iterable[QueryCache]) -> Dict[str, Any]:
+    """Add up the counters of several caches (e.g. one per category index)."""
+    total = {"size": 0, "maxsize": 0, "hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+    for cache in caches:
+        for key, value in cache.stats().items():
+            if key in total:
+                total[key] += value
+    lookups = total["hits"] + total["misses"]
+    total["hit_rate"] = total["hits"] / lookups if lookups else 0.0
+    return total
@@ -0,0 +1,155 @@
+"""Shared in-memory catalog store for the NEA backend.
+
+The API used to parse ``entertainment_db.json`` on every request.  This module
+loads the catalog once per process into an immutable :class:`CatalogSnapshot`
+(one item sequence per category; lazy views over a memory-mapped file for the
+columnar ``.col`` format) and keeps it in a :class:`CatalogStore`.  The
+store watches the file's ``mtime``/inode/size and, when they change, parses the
+new file off to the side and swaps the snapshot reference in a single
+assignment.  Request handlers grab one snapshot at the start and use it until
+they finish, so they never see a half-loaded database.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from columnar import COLUMNAR_EXT, ColumnarCatalog
+
+
+class CatalogSnapshot:
+    """Immutable view of the catalog at one point in time."""
+
+    def __init__(
+        self,
+        items: Dict[str, Sequence[Dict]],
+        version: int = 0,
+        signature: Optional[Tuple[int, int, int]] = None,
+        content_hash: Optional[str] = None,
+    ) -> None:
+        self.items = items
+        self.version = version
+        # (st_ino, st_mtime_ns, st_size) of the file this snapshot was read from
+        self.signature = signature
+        # SHA-256 of the file's bytes (keys the persisted recommender artifacts)
+        self.content_hash = content_hash
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self.items.keys())
+
+    def get(self, categoria: str) -> Sequence[Dict]:
+        """Return the item list of a category (empty if unknown)."""
+        return self.items.get(categoria, [])
+
+    def __contains__(self, categoria: str) -> bool:
+        return categoria in self.items
+
+
+def load_catalog(path: str) -> Tuple[Dict[str, Sequence], str]:
+    """Read a catalog file and return ``(items per category, content hash)``.
+
+    ``.col`` files (see ``columnar.py``) are memory-mapped and give lazy item
+    views; any other path is parsed as the legacy JSON database.
+    """
+    if path.endswith(COLUMNAR_EXT):
+        catalog = ColumnarCatalog(path)
+        return catalog.categories, catalog.content_hash
+    with open(path, "rb") as f:
+        data = f.read()
+    return json.loads(data), hashlib.sha256(data).hexdigest()
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class CatalogStore:
+    """Process-wide holder of the current :class:`CatalogSnapshot`.
+
+    Parameters
+    ----------
+    db_path: str
+        Path of the catalog written by ``import_datasets.py`` (columnar
+        ``.col`` file, or a legacy JSON database).
+    check_interval: float, optional
+        Minimum number of seconds between two ``stat`` calls on the file.
+        ``0`` checks on every access; ``None`` never checks, the file is
+        only reloaded after :meth:`request_reload` (pre-fork workers, whose
+        master decides when all of them switch).
+    """
+
+    def __init__(self, db_path: str, check_interval: Optional[float] = 1.0) -> None:
+        self.db_path = db_path
+        self.check_interval = check_interval
+        self._snapshot = CatalogSnapshot({})
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._reload_requested = False
+        self._listeners: List[Callable[[CatalogSnapshot], None]] = []
+        # Seconds the last successful load took (parsing or mapping the file)
+        self.last_load_seconds: Optional[float] = None
+        self.reload(force=True)
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Return the current snapshot, reloading first if the file changed."""
+        if self._reload_requested:
+            self._reload_requested = False
+            self.reload()
+            return self._snapshot
+        if self.check_interval is None:
+            return self._snapshot
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            if _file_signature(self.db_path) != self._snapshot.signature:
+                self.reload()
+        return self._snapshot
+
+    def request_reload(self) -> None:
+        """Make the next :meth:`snapshot` call check the file again.
+
+        Only sets a flag, so it is safe to call from a signal handler.
+        """
+        self._reload_requested = True
+
+    def add_listener(self, callback: Callable[[CatalogSnapshot], None]) -> None:
+        """Register a function called with every new snapshot after a reload."""
+        self._listeners.append(callback)
+
+    def reload(self, force: bool = False) -> bool:
+        """Parse the database again and swap it in.
+
+        Returns ``True`` when a new snapshot was installed.  If the file is
+        missing or cannot be parsed (e.g. it is being rewritten) the current
+        snapshot is kept and the next check tries again.
+        """
+        with self._lock:
+            signature = _file_signature(self.db_path)
+            if not force and signature == self._snapshot.signature:
+                return False
+            if signature is None:
+                if force:
+                    print(f"[ADVERTENCIA] No se encontró la base de datos {self.db_path}")
+                return False
+            start = time.perf_counter()
+            try:
+                items, content_hash = load_catalog(self.db_path)
+            except (OSError, ValueError) as e:
+                print(f"[ADVERTENCIA] No se pudo cargar {self.db_path}: {e}")
+                return False
+            self.last_load_seconds = time.perf_counter() - start
+            snapshot = CatalogSnapshot(items, self._snapshot.version + 1, signature, content_hash)
+            self._snapshot = snapshot
+        for callback in self._listeners:
+            callback(snapshot)
+        return True
@@ -0,0 +1,303 @@
+"""Compact columnar catalog format (``entertainment_db.col``).
+
+Parsing the pretty-printed JSON database turns every item into a Python dict,
+even to count items or read a single record.  This format stores each
+category column by column so a reader can memory-map the file and hand out
+lazy item views instead:
+
+* ``calificacion`` and ``num_reseñas`` (and any other numeric field) are
+  typed ``float64``/``int64`` arrays;
+* text fields are offset-encoded: one ``uint64`` offsets array (``n + 1``
+  entries) plus one UTF-8 byte blob;
+* ``tags`` are ids into a file-wide tag dictionary (itself a string column),
+  with their own offsets array.
+
+File layout::
+
+    b"NEACOL\\x00\\x01"            magic + format version
+    uint64 (little endian)        length of the JSON header
+    JSON header                   categories, fields and array locations
+    padding to 8 bytes
+    data section                  8-byte aligned arrays
+
+Opening a file only reads the header and creates NumPy views on a
+``np.memmap``, so it is close to O(1); values are decoded when an item
+field is read.  The header also stores the SHA‑256 of the data section,
+used as content hash (e.g. by ``artifacts.py``) without rereading the file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"NEACOL\x00\x01"
+COLUMNAR_EXT = ".col"
+_ALIGN = 8
+# Fields stored as typed arrays; every other scalar field is text
+NUMERIC_FIELDS = {"calificacion": "float64", "num_reseñas": "int64"}
+
+
+class _StringColumnWriter:
+    """Offsets in memory, UTF-8 bytes spooled to a temporary file."""
+
+    def __init__(self) -> None:
+        self.offsets = array("Q", [0])
+        self.blob: IO[bytes] = tempfile.TemporaryFile()
+
+    def append(self, value: str) -> None:
+        data = value.encode("utf-8")
+        self.blob.write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+
+
+class _DataWriter:
+    """Writes aligned arrays to the data section and hashes it on the way."""
+
+    def __init__(self, f: IO[bytes]) -> None:
+        self.f = f
+        self.pos = 0
+        self.hash = hashlib.sha256()
+
+    def _write(self, data: bytes) -> None:
+        self.f.write(data)
+        self.hash.update(data)
+        self.pos += len(data)
+
+    def _align(self) -> None:
+        pad = -self.pos % _ALIGN
+        if pad:
+            self._write(b"\0" * pad)
+
+    def array(self, values: array, dtype: str) -> List:
+        self._align()
+        start = self.pos
+        self._write(np.asarray(values, dtype=dtype).tobytes())
+        return [start, len(values), dtype]
+
+    def string_column(self, column: _StringColumnWriter) -> Dict:
+        offsets = self.array(column.offsets, "<u8")
+        self._align()
+        start = self.pos
+        column.blob.seek(0)
+        for chunk in iter(lambda: column.blob.read(1 << 20), b""):
+            self._write(chunk)
+        column.blob.close()
+        return {"offsets": offsets, "data": [start, self.pos - start, "u1"]}
+
+
+def _kind(field: str, value) -> str:
+    if isinstance(value, list):
+        return "tags"
+    return NUMERIC_FIELDS.get(field, "str")
+
+
+def write_catalog(path: str, categories: Dict[str, Iterable[Dict]]) -> str:
+    """Write a columnar catalog and return its content hash.
+
+    ``categories`` maps each category to an iterable of item dicts (e.g. a
+    generator over a JSON Lines shard); items are consumed one at a time.
+    The file is written next to ``path`` and renamed into place.
+    """
+    tag_ids: Dict[str, int] = {}
+    tag_names = _StringColumnWriter()
+    header: Dict = {"version": 1, "categories": {}}
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.TemporaryFile(dir=directory) as data_file:
+        data = _DataWriter(data_file)
+        for cat, items in categories.items():
+            fields: List[str] = []
+            kinds: Dict[str, str] = {}
+            columns: Dict[str, object] = {}
+            n = 0
+            for item in items:
+                if not fields:
+                    fields = list(item.keys())
+                    for field in fields:
+                        kinds[field] = _kind(field, item[field])
+                        if kinds[field] == "str":
+                            columns[field] = _StringColumnWriter()
+                        elif kinds[field] == "tags":
+                            columns[field] = (array("Q", [0]), array("I"))
+                        else:
+                            columns[field] = array("d" if kinds[field] == "float64" else "q")
+                for field in fields:
+                    value = item.get(field)
+                    kind = kinds[field]
+                    if kind == "str":
+                        columns[field].append("" if value is None else str(value))
+                    elif kind == "tags":
+                        offsets, ids = columns[field]
+                        for tag in value or []:
+                            if tag not in tag_ids:
+                                tag_ids[tag] = len(tag_ids)
+                                tag_names.append(tag)
+                            ids.append(tag_ids[tag])
+                        offsets.append(len(ids))
+                    elif kind == "float64":
+                        columns[field].append(float(value or 0))
+                    else:
+                        columns[field].append(int(value or 0))
+                n += 1
+            spec: Dict = {"n": n, "fields": fields, "columns": {}}
+            for field in fields:
+                kind = kinds[field]
+                if kind == "str":
+                    spec["columns"][field] = {"kind": kind, **data.string_column(columns[field])}
+                elif kind == "tags":
+                    offsets, ids = columns[field]
+                    spec["columns"][field] = {
+                        "kind": kind,
+                        "offsets": data.array(offsets, "<u8"),
+                        "ids": data.array(ids, "<u4"),
+                    }
+                else:
+                    dtype = "<f8" if kind == "float64" else "<i8"
+                    spec["columns"][field] = {"kind": kind, "values": data.array(columns[field], dtype)}
+            header["categories"][cat] = spec
+        header["tags"] = data.string_column(tag_names)
+        header["content_hash"] = data.hash.hexdigest()
+
+        raw_header = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        raw_header += b" " * (-(len(MAGIC) + 8 + len(raw_header)) % _ALIGN)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(MAGIC)
+                out.write(struct.pack("<Q", len(raw_header)))
+                out.write(raw_header)
+                data_file.seek(0)
+                shutil.copyfileobj(data_file, out, 1 << 20)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return header["content_hash"]
+
+
+class _StringColumn:
+    def __init__(self, offsets: np.ndarray, data: np.ndarray) -> None:
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def get(self, idx: int) -> str:
+        return self.data[self.offsets[idx]:self.offsets[idx + 1]].tobytes().decode("utf-8")
+
+
+class ItemView(Mapping):
+    """Read-only, dict-like view of one item; fields are decoded on access."""
+
+    __slots__ = ("_category", "_idx")
+
+    def __init__(self, category: "CategoryView", idx: int) -> None:
+        self._category = category
+        self._idx = idx
+
+    def __getitem__(self, field: str):
+        return self._category.value(field, self._idx)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._category.fields)
+
+    def __len__(self) -> int:
+        return len(self._category.fields)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class CategoryView(Sequence):
+    """Sequence of :class:`ItemView` backed by the memory-mapped columns."""
+
+    def __init__(self, catalog: "ColumnarCatalog", spec: Dict) -> None:
+        self._catalog = catalog
+        self._n = spec["n"]
+        self.fields: List[str] = spec["fields"]
+        self._columns: Dict[str, Tuple[str, object]] = {}
+        for field, col in spec["columns"].items():
+            kind = col["kind"]
+            if kind == "str":
+                column = _StringColumn(catalog._array(col["offsets"]), catalog._array(col["data"]))
+            elif kind == "tags":
+                column = (catalog._array(col["offsets"]), catalog._array(col["ids"]))
+            else:
+                column = catalog._array(col["values"])
+            self._columns[field] = (kind, column)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [ItemView(self, i) for i in range(*idx.indices(self._n))]
+        if idx < 0:
+            idx += self._n
+        if not 0 <= idx < self._n:
+            raise IndexError("item index out of range")
+        return ItemView(self, idx)
+
+    def value(self, field: str, idx: int):
+        kind, column = self._columns[field]
+        if kind == "str":
+            return column.get(idx)
+        if kind == "tags":
+            offsets, ids = column
+            names = self._catalog.tag_names
+            return [names[t] for t in ids[offsets[idx]:offsets[idx + 1]]]
+        value = column[idx]
+        return float(value) if kind == "float64" else int(value)
+
+    def column(self, field: str) -> Optional[np.ndarray]:
+        """Whole numeric column as a (memory-mapped) array, or ``None``."""
+        kind, column = self._columns.get(field, (None, None))
+        if kind in ("float64", "int64"):
+            return column
+        return None
+
+
+class ColumnarCatalog:
+    """Memory-mapped reader of a file written by :func:`write_catalog`."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._mm = np.memmap(path, dtype=np.uint8, mode="r")
+        if self._mm[:len(MAGIC)].tobytes() != MAGIC:
+            raise ValueError(f"Not a columnar catalog: {path}")
+        (header_len,) = struct.unpack("<Q", self._mm[len(MAGIC):len(MAGIC) + 8].tobytes())
+        start = len(MAGIC) + 8
+        header = json.loads(self._mm[start:start + header_len].tobytes())
+        self._data_start = start + header_len
+        self.content_hash: str = header["content_hash"]
+        tags = header["tags"]
+        self._tags = _StringColumn(self._array(tags["offsets"]), self._array(tags["data"]))
+        self._tag_names: Optional[List[str]] = None
+        self.categories: Dict[str, CategoryView] = {
+            cat: CategoryView(self, spec) for cat, spec in header["categories"].items()
+        }
+
+    def _array(self, spec: List) -> np.ndarray:
+        offset, count, dtype = spec
+        dtype = np.dtype(dtype)
+        lo = self._data_start + offset
+        return self._mm[lo:lo + count * dtype.itemsize].view(dtype)
+
+    @property
+    def tag_names(self) -> List[str]:
+        """The tag dictionary, decoded once on first use (it is small)."""
+        if self._tag_names is None:
+            self._tag_names = [self._tags.get(i) for i in range(len(self._tags))]
+        return self._tag_names
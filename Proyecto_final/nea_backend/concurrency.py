@@ -0,0 +1,107 @@
+"""Bounded execution of the expensive endpoints of the NEA backend.
+
+FastAPI runs sync handlers in one shared threadpool, so a burst of slow
+``/buscar`` or ``/recomendar`` calls could occupy every thread and delay even
+trivial requests.  Expensive work is instead sent to dedicated executors
+(a process pool for scoring, a small thread pool for CSV search) through an
+:class:`EndpointLimiter` per endpoint, which bounds how many calls of that
+endpoint run at once and how long a request may wait plus run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional
+
+
+class EndpointLimiter:
+    """Concurrency limit and timeout of one endpoint.
+
+    Parameters
+    ----------
+    max_concurrent: int
+        Calls of the endpoint running in the executor at the same time;
+        further calls wait for a free slot.
+    timeout: float, optional
+        Seconds a request may spend waiting for a slot and running before
+        :class:`asyncio.TimeoutError` is raised (``None`` waits forever).  A
+        task already running in a pool cannot be interrupted: the request
+        abandons it, but the task keeps its slot until it finishes, so timed
+        out calls never let more than ``max_concurrent`` tasks into the
+        executor.  ``abandoned`` counts those still running.
+    """
+
+    def __init__(self, max_concurrent: int, timeout: Optional[float] = None) -> None:
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.abandoned = 0
+        self.abandoned_total = 0
+
+    async def run(self, executor: Optional[Executor], fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` in ``executor`` within the limits."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(fn, *args, **kwargs)
+        started: List[asyncio.Future] = []
+
+        async def limited() -> Any:
+            self.waiting += 1
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self.waiting -= 1
+            self.running += 1
+            try:
+                future = loop.run_in_executor(executor, call)
+            except BaseException:
+                self._release(None)
+                raise
+            # The slot is freed when the task ends, not when the request does
+            future.add_done_callback(self._release)
+            started.append(future)
+            return await asyncio.shield(future)
+
+        try:
+            result = await asyncio.wait_for(limited(), self.timeout)
+        except BaseException as exc:
+            if isinstance(exc, asyncio.TimeoutError):
+                self.timeouts += 1
+            if started and not started[0].done():
+                self._abandon(started[0])
+            raise
+        self.completed += 1
+        return result
+
+    def _release(self, future: Optional[asyncio.Future]) -> None:
+        self.running -= 1
+        self._semaphore.release()
+
+    def _abandon(self, future: asyncio.Future) -> None:
+        self.abandoned += 1
+        self.abandoned_total += 1
+
+        def finished(future: asyncio.Future) -> None:
+            self.abandoned -= 1
+            # Nobody awaits it any more: retrieve its error so it is not logged as lost
+            if not future.cancelled():
+                future.exception()
+
+        future.add_done_callback(finished)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "timeout": self.timeout,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "abandoned": self.abandoned,
+            "abandoned_total": self.abandoned_total,
+        }
@@ -1,27 +1,67 @@
-"""Script for importing CSV datasets into entertainment_db.json.
+"""Script for importing CSV datasets into entertainment_db.col.
 
 This script reads several CSV files corresponding to different categories
-(videojuegos, peliculas, libros, musica) and converts them into a single JSON
-database used by the NEA recommender.  Each category has a configuration that
+(videojuegos, peliculas, libros, musica) and converts them into a single
+columnar catalog (see ``columnar.py``) used by the NEA recommender.  Each category has a configuration that
 maps the desired fields to columns in the CSV.  If a particular CSV file
-includes no rating column, the script assigns a random rating between 2.4 and
-5.0 as a placeholder.  You can customise the CONFIG dictionary below to
+includes no rating column, the script assigns a pseudo-random rating between
+2.4 and 5.0 as a placeholder.  You can customise the CONFIG dictionary below to
 support alternative datasets or new categories.
 
+Each category is imported in its own worker process and streamed in chunks
+of rows into a JSON Lines shard (``shards/<categoria>.jsonl``); the final
+database is then assembled from the shards one item at a time, so memory use
+stays flat regardless of the dataset size.  Each chunk is processed column
+by column (see ``build_chunk``): ratings are parsed with one NumPy cast,
+each genre is searched once over the whole column and the JSON lines are
+assembled from pre-encoded columns.
+
+After writing the database, the fitted TF‑IDF model of the recommender is
+saved under ``artifacts/`` (see ``artifacts.py``) so the API can start
+without refitting it, together with the precomputed nearest neighbours of
+every item (``/similares``).
+
+Re-running the script only re-imports the categories whose CSV changed
+(tracked in ``shards/manifest.json``).  Placeholder values are drawn from a
+generator seeded per row, so unchanged items keep them between runs, and a
+delta listing the changed categories lets the recommender update just those
+rows of its TF‑IDF artifacts.
+
 Usage:
-    python import_datasets.py
+    python import_datasets.py           # incremental
+    python import_datasets.py --full    # re-import every category
 """
 
 
+import bisect
 import csv
+import hashlib
+import itertools
 import json
 import os
 import random
-from typing import List, Dict
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from json.encoder import encode_basestring
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from columnar import ColumnarCatalog, write_catalog
 
 BASE_PATH = os.path.dirname(__file__)
-DB_PATH = os.path.join(BASE_PATH, "entertainment_db.json")
+DB_PATH = os.path.join(BASE_PATH, "entertainment_db.col")
 DATASETS_PATH = os.path.join(BASE_PATH, "datasets")
+# One JSON Lines file per category, written while the CSV is read
+SHARDS_PATH = os.path.join(BASE_PATH, "shards")
+# Source hash and item count of each imported category
+MANIFEST_PATH = os.path.join(SHARDS_PATH, "manifest.json")
+# Seed of the placeholder ratings/review counts (see row_seed)
+SEED = 0
+# Version of the item layout written to the shards; bumping it re-imports all
+SHARD_FORMAT = 2
+# Rows processed at a time by the columnar import (see read_chunks)
+CHUNK_ROWS = 20_000
 
 # Configuration of files and fields per category.  You can modify the
 # ``csv`` filenames to point to more recent datasets (e.g. movies_dataset.csv,
@@ -90,131 +130,548 @@ def parse_tags(value: str) -> List[str]:
     return [value.strip()]
 
 
-def import_category(cat: str, conf: Dict) -> List[Dict]:
-    """Import a single category from its CSV file."""
+GENEROS_COMUNES = [
+    "acción",
+    "aventura",
+    "deportes",
+    "estrategia",
+    "ficción",
+    "drama",
+    "comedia",
+    "fantasía",
+    "terror",
+    "romance",
+    "misterio",
+    "musical",
+    "historia",
+    "ciencia ficción",
+]
+
+
+def row_key(row: Dict) -> str:
+    """Content of a ``csv.DictReader`` row, as hashed by row_seed and row_id."""
+    return "\x1f".join(str(v) for v in row.values())
+
+
+def row_seed(cat: str, key: str) -> str:
+    """Seed of the ``random.Random`` that draws the placeholders of a row.
+
+    It combines ``SEED``, the category and the row's content, so an unchanged
+    row always gets the same placeholder rating and review count, whatever
+    else changed in the file or in other categories.
+    """
+    return f"{SEED}:{cat}:{key}"
+
+
+def row_id(cat: str, row: Dict) -> str:
+    """Stable identifier of an item, derived from its category and CSV row.
+
+    Unlike the position of the item in its category it does not change when
+    other rows are added or removed, so clients can keep it (``/similares``).
+    """
+    return key_id(cat, row_key(row))
+
+
+def key_id(cat: str, key: str) -> str:
+    return hashlib.sha1(f"{cat}:{key}".encode("utf-8")).hexdigest()[:16]
+
+
+# Mersenne Twister of ``random.Random``: state size and twist offset
+_MT_N = 624
+_MT_M = 397
+# Outputs drawn per row by seeded_draws: uniform() takes two and randint()
+# one per try; rows that need more are drawn with random.Random
+PLACEHOLDER_DRAWS = 12
+
+
+def _mt_initial_state() -> np.ndarray:
+    """State after ``init_genrand(19650218)``, where every seeding starts."""
+    mt = [19650218]
+    for i in range(1, _MT_N):
+        mt.append((1812433253 * (mt[-1] ^ (mt[-1] >> 30)) + i) & 0xFFFFFFFF)
+    return np.array(mt, dtype=np.uint32)
+
+
+_MT_INITIAL = _mt_initial_state()
+
+
+def _python_draws(seed: str, count: int) -> List[int]:
+    rng = random.Random(seed)
+    return [rng.getrandbits(32) for _ in range(count)]
+
+
+def seeded_draws(seeds: List[str], count: int = PLACEHOLDER_DRAWS) -> np.ndarray:
+    """First ``count`` outputs of ``random.Random(seed).getrandbits(32)`` for every seed.
+
+    Seeding hashes the string (SHA-512) and mixes the resulting key into the
+    624-word state in two passes of sequential steps, which is most of the
+    cost of a placeholder.  Here every step runs once for the whole chunk,
+    on a row of a ``(624, len(seeds))`` state matrix, and only the hashing
+    is done seed by seed.  Returns a ``(count, len(seeds))`` uint32 array.
+
+    Seeds whose key is longer than the state (over ~2.4 KB of row content)
+    take more mixing steps and are drawn with random.Random, as is the whole
+    chunk if its first seed does not match random.Random.
+    """
+    n = len(seeds)
+    if not n:
+        return np.zeros((count, 0), dtype=np.uint32)
+    sha512 = hashlib.sha512
+    raw = [b + sha512(b).digest() for b in map(str.encode, seeds)]
+    # Random.seed reads these bytes as a big-endian integer (seeds start with
+    # SEED, never with a zero byte) and feeds its 32-bit words from the least
+    # significant: pad each to whole words and read the reversed blob
+    pads = (b"", b"\0", b"\0\0", b"\0\0\0")
+    blob = b"".join([pads[-len(b) % 4] + b for b in reversed(raw)])[::-1]
+    words = np.frombuffer(blob, dtype="<u4")
+    lengths = (np.fromiter(map(len, raw), dtype=np.intp, count=n) + 3) // 4
+    offsets = np.cumsum(lengths) - lengths
+    long_keys = np.flatnonzero(lengths > _MT_N).tolist()
+    lengths = np.minimum(lengths, _MT_N)
+
+    # init_by_array, one step for every seed at a time
+    mt = np.repeat(_MT_INITIAL[:, None], n, axis=1)
+    mixed = np.empty(n, dtype=np.uint32)
+    key = np.empty(n, dtype=np.uint32)
+    j = np.zeros(n, dtype=np.intp)
+    i = 1
+    for _ in range(_MT_N):
+        np.take(words, offsets + j, out=key)
+        key += j.astype(np.uint32)
+        np.right_shift(mt[i - 1], 30, out=mixed)
+        mixed ^= mt[i - 1]
+        mixed *= np.uint32(1664525)
+        mt[i] ^= mixed
+        mt[i] += key
+        i += 1
+        if i == _MT_N:
+            mt[0] = mt[_MT_N - 1]
+            i = 1
+        j += 1
+        j[j == lengths] = 0
+    for _ in range(_MT_N - 1):
+        np.right_shift(mt[i - 1], 30, out=mixed)
+        mixed ^= mt[i - 1]
+        mixed *= np.uint32(1566083941)
+        mt[i] ^= mixed
+        mt[i] -= np.uint32(i)
+        i += 1
+        if i == _MT_N:
+            mt[0] = mt[_MT_N - 1]
+            i = 1
+    mt[0] = 0x80000000
+
+    # First outputs: only the first ``count`` words of the twist are needed
+    k = np.arange(count)
+    y = (mt[k] & np.uint32(0x80000000)) | (mt[k + 1] & np.uint32(0x7FFFFFFF))
+    draws = mt[k + _MT_M] ^ (y >> np.uint32(1))
+    draws ^= np.where(y & np.uint32(1), np.uint32(0x9908B0DF), np.uint32(0))
+    draws ^= draws >> np.uint32(11)
+    draws ^= (draws << np.uint32(7)) & np.uint32(0x9D2C5680)
+    draws ^= (draws << np.uint32(15)) & np.uint32(0xEFC60000)
+    draws ^= draws >> np.uint32(18)
+
+    if draws[:, 0].tolist() != _python_draws(seeds[0], count):
+        long_keys = range(n)
+    for r in long_keys:
+        draws[:, r] = _python_draws(seeds[r], count)
+    return draws
+
+
+def placeholders(seeds: List[str], needs_rating: np.ndarray) -> Tuple[List[float], List[int]]:
+    """Placeholder ratings and review counts of a chunk, from its row seeds.
+
+    They are the values ``random.Random(seed)`` gives: ``round(uniform(2.4,
+    5.0), 2)`` for the rows in ``needs_rating`` (the returned ratings follow
+    their order), then ``randint(10, 5000)`` for every row, both computed
+    from the raw outputs of seeded_draws.
+    """
+    n = len(seeds)
+    draws = seeded_draws(seeds)
+    rated = np.flatnonzero(needs_rating)
+    # random(): 53 bits from two outputs; uniform(a, b) = a + (b - a) * random()
+    high = (draws[0, rated] >> np.uint32(5)).astype(np.float64)
+    low = (draws[1, rated] >> np.uint32(6)).astype(np.float64)
+    uniform = 2.4 + (5.0 - 2.4) * ((high * 67108864.0 + low) * (1.0 / 9007199254740992.0))
+    ratings = [round(x, 2) for x in uniform.tolist()]
+    # randint(10, 5000): getrandbits(13) until the value is below 4991
+    bits = draws >> np.uint32(32 - 13)
+    usable = bits < 4991
+    usable[:2, rated] = False
+    first = usable.argmax(axis=0)
+    num_reseñas = (10 + bits[first, np.arange(n)].astype(np.int64)).tolist()
+    for r in np.flatnonzero(~usable.any(axis=0)).tolist():
+        rng = random.Random(seeds[r])
+        if needs_rating[r]:
+            rng.random()
+        num_reseñas[r] = rng.randint(10, 5000)
+    return ratings, num_reseñas
+
+
+def read_chunks(
+    path: str, encoding: str, size: int = CHUNK_ROWS
+) -> Iterator[Tuple[List[str], List[List[Optional[str]]], List[str]]]:
+    """Yield ``(header, rows, keys)`` for every ``size`` rows of a CSV file.
+
+    ``rows`` hold the values of each row in header order and ``keys`` the
+    content hashed by row_id, both as ``csv.DictReader`` would give
+    them: missing values of short rows are ``None`` and the extra values of
+    long rows only count in the key.
+    """
+    with open(path, encoding=encoding) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        n = len(header)
+        regular = len(set(header)) == n
+        while True:
+            rows = list(itertools.islice(reader, size))
+            if not rows:
+                return
+            # Keys are joined in one pass; only incomplete or extra-long rows
+            # (and blank lines, which are skipped) are fixed up one by one
+            keys = list(map("\x1f".join, rows))
+            lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+            if regular:
+                odd = np.flatnonzero(lengths != n).tolist()
+            else:
+                odd = range(len(rows))
+            for i in odd:
+                row = rows[i]
+                if not row:
+                    continue
+                # Same dict as csv.DictReader (restkey and restval None)
+                values: Dict = dict(zip(header, row))
+                if len(row) > n:
+                    values[None] = row[n:]
+                for name in header[len(row):]:
+                    values[name] = None
+                keys[i] = row_key(values)
+                rows[i] = [values[name] for name in header]
+            if not lengths.all():
+                blank = set(np.flatnonzero(lengths == 0).tolist())
+                rows = [row for i, row in enumerate(rows) if i not in blank]
+                keys = [key for i, key in enumerate(keys) if i not in blank]
+            if rows:
+                yield header, rows, keys
+
+
+def parse_ratings(values: List[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized ``float(value)`` of a column.
+
+    Returns the ratings and a mask of the values that are numbers; empty,
+    missing and malformed values are left for a placeholder.
+    """
+    try:
+        # Usual case: every value is a number (float() runs in C over the list)
+        return np.array(list(map(float, values)), dtype=np.float64), np.ones(len(values), dtype=bool)
+    except (TypeError, ValueError):
+        pass
+    ratings: List[float] = []
+    valid: List[bool] = []
+    for value in values:
+        try:
+            ratings.append(float(value) if value else 0.0)
+            valid.append(bool(value))
+        except ValueError:
+            ratings.append(0.0)
+            valid.append(False)
+    return np.array(ratings, dtype=np.float64), np.array(valid, dtype=bool)
+
+
+def genre_labels(values: List[Optional[str]]) -> List[str]:
+    """Normalized ``reseña`` of a column.
+
+    Each value becomes the GENEROS_COMUNES it contains, capitalized and
+    comma-separated; a value with none of them is only capitalized, and an
+    empty one becomes "N/A".
+
+    Each genre is searched once over the whole column; after a hit the search
+    resumes at the next value, so the cost is one ``str.find`` per match.
+    """
+    texts = [(v or "").lower() for v in values]
+    # "\0" separates the values; no genre contains it, so no match spans two
+    starts = np.cumsum([0] + [len(t) + 1 for t in texts]).tolist()
+    blob = "\0".join(texts)
+    found: List[List[str]] = [[] for _ in texts]
+    for g in GENEROS_COMUNES:
+        label = g.capitalize()
+        pos = blob.find(g)
+        while pos >= 0:
+            i = bisect.bisect_right(starts, pos) - 1
+            found[i].append(label)
+            pos = blob.find(g, starts[i + 1])
+    return [
+        ", ".join(labels) if labels else (text.capitalize() if text else "N/A")
+        for labels, text in zip(found, texts)
+    ]
+
+
+def _json_float(value: float) -> str:
+    # Same text as json.dumps, which writes NaN/Infinity for non-finite floats
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "Infinity" if value > 0 else "-Infinity"
+    return float.__repr__(value)
+
+
+def _json_string(value: Optional[str]) -> str:
+    return "null" if value is None else encode_basestring(value)
+
+
+def _json_strings(values: List[Optional[str]]) -> List[str]:
+    """``_json_string`` of every value, encoding the whole column at once.
+
+    The values are joined with a separator that none of them contains and
+    that encode_basestring leaves as is, encoded in one call and split again.
+    """
+    sep = "\uffff"
+    if not values:
+        return []
+    if None in values:
+        return list(map(_json_string, values))
+    blob = sep.join(values)
+    if blob.count(sep) != len(values) - 1:
+        return list(map(encode_basestring, values))
+    return ['"' + v + '"' for v in encode_basestring(blob)[1:-1].split(sep)]
+
+
+def _json_floats(values: List[float]) -> List[str]:
+    """``_json_float`` of every value; repr() in C when all are finite."""
+    if np.isfinite(values).all():
+        return list(map(float.__repr__, values))
+    return list(map(_json_float, values))
+
+
+def build_chunk(
+    cat: str,
+    conf: Dict,
+    header: List[str],
+    rows: List[List[Optional[str]]],
+    keys: List[str],
+    seen: Dict[str, int],
+) -> List[str]:
+    """JSON lines of the items of a chunk, column by column.
+
+    The result is the same as converting each row on its own and calling
+    ``json.dumps`` (``bench_import.py`` checks it): only the hashes of the
+    ids and of the placeholder seeds are computed row by row.  ``seen``
+    counts the ids across chunks.
+    """
+    # Transposed once: one list per CSV column
+    columns = dict(zip(header, map(list, zip(*rows))))
+
+    def column(name: str) -> List[Optional[str]]:
+        return columns.get(name, [""] * len(rows))
+
+    fields = conf["fields"]
+    raw = {k: column(v) if v else [""] * len(rows) for k, v in fields.items()}
+    keep = [i for i, name in enumerate(raw.get("nombre", [""] * len(rows))) if (name or "").strip()]
+    if len(keep) < len(rows):
+        # Only named rows become items: drop the others from every column
+        raw = {k: [values[i] for i in keep] for k, values in raw.items()}
+        keys = [keys[i] for i in keep]
+    ratings = None
+    needs_rating = np.zeros(len(keep), dtype=bool)
+    if fields.get("calificacion"):
+        ratings, valid = parse_ratings(raw["calificacion"])
+        ratings = ratings.tolist()
+        needs_rating = ~valid
+    placeholder_ratings, num_reseñas = placeholders([row_seed(cat, key) for key in keys], needs_rating)
+    if ratings is not None:
+        for j, rating in zip(np.flatnonzero(needs_rating).tolist(), placeholder_ratings):
+            ratings[j] = rating
+    sha1 = hashlib.sha1
+    prefix = f"{cat}:"
+    hex_digests = b"".join([sha1((prefix + key).encode("utf-8")).digest() for key in keys]).hex()
+    ids = [hex_digests[40 * j:40 * j + 16] for j in range(len(keep))]
+    # Duplicated rows get a numbered id so every id is unique
+    if len(set(ids)) == len(ids) and seen.keys().isdisjoint(ids):
+        seen.update(dict.fromkeys(ids, 1))
+    else:
+        for j, base_id in enumerate(ids):
+            seen[base_id] = seen.get(base_id, 0) + 1
+            if seen[base_id] > 1:
+                ids[j] = f"{base_id}-{seen[base_id]}"
+    # Pre-encoded JSON values of the kept rows, one list per item field
+    encoded: Dict[str, List[str]] = {}
+    for k, v in fields.items():
+        if not v:
+            encoded[k] = ['""'] * len(keep)
+        elif k == "tags":
+            encoded[k] = [
+                "[" + ", ".join(map(encode_basestring, parse_tags(value))) + "]" for value in raw[k]
+            ]
+        elif k == "calificacion":
+            encoded[k] = _json_floats(ratings)
+        else:
+            encoded[k] = _json_strings(raw[k])
+    reseñas = genre_labels(raw["reseña"] if "reseña" in raw else [""] * len(keep))
+    encoded["reseña"] = _json_strings(reseñas)
+    encoded["num_reseñas"] = list(map(str, num_reseñas))
+    encoded = {"id": _json_strings(ids), **encoded}
+    template = "{" + ", ".join(
+        encode_basestring(k).replace("%", "%%") + ": %s" for k in encoded
+    ) + "}\n"
+    return [template % values for values in zip(*encoded.values())]
+
+
+def iter_lines(cat: str, path: str, conf: Dict, encoding: str) -> Iterator[str]:
+    """Stream the JSON lines of the items of a CSV file, a chunk at a time."""
+    seen: Dict[str, int] = {}
+    for header, rows, keys in read_chunks(path, encoding):
+        yield from build_chunk(cat, conf, header, rows, keys, seen)
+
+
+def shard_path(cat: str) -> str:
+    return os.path.join(SHARDS_PATH, f"{cat}.jsonl")
+
+
+def import_category(cat: str, conf: Dict) -> int:
+    """Import a single category from its CSV file into its JSON Lines shard.
+
+    Items are written as they are read, so memory use does not depend on the
+    size of the dataset.  Returns the number of items written.
+    """
     path = os.path.join(DATASETS_PATH, conf["csv"])
-    items: List[Dict] = []
+    out_path = shard_path(cat)
+    tmp_path = out_path + ".tmp"
+    count = 0
     if not os.path.exists(path):
         print(f"[ERROR] No se encontró el archivo {path}")
-        return items
+    else:
+        for encoding in ("utf-8", "latin-1"):
+            count = 0
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as out:
+                    for line in iter_lines(cat, path, conf, encoding):
+                        out.write(line)
+                        count += 1
+                break
+            except UnicodeDecodeError:
+                print(f"[ADVERTENCIA] {path} no es UTF-8, intentando con latin-1...")
+        if count == 0:
+            print(f"[ADVERTENCIA] El archivo {path} está vacío o no tiene datos.")
+    if not os.path.exists(tmp_path):
+        open(tmp_path, "w", encoding="utf-8").close()
+    os.replace(tmp_path, out_path)
+    print(f"[INFO] {cat}: {count} elementos importados.")
+    return count
+
+
+def iter_shard(cat: str) -> Iterator[Dict]:
+    with open(shard_path(cat), encoding="utf-8") as shard:
+        for line in shard:
+            yield json.loads(line)
+
+
+def write_db(categories: List[str]) -> str:
+    """Write the columnar catalog from the shards, one item at a time.
+
+    Returns the content hash stored in the catalog header.
+    """
+    # write_catalog escribe a un temporal y lo reemplaza, así el backend
+    # (que recarga al cambiar el archivo) nunca lee un catálogo a medias.
+    return write_catalog(DB_PATH, {cat: iter_shard(cat) for cat in categories})
+
+
+def source_hash(cat: str, conf: Dict) -> Optional[str]:
+    """Hash of everything a category's shard depends on (CSV, mapping, seed)."""
+    path = os.path.join(DATASETS_PATH, conf["csv"])
+    if not os.path.exists(path):
+        return None
+    h = hashlib.sha256()
+    h.update(json.dumps([SHARD_FORMAT, SEED, cat, conf], sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_manifest() -> Dict:
     try:
-        with open(path, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
-            if not rows:
-                print(f"[ADVERTENCIA] El archivo {path} está vacío o no tiene datos.")
-            for row in rows:
-                item: Dict = {}
-                for k, v in conf["fields"].items():
-                    if v == "":
-                        item[k] = ""
-                    elif k == "tags":
-                        item[k] = parse_tags(row.get(v, ""))
-                    elif k == "calificacion":
-                        # Use provided rating if available; otherwise assign random between 2.4 and 5.0
-                        try:
-                            rating_str = row.get(v, "")
-                            item[k] = float(rating_str) if rating_str else round(random.uniform(2.4, 5.0), 2)
-                        except ValueError:
-                            item[k] = round(random.uniform(2.4, 5.0), 2)
-                    else:
-                        item[k] = row.get(v, "")
-                # Normalize the genre/reseña field
-                genero_raw = (item.get("reseña", "") or "").lower()
-                GENEROS_COMUNES = [
-                    "acción",
-                    "aventura",
-                    "deportes",
-                    "estrategia",
-                    "ficción",
-                    "drama",
-                    "comedia",
-                    "fantasía",
-                    "terror",
-                    "romance",
-                    "misterio",
-                    "musical",
-                    "historia",
-                    "ciencia ficción",
-                ]
-                genero_final: List[str] = []
-                for g in GENEROS_COMUNES:
-                    if g in genero_raw:
-                        genero_final.append(g.capitalize())
-                if not genero_final and genero_raw:
-                    genero_final = [genero_raw.capitalize()]
-                item["reseña"] = ", ".join(genero_final) if genero_final else "N/A"
-                # Assign a random number of reviews to simulate popularity
-                item["num_reseñas"] = random.randint(10, 5000)
-                if item.get("nombre", "").strip():
-                    items.append(item)
-    except UnicodeDecodeError:
-        print(f"[ADVERTENCIA] {path} no es UTF-8, intentando con latin-1...")
-        with open(path, encoding="latin-1") as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
-            if not rows:
-                print(f"[ADVERTENCIA] El archivo {path} está vacío o no tiene datos.")
-            for row in rows:
-                item: Dict = {}
-                for k, v in conf["fields"].items():
-                    if v == "":
-                        item[k] = ""
-                    elif k == "tags":
-                        item[k] = parse_tags(row.get(v, ""))
-                    elif k == "calificacion":
-                        try:
-                            rating_str = row.get(v, "")
-                            item[k] = float(rating_str) if rating_str else round(random.uniform(2.4, 5.0), 2)
-                        except ValueError:
-                            item[k] = round(random.uniform(2.4, 5.0), 2)
-                    else:
-                        item[k] = row.get(v, "")
-                genero_raw = (item.get("reseña", "") or "").lower()
-                GENEROS_COMUNES = [
-                    "acción",
-                    "aventura",
-                    "deportes",
-                    "estrategia",
-                    "ficción",
-                    "drama",
-                    "comedia",
-                    "fantasía",
-                    "terror",
-                    "romance",
-                    "misterio",
-                    "musical",
-                    "historia",
-                    "ciencia ficción",
-                ]
-                genero_final: List[str] = []
-                for g in GENEROS_COMUNES:
-                    if g in genero_raw:
-                        genero_final.append(g.capitalize())
-                if not genero_final and genero_raw:
-                    genero_final = [genero_raw.capitalize()]
-                item["reseña"] = ", ".join(genero_final) if genero_final else "N/A"
-                item["num_reseñas"] = random.randint(10, 5000)
-                if item.get("nombre", "").strip():
-                    items.append(item)
-    print(f"[INFO] {cat}: {len(items)} elementos importados.")
-    return items
-
-
-def main() -> None:
-    """Main function to import all categories and write to JSON."""
-    db: Dict[str, List[Dict]] = {cat: [] for cat in CONFIG.keys()}
-    for cat, conf in CONFIG.items():
-        print(f"Importando {cat}...")
-        db[cat] = import_category(cat, conf)
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest: Dict) -> None:
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def main(full: bool = False) -> None:
+    """Import every changed category in its own process, then write the catalog.
+
+    A category is re-imported only when the hash of its CSV (or of its
+    CONFIG entry) differs from the one in ``shards/manifest.json``; the
+    other shards are reused as they are.  ``full=True`` re-imports all.
+    """
+    os.makedirs(SHARDS_PATH, exist_ok=True)
+    manifest = {} if full else load_manifest()
+    hashes = {cat: source_hash(cat, conf) for cat, conf in CONFIG.items()}
+    changed = [
+        cat
+        for cat in CONFIG
+        if full
+        or cat not in manifest
+        or manifest[cat].get("source_sha256") != hashes[cat]
+        or not os.path.exists(shard_path(cat))
+    ]
+    if not changed and os.path.exists(DB_PATH):
+        print("[OK] Ningún dataset cambió; el catálogo está al día.")
+        return
+    with ProcessPoolExecutor(max_workers=max(1, min(len(changed), os.cpu_count() or 1))) as pool:
+        futures = {}
+        for cat in changed:
+            print(f"Importando {cat}...")
+            futures[cat] = pool.submit(import_category, cat, CONFIG[cat])
+        for cat, future in futures.items():
+            manifest[cat] = {"source_sha256": hashes[cat], "count": future.result()}
+    for cat in CONFIG:
+        if cat not in changed:
+            print(f"[INFO] {cat}: sin cambios, se reutiliza {shard_path(cat)}")
+    save_manifest(manifest)
+    base_hash = ColumnarCatalog(DB_PATH).content_hash if os.path.exists(DB_PATH) else None
     try:
-        with open(DB_PATH, "w", encoding="utf-8") as f:
-            json.dump(db, f, ensure_ascii=False, indent=2)
+        new_hash = write_db(list(CONFIG.keys()))
         print(f"[OK] Base de datos guardada en {DB_PATH}")
     except Exception as e:
-        print(f"[ERROR] No se pudo guardar el archivo JSON: {e}")
+        print(f"[ERROR] No se pudo guardar el catálogo: {e}")
+        return
+    delta = None
+    if base_hash is not None and base_hash != new_hash and not full:
+        delta = {"base_hash": base_hash, "new_hash": new_hash, "changed": changed}
+    build_artifacts(delta)
     print("¡Importación completada!")
 
 
+def build_artifacts(delta: Optional[Dict] = None) -> None:
+    """Fit the recommender once and persist its TF‑IDF bundle.
+
+    The backend workers then load the bundle instead of refitting on start.
+    ``delta`` (base/new catalog hash and changed categories) is saved next to
+    the bundles so only the changed categories are re-vectorized.
+    """
+    try:
+        from artifacts import ARTIFACTS_DIR, bundle_path, save_delta
+        from recommender import MultimodalRecommender
+    except ImportError as e:
+        print(f"[ADVERTENCIA] No se generaron los artefactos del recomendador: {e}")
+        return
+    if delta is not None:
+        save_delta(ARTIFACTS_DIR, delta)
+    rec = MultimodalRecommender(DB_PATH, artifacts_dir=ARTIFACTS_DIR)
+    # Under the bundle lock: if servidor.py already saved them, they are loaded
+    if rec.ensure_neighbours():
+        print("[OK] Vecinos de cada elemento calculados")
+    print(f"[OK] Artefactos del recomendador en {bundle_path(ARTIFACTS_DIR, rec.content_hash)}")
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(full="--full" in sys.argv[1:])
\ No newline at end of file
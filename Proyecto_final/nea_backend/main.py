@@ -1,13 +1,134 @@
 
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import itertools
 import json
+import multiprocessing
 import os
-import csv
+import time
 
-app = FastAPI()
+import scoring
+from artifacts import ARTIFACTS_DIR
+from cache import merge_stats
+from catalog import CatalogStore
+from concurrency import EndpointLimiter
+from metrics import SIZE_BUCKETS, Registry, Stopwatch
+from recommender import NEIGHBOURS, MultimodalRecommender
+from search_index import CsvIndexRegistry
+
+
+# Ejecutores dedicados al trabajo pesado, para que no ocupen los hilos del servidor
+# NEA_PROCESOS=0 calcula las recomendaciones en hilos del propio proceso
+PROCESOS_RECOMENDACION = int(os.environ.get("NEA_PROCESOS", str(min(4, os.cpu_count() or 1))))
+HILOS_BUSQUEDA = int(os.environ.get("NEA_HILOS_BUSQUEDA", "4"))
+ejecutores = {}
+
+# Llamadas simultáneas y tiempo máximo (segundos) de cada endpoint costoso
+LIMITES = {
+    "recomendar": EndpointLimiter(16, timeout=10.0),
+    "recomendar/batch": EndpointLimiter(2, timeout=120.0),
+    "buscar": EndpointLimiter(4, timeout=10.0),
+}
+
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    if PROCESOS_RECOMENDACION > 0:
+        # Cada proceso carga el catálogo y los artefactos persistidos (ver scoring.py)
+        ejecutores["recomendar"] = ProcessPoolExecutor(
+            PROCESOS_RECOMENDACION,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=scoring.init_worker,
+            initargs=(DB_PATH, opciones_recomendador()),
+        )
+        # Arranca los procesos ya, para que la primera petición no pague su carga
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(ejecutores["recomendar"], scoring.ready)
+            for _ in range(PROCESOS_RECOMENDACION)
+        ))
+    else:
+        ejecutores["recomendar"] = ThreadPoolExecutor(4, thread_name_prefix="recomendar")
+    ejecutores["buscar"] = ThreadPoolExecutor(HILOS_BUSQUEDA, thread_name_prefix="buscar")
+    yield
+    for ejecutor in ejecutores.values():
+        ejecutor.shutdown(wait=False, cancel_futures=True)
+    ejecutores.clear()
+
+
+# Métricas para Prometheus (GET /metrics), ver metrics.py.  Cada proceso
+# tiene las suyas (con servidor.py, cada worker del pre-fork)
+metricas = Registry()
+LATENCIA = metricas.histogram(
+    "nea_http_request_duration_seconds", "Latencia de cada endpoint", ["endpoint", "metodo", "estado"]
+)
+TAMANO_RESULTADOS = metricas.histogram(
+    "nea_results", "Resultados devueltos por petición", ["endpoint"], buckets=SIZE_BUCKETS
+)
+CARGA_CATALOGO = metricas.histogram("nea_catalog_load_seconds", "Tiempo de cargar el catálogo")
+CONSTRUCCION_RECOMENDADOR = metricas.histogram(
+    "nea_recommender_build_seconds", "Tiempo de construir el recomendador (carga de artefactos o ajuste)"
+)
+RECARGAS = metricas.counter("nea_catalog_reloads_total", "Veces que se cargó el catálogo")
+ETAPAS = metricas.histogram(
+    "nea_stage_duration_seconds", "Tiempo de cada etapa (si están activos los tiempos por etapa)", ["endpoint", "etapa"]
+)
+CACHE_ACIERTOS = metricas.counter("nea_cache_hits_total", "Aciertos de las cachés de resultados", ["cache"])
+CACHE_FALLOS = metricas.counter("nea_cache_misses_total", "Fallos de las cachés de resultados", ["cache"])
+CACHE_TASA = metricas.gauge("nea_cache_hit_ratio", "Aciertos / consultas de cada caché", ["cache"])
+CACHE_ENTRADAS = metricas.gauge("nea_cache_entries", "Entradas guardadas en cada caché", ["cache"])
+EN_CURSO = metricas.gauge("nea_endpoint_running", "Llamadas en ejecución", ["endpoint"])
+EN_ESPERA = metricas.gauge("nea_endpoint_waiting", "Llamadas esperando un turno", ["endpoint"])
+TIMEOUTS = metricas.counter("nea_endpoint_timeouts_total", "Llamadas que superaron el tiempo máximo", ["endpoint"])
+ABANDONADAS = metricas.gauge("nea_endpoint_abandoned", "Llamadas expiradas que siguen ejecutándose", ["endpoint"])
+MEMORIA = metricas.gauge("nea_recommender_bytes", "Bytes de los arreglos del recomendador", ["componente"])
+
+# Tiempos por etapa (vectorizar, similitud, ranking, serialización...): se
+# activan con NEA_TIEMPOS_ETAPAS=1 o en caliente con POST /metrics/etapas.
+# Apagados no cuestan nada: no se toma ningún tiempo
+medir_etapas = os.environ.get("NEA_TIEMPOS_ETAPAS", "0") == "1"
+
+
+def registrar_etapas(endpoint, tiempos):
+    for etapa, segundos in (tiempos or {}).items():
+        ETAPAS.observe(segundos, endpoint=endpoint, etapa=etapa)
+
+
+# Devuelve el contenido; midiendo etapas lo serializa aquí para medir cuánto tarda
+def responder(endpoint, contenido):
+    if not medir_etapas:
+        return contenido
+    inicio = time.perf_counter()
+    respuesta = JSONResponse(jsonable_encoder(contenido))
+    ETAPAS.observe(time.perf_counter() - inicio, endpoint=endpoint, etapa="serializacion")
+    return respuesta
+
+
+app = FastAPI(lifespan=ciclo_de_vida)
+
+
+# Latencia de cada petición, por ruta (la plantilla, p. ej. /top10/{categoria})
+@app.middleware("http")
+async def medir_latencia(request: Request, call_next):
+    inicio = time.perf_counter()
+    estado = 500
+    try:
+        respuesta = await call_next(request)
+        estado = respuesta.status_code
+        return respuesta
+    finally:
+        ruta = getattr(request.scope.get("route"), "path", "desconocida")
+        LATENCIA.observe(
+            time.perf_counter() - inicio, endpoint=ruta, metodo=request.method, estado=str(estado)
+        )
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,131 +139,439 @@ app.add_middleware(
 )
 
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "entertainment_db.json")
+# NEA_DB, NEA_DATASETS y NEA_ARTEFACTOS sirven otro catálogo (p. ej. los sintéticos de los benchmarks)
+DB_PATH = os.environ.get("NEA_DB", os.path.join(os.path.dirname(__file__), "entertainment_db.col"))
+DATASETS_DIR = os.environ.get("NEA_DATASETS", os.path.join(os.path.dirname(__file__), "datasets"))
+DIR_ARTEFACTOS = os.environ.get("NEA_ARTEFACTOS", ARTIFACTS_DIR)
 DATASET_PATHS = {
-    "musica": os.path.join(os.path.dirname(__file__), "datasets", "Spotify_songs.csv"),
-    "peliculas": os.path.join(os.path.dirname(__file__), "datasets", "filmaffinity_dataset.csv"),
-    "libros": os.path.join(os.path.dirname(__file__), "datasets", "books.csv"),
-    "videojuegos": os.path.join(os.path.dirname(__file__), "datasets", "vgsales.csv"),
+    "musica": os.path.join(DATASETS_DIR, "Spotify_songs.csv"),
+    "peliculas": os.path.join(DATASETS_DIR, "filmaffinity_dataset.csv"),
+    "libros": os.path.join(DATASETS_DIR, "books.csv"),
+    "videojuegos": os.path.join(DATASETS_DIR, "vgsales.csv"),
 }
 
+# Catálogo compartido: se carga una sola vez al arrancar y se recarga solo si cambia el archivo.
+# Con servidor.py (pre-fork) los workers no revisan el archivo: recargan cuando el maestro avisa
+PREFORK = os.environ.get("NEA_PREFORK", "0") == "1"
+catalogo = CatalogStore(DB_PATH, check_interval=None if PREFORK else 1.0)
+
+# Modo aproximado (ANN) para catálogos grandes: NEA_ANN=1 lo activa y
+# NEA_ANN_NPROBE ajusta el compromiso entre recall y latencia (tabla medida
+# en ann.py; python bench_ann.py la vuelve a medir)
+ANN_ACTIVO = os.environ.get("NEA_ANN", "0") == "1"
+ANN_NPROBE = int(os.environ.get("NEA_ANN_NPROBE", "32"))
+# Modo compacto: NEA_COMPACTO=1 guarda la matriz TF-IDF y las calificaciones en float32
+COMPACTO = os.environ.get("NEA_COMPACTO", "0") == "1"
+
+# Recomendador construido una vez al arrancar (y de nuevo cuando se recarga el catálogo)
+recomendador: Optional[MultimodalRecommender] = None
+
+
+def opciones_recomendador():
+    # Reutiliza el modelo TF-IDF persistido si el contenido de la base no cambió
+    return {
+        "artifacts_dir": DIR_ARTEFACTOS,
+        "ann": ANN_ACTIVO,
+        "ann_nprobe": ANN_NPROBE,
+        "compact": COMPACTO,
+    }
+
+
+def construir_recomendador(snapshot):
+    global recomendador
+    RECARGAS.inc()
+    if catalogo.last_load_seconds is not None:
+        CARGA_CATALOGO.observe(catalogo.last_load_seconds)
+    if not any(snapshot.items.values()):
+        recomendador = None
+        return
+    with CONSTRUCCION_RECOMENDADOR.time():
+        recomendador = MultimodalRecommender(
+            DB_PATH,
+            db=snapshot.items,
+            content_hash=snapshot.content_hash,
+            **opciones_recomendador(),
+        )
+
+
+construir_recomendador(catalogo.snapshot())
+catalogo.add_listener(construir_recomendador)
+
+
+async def recomendador_actual():
+    # Revisar (y recargar) el catálogo puede leer disco: se hace fuera del event loop
+    await run_in_threadpool(catalogo.snapshot)
+    return recomendador
+
+
+async def ejecutar(endpoint, ejecutor, fn, *args, **kwargs):
+    try:
+        return await LIMITES[endpoint].run(ejecutor, fn, *args, **kwargs)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail=f"/{endpoint} tardó demasiado, inténtalo de nuevo")
+
+
+async def puntuar(endpoint, rec, categoria, gustos_list, method, top_k, offset, exacto):
+    """Devuelve (hash del catálogo usado, recomendaciones de cada lista de gustos)."""
+    ejecutor = ejecutores.get("recomendar")
+    if isinstance(ejecutor, ProcessPoolExecutor):
+        # Los tiempos por etapa se toman en el proceso y vuelven con el resultado
+        content_hash, resultados, tiempos = await ejecutar(
+            endpoint,
+            ejecutor,
+            scoring.recommend_batch,
+            categoria,
+            gustos_list,
+            method,
+            top_k,
+            offset,
+            exacto,
+            medir_etapas,
+        )
+    else:
+        tiempos = {} if medir_etapas else None
+        resultados = await ejecutar(
+            endpoint,
+            ejecutor,
+            rec.recommend_batch,
+            categoria,
+            gustos_list,
+            method,
+            top_k,
+            offset,
+            exact=exacto,
+            timings=tiempos,
+        )
+        content_hash = rec.content_hash
+    registrar_etapas(endpoint, tiempos)
+    return content_hash, resultados
+
 
 class UserPreferences(BaseModel):
     categoria: str
     gustos: List[str]
+    method: str = "multimodal"  # "cbf", "cf" o "multimodal"
+    top_k: int = Field(10, ge=1, le=100)
+    offset: int = Field(0, ge=0)
+    exacto: bool = False  # ignora el índice ANN (para verificar resultados)
+
+class BatchPreferences(BaseModel):
+    categoria: str
+    usuarios: Dict[str, List[str]]  # id de usuario -> gustos
+    method: str = "multimodal"
+    top_k: int = Field(10, ge=1, le=100)
+    offset: int = Field(0, ge=0)
+    exacto: bool = False  # ignora el índice ANN (para verificar resultados)
 
 class SearchQuery(BaseModel):
     categoria: str
     query: str
     filtros: Optional[dict] = None  # Para búsquedas avanzadas por campo
+    cursor: Optional[int] = None  # "cursor" de la respuesta anterior: continúa desde ahí
+    limite: int = Field(50, ge=1, le=1000)  # resultados por página
+    campos: Optional[List[str]] = None  # devuelve solo estos campos de cada resultado
+    stream: bool = False  # envía todos los resultados como NDJSON, a medida que se encuentran
+    orden: str = "archivo"  # "archivo" u "relevancia" (BM25; el cursor cuenta posiciones del ranking)
 
 
 
 @app.post("/recomendar")
-def recomendar(preferencias: UserPreferences):
-    with open(DB_PATH, "r", encoding="utf-8") as f:
-        db = json.load(f)
-    items = db.get(preferencias.categoria, [])
-    recomendaciones = []
-    for item in items:
-        if any(g.lower() in item.get("tags", []) for g in preferencias.gustos):
-            recomendaciones.append(item)
-    if not recomendaciones:
-        recomendaciones = items[:3]  # fallback
-    return {"recomendaciones": recomendaciones}
+async def recomendar(preferencias: UserPreferences):
+    rec = await recomendador_actual()  # recarga el catálogo (y el recomendador) si cambió
+    if rec is None:
+        return {"recomendaciones": []}
+    clave = rec.cache_key(
+        preferencias.categoria,
+        preferencias.gustos,
+        preferencias.method,
+        preferencias.top_k,
+        preferencias.offset,
+        preferencias.exacto,
+    )
+    recomendaciones = rec.cache.get(clave) if rec.cache is not None else None
+    if recomendaciones is None:
+        # El cálculo se hace en el pool de procesos, sin bloquear el servidor
+        content_hash, resultados = await puntuar(
+            "recomendar",
+            rec,
+            preferencias.categoria,
+            [preferencias.gustos],
+            preferencias.method,
+            preferencias.top_k,
+            preferencias.offset,
+            preferencias.exacto,
+        )
+        recomendaciones = resultados[0]
+        # Solo se guarda si se calculó con la misma versión del catálogo
+        if rec.cache is not None and content_hash == rec.content_hash:
+            rec.cache.put(clave, recomendaciones)
+    TAMANO_RESULTADOS.observe(len(recomendaciones), endpoint="recomendar")
+    return responder("recomendar", {"recomendaciones": recomendaciones})
+
+
+# Recomendaciones para muchos usuarios en una sola llamada (procesos nocturnos)
+@app.post("/recomendar/batch")
+async def recomendar_batch(peticion: BatchPreferences):
+    rec = await recomendador_actual()
+    ids = list(peticion.usuarios.keys())
+    if rec is None:
+        return {"recomendaciones": {uid: [] for uid in ids}}
+    _, resultados = await puntuar(
+        "recomendar/batch",
+        rec,
+        peticion.categoria,
+        [peticion.usuarios[uid] for uid in ids],
+        peticion.method,
+        peticion.top_k,
+        peticion.offset,
+        peticion.exacto,
+    )
+    for resultado in resultados:
+        TAMANO_RESULTADOS.observe(len(resultado), endpoint="recomendar/batch")
+    return responder("recomendar/batch", {"recomendaciones": dict(zip(ids, resultados))})
 
 
 
 # Endpoint para top 10 de la categoría (por calificación)
 @app.get("/top10/{categoria}")
-def top10_categoria(categoria: str):
-    with open(DB_PATH, "r", encoding="utf-8") as f:
-        db = json.load(f)
-    items = db.get(categoria, [])
-    # Ordenar por calificación descendente
-    items_sorted = sorted(items, key=lambda x: x.get("calificacion", 0), reverse=True)
-    return {"top10": items_sorted[:10]}
+async def top10_categoria(
+    categoria: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+):
+    rec = await recomendador_actual()
+    if rec is None:
+        return {"top10": []}
+    # Orden por calificación descendente precalculado al cargar el catálogo
+    top = rec.top10(categoria, offset=offset, limit=limit)
+    TAMANO_RESULTADOS.observe(len(top), endpoint="top10")
+    return responder("top10", {"top10": top})
+
+# Elementos parecidos a uno dado ("más como este"), por su id estable
+@app.get("/similares/{categoria}/{item_id}")
+async def similares(
+    categoria: str,
+    item_id: str,
+    limit: int = Query(10, ge=1, le=NEIGHBOURS),
+):
+    rec = await recomendador_actual()
+    if rec is None:
+        return {"similares": []}
+    # Vecinos precalculados al importar: solo se leen de un arreglo (la
+    # primera llamada de una categoría indexa sus ids, por eso va en un hilo)
+    items = await run_in_threadpool(rec.similar_items, categoria, item_id, limit)
+    TAMANO_RESULTADOS.observe(len(items), endpoint="similares")
+    return responder("similares", {"similares": items})
+
+# Autocompletado del nombre mientras se escribe (más reseñas primero)
+@app.get("/autocompletar/{categoria}")
+async def autocompletar(
+    categoria: str,
+    q: str = "",
+    limit: int = Query(10, ge=1, le=50),
+):
+    rec = await recomendador_actual()
+    if rec is None:
+        return {"sugerencias": []}
+    # La primera llamada de una categoría construye su índice, por eso va en un hilo
+    items = await run_in_threadpool(rec.autocomplete, categoria, q, limit)
+    TAMANO_RESULTADOS.observe(len(items), endpoint="autocompletar")
+    return {"sugerencias": [{"id": item.get("id"), "nombre": item.get("nombre")} for item in items]}
 
 # Endpoint para búsqueda detallada por título, autor u obra
 
-# Utilidad para buscar en CSV por cualquier campo relevante
-def buscar_en_csv(categoria, query, filtros=None):
+# Campos relevantes por categoría para la búsqueda de texto libre
+CAMPOS_CATEGORIA = {
+    "musica": ["track_name", "artist(s)_name", "released_year", "bpm", "key", "mode", "danceability_%", "valence_%", "energy_%", "acousticness_%", "instrumentalness_%", "liveness_%", "speechiness_%", "streams", "genre", "reseña", "tags"],
+    "videojuegos": ["Name", "Platform", "Year", "Genre"],
+    "peliculas": ["Título", "Año", "Género", "Tipo filme", "Dirección", "Reparto"],
+    "libros": ["title", "authors", "publication_date", "average_rating", "genres", "author", "isbn", "language_code"],
+}
+# Filtros de búsqueda avanzada -> columna del CSV
+CAMPOS_FILTRO = {
+    "musica": {"año": "released_year", "artista": "artist(s)_name", "genero": "genre"},
+    "videojuegos": {"año": "Year", "genero": "Genre", "plataforma": "Platform"},
+    "peliculas": {"año": "Año", "genero": "Género"},
+    "libros": {"año": "publication_date", "genero": "genres", "autor": "authors"},
+}
+# Filtros que se comparan de forma exacta (released_year en música)
+FILTROS_EXACTOS = {
+    "musica": ["año"],
+}
+
+# Normalizar para frontend: solo los campos relevantes (resultado -> columna del CSV)
+PROYECCIONES = {
+    "musica": {
+        "nombre": "track_name",
+        "artista": "artist(s)_name",
+        "año": "released_year",
+        "streams": "streams",
+        "cover_url": "cover_url",
+    },
+}
+
+# Campos (nombre, autor, género) con los que se ordena por relevancia (BM25)
+CAMPOS_RELEVANCIA = {
+    "musica": ["track_name", "artist(s)_name"],
+    "videojuegos": ["Name", "Genre", "Platform", "Publisher"],
+    "peliculas": ["Título", "Dirección", "Género"],
+    "libros": ["title", "authors", "genres"],
+}
+
+# Índices invertidos por categoría: se construyen una vez y se reutilizan
+indices_csv = CsvIndexRegistry()
+
+
+# Índice de búsqueda del CSV de una categoría (None si no tiene dataset)
+def indice_csv(categoria):
     path = DATASET_PATHS.get(categoria)
     if not path or not os.path.exists(path):
-        return []
-    resultados = []
-    q = (query or "").lower()
-    # Definir los campos relevantes por categoría
-    campos_categoria = {
-        "musica": ["track_name", "artist(s)_name", "released_year", "bpm", "key", "mode", "danceability_%", "valence_%", "energy_%", "acousticness_%", "instrumentalness_%", "liveness_%", "speechiness_%", "streams", "genre", "reseña", "tags"],
-        "videojuegos": ["Name", "Platform", "Year", "Genre"],
-        "peliculas": ["Título", "Año", "Género", "Tipo filme", "Dirección", "Reparto"],
-        "libros": ["title", "authors", "publication_date", "average_rating", "genres", "author", "isbn", "language_code"],
-    }
-    campos_filtro = {
-        "musica": {"año": "released_year", "artista": "artist(s)_name", "genero": "genre"},
-        "videojuegos": {"año": "Year", "genero": "Genre", "plataforma": "Platform"},
-        "peliculas": {"año": "Año", "genero": "Género"},
-        "libros": {"año": "publication_date", "genero": "genres", "autor": "authors"},
-    }
-    with open(path, encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            valores = []
-            for campo in campos_categoria.get(categoria, []):
-                if campo in row and row[campo]:
-                    valores.append(str(row[campo]).lower())
-            # Coincidencia: si hay query, debe estar en algún campo relevante; si hay filtros, deben cumplirse todos
-            match_query = True
-            if q:
-                match_query = any(q in v for v in valores)
-            match_filtros = True
-            if filtros:
-                for filtro, valor in filtros.items():
-                    if valor:
-                        campo_csv = campos_filtro.get(categoria, {}).get(filtro)
-                        if campo_csv and campo_csv in row:
-                            # Comparación exacta para released_year en música
-                            if categoria == "musica" and filtro == "año":
-                                if str(row[campo_csv]).strip() != str(valor).strip():
-                                    match_filtros = False
-                                    break
-                            else:
-                                if str(valor).lower() not in str(row[campo_csv]).lower():
-                                    match_filtros = False
-                                    break
-            if match_query and match_filtros:
-                # Normalizar para frontend: solo los campos relevantes
-                if categoria == "musica":
-                    resultados.append({
-                        "nombre": row.get("track_name", ""),
-                        "artista": row.get("artist(s)_name", ""),
-                        "año": row.get("released_year", ""),
-                        "streams": row.get("streams", ""),
-                        "cover_url": row.get("cover_url", ""),
-                    })
-                else:
-                    resultados.append(row)
-    return resultados
+        return None
+    return indices_csv.get(
+        path,
+        CAMPOS_CATEGORIA.get(categoria, []),
+        CAMPOS_FILTRO.get(categoria, {}),
+        FILTROS_EXACTOS.get(categoria, []),
+        PROYECCIONES.get(categoria),
+        CAMPOS_RELEVANCIA.get(categoria),
+    )
 
-@app.post("/buscar")
-def buscar_detallado(query: SearchQuery):
+# Generador de (posición, resultado) en orden, empezando después de la posición "cursor".
+# Con orden="relevancia" la posición es el puesto en el ranking BM25 y se generan hasta "limite"
+def iter_busqueda(categoria, query, filtros=None, cursor=None, campos=None, orden="archivo", limite=50):
+    despues = -1 if cursor is None else cursor
     # Si la categoría tiene dataset CSV, buscar ahí
-    if query.categoria in DATASET_PATHS:
-        resultados = buscar_en_csv(query.categoria, query.query, query.filtros)
-        return {"resultados": resultados}
-    # Fallback: buscar en el JSON
-    with open(DB_PATH, "r", encoding="utf-8") as f:
-        db = json.load(f)
-    items = db.get(query.categoria, [])
+    if categoria in DATASET_PATHS:
+        indice = indice_csv(categoria)
+        if indice is None:
+            return
+        if orden == "relevancia":
+            yield from indice.iter_ranked(query, filtros, after=despues, limit=limite, fields=campos)
+            return
+        # Coincidencia: si hay query, debe estar en algún campo relevante; si hay filtros, deben cumplirse todos
+        yield from indice.iter_search(query, filtros, after=despues, fields=campos)
+        return
+    if orden == "relevancia":
+        rec = recomendador
+        ranking = rec.search(categoria, query, top_k=despues + 1 + limite) if rec is not None else []
+        for n in range(despues + 1, len(ranking)):
+            item = dict(ranking[n])
+            yield n, item if campos is None else {campo: item.get(campo) for campo in campos}
+        return
+    # Fallback: buscar en el catálogo en memoria
+    items = catalogo.snapshot().get(categoria)
+    q = query.lower()
+    for n in range(despues + 1, len(items)):
+        item = items[n]
+        valores = [str(v).lower() for v in item.values() if v is not None]
+        if q in " ".join(valores):
+            item = dict(item)
+            yield n, item if campos is None else {campo: item.get(campo) for campo in campos}
+
+# Una página de resultados y el cursor de la siguiente (None si no hay más).
+# Con "tiempos" (dict) suma el tiempo de la búsqueda en la etapa "busqueda"
+def buscar_pagina(categoria, query, filtros=None, cursor=None, limite=50, campos=None, orden="archivo", tiempos=None):
+    cronometro = Stopwatch(tiempos)
     resultados = []
-    q = query.query.lower()
-    for item in items:
-        campos = [str(v).lower() for v in item.values() if v is not None]
-        if q in " ".join(campos):
-            resultados.append(item)
-    return {"resultados": resultados}
+    siguiente = None
+    # Se pide un resultado de más para saber si hay otra página
+    for n, resultado in iter_busqueda(categoria, query, filtros, cursor, campos, orden, limite + 1):
+        if len(resultados) == limite:
+            siguiente = ultimo
+            break
+        resultados.append(resultado)
+        ultimo = n
+    cronometro.lap("busqueda")
+    return resultados, siguiente
+
+# Convierte los resultados a NDJSON, en bloques de líneas para no enviar fila por fila
+def ndjson(resultados, bloque=256):
+    while True:
+        lineas = [json.dumps(r, ensure_ascii=False) + "\n" for _, r in itertools.islice(resultados, bloque)]
+        if not lineas:
+            return
+        yield "".join(lineas).encode("utf-8")
+
+@app.post("/buscar")
+async def buscar_detallado(query: SearchQuery):
+    if query.stream:
+        resultados = iter_busqueda(
+            query.categoria, query.query, query.filtros, query.cursor, query.campos, query.orden, query.limite
+        )
+        # El primer resultado (que es cuando se hace la búsqueda en el índice) se
+        # obtiene dentro del pool de búsqueda, con su límite y tiempo máximo
+        primero = await ejecutar("buscar", ejecutores.get("buscar"), next, resultados, None)
+        if primero is not None:
+            resultados = itertools.chain([primero], resultados)
+        return StreamingResponse(ndjson(resultados), media_type="application/x-ndjson")
+    # Una búsqueda lenta solo ocupa un hilo del pool de búsqueda
+    tiempos = {} if medir_etapas else None
+    resultados, siguiente = await ejecutar(
+        "buscar",
+        ejecutores.get("buscar"),
+        buscar_pagina,
+        query.categoria,
+        query.query,
+        query.filtros,
+        query.cursor,
+        query.limite,
+        query.campos,
+        query.orden,
+        tiempos,
+    )
+    registrar_etapas("buscar", tiempos)
+    TAMANO_RESULTADOS.observe(len(resultados), endpoint="buscar")
+    return responder("buscar", {"resultados": resultados, "cursor": siguiente})
+
+# Contadores de las cachés de resultados (aciertos, fallos, desalojos)
+@app.get("/cache/stats")
+async def cache_stats():
+    rec = await recomendador_actual()
+    return {
+        "recomendador": rec.cache.stats() if rec is not None and rec.cache is not None else None,
+        "buscar": merge_stats(indices_csv.caches()),
+        "limites": {endpoint: limite.stats() for endpoint, limite in LIMITES.items()},
+        # Bytes de los arreglos del recomendador (matriz TF-IDF, vecinos, ANN...)
+        "memoria": rec.memory_usage() if rec is not None else None,
+    }
+
+# Valores que ya se cuentan en otra parte: se leen al pedir /metrics
+def recolectar_metricas():
+    rec = recomendador
+    caches = {"buscar": merge_stats(indices_csv.caches())}
+    if rec is not None and rec.cache is not None:
+        caches["recomendador"] = rec.cache.stats()
+    for nombre, stats in caches.items():
+        CACHE_ACIERTOS.set_total(stats["hits"], cache=nombre)
+        CACHE_FALLOS.set_total(stats["misses"], cache=nombre)
+        CACHE_TASA.set(stats["hit_rate"], cache=nombre)
+        CACHE_ENTRADAS.set(stats["size"], cache=nombre)
+    for endpoint, limite in LIMITES.items():
+        EN_CURSO.set(limite.running, endpoint=endpoint)
+        EN_ESPERA.set(limite.waiting, endpoint=endpoint)
+        TIMEOUTS.set_total(limite.timeouts, endpoint=endpoint)
+        ABANDONADAS.set(limite.abandoned, endpoint=endpoint)
+    MEMORIA.clear()
+    if rec is not None:
+        for componente, bytes_ in rec.memory_usage().items():
+            MEMORIA.set(bytes_, componente=componente)
+
+
+metricas.on_collect(recolectar_metricas)
+
+
+# Métricas en el formato de texto de Prometheus
+@app.get("/metrics")
+async def metrics():
+    return Response(metricas.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Activa o desactiva en caliente los tiempos por etapa
+@app.post("/metrics/etapas")
+async def metrics_etapas(activo: bool):
+    global medir_etapas
+    medir_etapas = activo
+    return {"activo": medir_etapas}
 
 @app.get("/categorias")
-def categorias():
+async def categorias():
     return {"categorias": ["videojuegos", "peliculas", "libros", "musica", "series"]}
\ No newline at end of file
@@ -2,7 +2,7 @@
 
 This module provides a simple multimodal recommender system that combines
 content‑based filtering with basic collaborative filtering signals.  It loads
-items from a JSON database (generated by ``import_datasets.py``) and
+items from the catalog generated by ``import_datasets.py`` and
 pre‑computes TF–IDF representations of the textual fields for each item.
 
 The recommender exposes methods to return the top recommendations based on
@@ -17,73 +17,502 @@ current implementation is designed to be lightweight and self‑contained.
 
 from __future__ import annotations
 
-import json
 import os
-from typing import Dict, List, Optional, Tuple
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
 
 import numpy as np
+from scipy.sparse import csr_matrix, vstack
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import MinMaxScaler, normalize
+
+from ann import IVFIndex, LowRankProjection
+from autocomplete import PrefixIndex
+from bm25 import BM25Index
+from artifacts import (
+    bundle_lock,
+    bundle_path,
+    load_bundle,
+    load_compact_data,
+    load_delta,
+    load_neighbours,
+    save_bundle,
+    save_compact_data,
+    save_neighbours,
+)
+from cache import QueryCache
+from catalog import load_catalog
+from metrics import Stopwatch
+
+# Length of the precomputed neighbour list of every item (``/similares``)
+NEIGHBOURS = 20
+# Item fields indexed by search() (besides the tags)
+SEARCH_FIELDS = ("nombre", "autor", "artista", "director", "reseña")
+
+_T = TypeVar("_T")
+
+
+def normalize_gustos(gustos: List[str]) -> Tuple[str, ...]:
+    """Canonical, order-independent form of a list of tastes (cache key)."""
+    return tuple(sorted(g.strip().lower() for g in gustos if g.strip()))
+
+
+def top_k_indices(scores: np.ndarray, k: int, offset: int = 0) -> np.ndarray:
+    """Return the indices of ranks ``[offset, offset + k)`` by descending score.
+
+    Only the ``offset + k`` best entries are selected (``np.argpartition``)
+    and sorted, so the cost is linear in ``len(scores)`` instead of
+    ``n log n``.  Ties are broken by the lower index.
+    """
+    n = len(scores)
+    stop = min(offset + k, n)
+    if k <= 0 or offset >= n:
+        return np.empty(0, dtype=np.intp)
+    if stop < n:
+        # Value of the stop-th best score; items tied with it are taken in
+        # index order so the result does not depend on argpartition's choice.
+        threshold = scores[np.argpartition(-scores, stop - 1)[stop - 1]]
+        above = np.flatnonzero(scores > threshold)
+        tied = np.flatnonzero(scores == threshold)[:stop - len(above)]
+        candidates = np.concatenate([above, tied])
+    else:
+        candidates = np.arange(n)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][offset:stop]
 
 
 class MultimodalRecommender:
     """A simple recommender system combining content and rating signals."""
 
-    def __init__(self, db_path: str) -> None:
+    def __init__(
+        self,
+        db_path: str,
+        db: Optional[Dict[str, Sequence[Dict]]] = None,
+        cache_size: int = 1024,
+        cache_ttl: Optional[float] = 300.0,
+        artifacts_dir: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        ann: bool = False,
+        ann_components: int = 128,
+        ann_nprobe: int = 32,
+        ann_min_items: int = 20_000,
+        compact: bool = False,
+    ) -> None:
         self.db_path = db_path
-        self.db: Dict[str, List[Dict]] = {}
+        # Directory of persisted TF‑IDF bundles (see artifacts.py) and the
+        # SHA‑256 of the database the bundle must match
+        self.artifacts_dir = artifacts_dir
+        self.content_hash = content_hash
+        self.db: Dict[str, Sequence[Dict]] = db if db is not None else {}
         self.categories: List[str] = []
         self.vectorizer: Optional[TfidfVectorizer] = None
         self.tfidf_matrix: Optional[np.ndarray] = None
         self.rating_array: Optional[np.ndarray] = None
         self.items_index: List[Tuple[str, int]] = []  # (category, index_in_category)
-        self._load_data()
-
-    def _load_data(self) -> None:
-        """Load the JSON database and build TF‑IDF and rating matrices."""
-        if not os.path.exists(self.db_path):
-            raise FileNotFoundError(f"Database file not found: {self.db_path}")
-        with open(self.db_path, "r", encoding="utf-8") as f:
-            self.db = json.load(f)
+        # Items of a category occupy the contiguous rows [start, end)
+        self.category_ranges: Dict[str, Tuple[int, int]] = {}
+        self.category_matrices: Dict[str, csr_matrix] = {}
+        # Positions inside each category sorted by descending raw rating
+        self.rating_order: Dict[str, np.ndarray] = {}
+        # Approximate nearest-neighbour mode (see ann.py): categories with at
+        # least ``ann_min_items`` items get a low-rank projection and an IVF
+        # index; ``ann_nprobe`` trades recall for latency (measured table in
+        # ann.py, ``bench_ann.py`` to re-measure).
+        self.ann = ann
+        self.ann_components = ann_components
+        self.ann_nprobe = ann_nprobe
+        self.ann_min_items = ann_min_items
+        self.ann_indexes: Dict[str, Tuple[LowRankProjection, IVFIndex]] = {}
+        # Compact mode: float32 TF‑IDF values and ratings (see _compact)
+        self.compact = compact
+        # Most similar items of every row (positions in its category, -1
+        # pads short lists) and their similarity; see build_neighbours()
+        self.neighbour_ids: Optional[np.ndarray] = None
+        self.neighbour_scores: Optional[np.ndarray] = None
+        # category -> {item id -> position}, built on first use
+        self._positions: Dict[str, Dict[str, int]] = {}
+        # category -> BM25 index of search(), built on first use
+        self._bm25: Dict[str, BM25Index] = {}
+        # category -> name autocomplete index, built on first use
+        self._prefixes: Dict[str, PrefixIndex] = {}
+        # Guards the first build of the three lazy indexes above (see _lazy)
+        self._lazy_lock = threading.Lock()
+        # Results of recommend()/search(); a reload builds a new recommender,
+        # so the cache never outlives the data it was computed from.
+        self.cache: Optional[QueryCache] = QueryCache(cache_size, cache_ttl) if cache_size else None
+        self._load_data(reload=db is None)
+
+    def _load_data(self, reload: bool = True) -> None:
+        """Load the JSON database and build TF‑IDF and rating matrices.
+
+        With ``reload=False`` the already loaded ``self.db`` is used instead of
+        reading ``db_path`` (e.g. when the API hands over its catalog).  When
+        ``artifacts_dir`` is set, a bundle fitted on a database with the same
+        content hash is loaded instead of refitting (or, after an incremental
+        import, the previous bundle is updated for the changed categories);
+        either way a new bundle is written for the next process.
+        """
+        if reload:
+            if not os.path.exists(self.db_path):
+                raise FileNotFoundError(f"Database file not found: {self.db_path}")
+            self.db, self.content_hash = load_catalog(self.db_path)
         self.categories = list(self.db.keys())
 
+        # Items are laid out category after category
+        self.items_index = []
+        self.category_ranges = {}
+        for cat in self.categories:
+            start = len(self.items_index)
+            self.items_index.extend((cat, idx) for idx in range(len(self.db.get(cat, []))))
+            self.category_ranges[cat] = (start, len(self.items_index))
+
+        if self.artifacts_dir and self.content_hash:
+            ratings_raw = self._load_bundle()
+            if ratings_raw is None:
+                # One process fits; the others wait here and then load its bundle
+                with bundle_lock(self.artifacts_dir):
+                    ratings_raw = self._load_bundle()
+                    if ratings_raw is None:
+                        ratings_raw = self._update_from_delta()
+                        if ratings_raw is None:
+                            ratings_raw = self._fit()
+                        save_bundle(
+                            self.artifacts_dir,
+                            self.content_hash,
+                            self.vectorizer,
+                            self.tfidf_matrix,
+                            self.rating_array,
+                            ratings_raw,
+                            self.category_ranges,
+                        )
+        else:
+            ratings_raw = self._fit()
+        if self.compact:
+            self._compact()
+
+        self.category_matrices = {
+            cat: self._row_block(start, end)
+            for cat, (start, end) in self.category_ranges.items()
+        }
+        # Precompute the rating order used by top10() and method="cf"
+        self.rating_order = {
+            cat: np.argsort(-ratings_raw[start:end], kind="stable")
+            for cat, (start, end) in self.category_ranges.items()
+        }
+        self.ann_indexes = {}
+        if self.ann:
+            self._build_ann()
+
+    def _compact(self) -> None:
+        """Keep the TF‑IDF values and the ratings as float32, indices as int32.
+
+        TF‑IDF rows are L2-normalised, so similarities remain plain dot
+        products; the values take half the memory and products run in
+        float32.  The float32 values are saved in the bundle, so processes
+        serving it share one memory-mapped copy.
+        """
+        m = self.tfidf_matrix
+        indptr_dtype = np.int32 if m.nnz < 2**31 else np.int64
+        if self.artifacts_dir and self.content_hash:
+            data = self._load_compact(m.nnz)
+            if data is None:
+                # One process converts and saves; the others wait and load its file
+                with bundle_lock(self.artifacts_dir):
+                    data = self._load_compact(m.nnz)
+                    if data is None:
+                        data = np.asarray(m.data, dtype=np.float32)
+                        if os.path.isdir(bundle_path(self.artifacts_dir, self.content_hash)):
+                            save_compact_data(self.artifacts_dir, self.content_hash, data)
+        else:
+            data = np.asarray(m.data, dtype=np.float32)
+        self.tfidf_matrix = csr_matrix(
+            (data, m.indices.astype(np.int32, copy=False), m.indptr.astype(indptr_dtype, copy=False)),
+            shape=m.shape,
+            copy=False,
+        )
+        self.rating_array = np.asarray(self.rating_array, dtype=np.float32)
+
+    def _load_compact(self, nnz: int) -> Optional[np.ndarray]:
+        data = load_compact_data(self.artifacts_dir, self.content_hash)
+        return data if data is not None and len(data) == nnz else None
+
+    def _build_ann(self) -> None:
+        """Fit a projection and an IVF index for every large category."""
+        for cat, matrix in self.category_matrices.items():
+            if matrix.shape[0] < max(self.ann_min_items, 2):
+                continue
+            projection = LowRankProjection(self.ann_components)
+            index = IVFIndex(nprobe=self.ann_nprobe).fit(projection.fit_transform(matrix))
+            self.ann_indexes[cat] = (projection, index)
+
+    def _load_bundle(self) -> Optional[np.ndarray]:
+        """Use the persisted bundle of this catalog; return its raw ratings.
+
+        Returns ``None`` when there is no bundle for ``content_hash`` (or it
+        was built for a different item layout).
+        """
+        bundle = load_bundle(self.artifacts_dir, self.content_hash)
+        if bundle is None or bundle["category_ranges"] != self.category_ranges:
+            return None
+        self.vectorizer = bundle["vectorizer"]
+        self.tfidf_matrix = bundle["tfidf_matrix"]
+        self.rating_array = bundle["rating_array"]
+        self.neighbour_ids = bundle["neighbour_ids"]
+        self.neighbour_scores = bundle["neighbour_scores"]
+        return bundle["ratings_raw"]
+
+    @staticmethod
+    def _corpus(items: Sequence[Dict]) -> Tuple[List[str], List[float]]:
+        """Return the TF‑IDF documents and raw ratings of a list of items."""
+        corpus: List[str] = []
+        ratings: List[float] = []
+        for item in items:
+            text_parts = [
+                item.get("nombre", ""),
+                item.get("reseña", ""),
+                item.get("sinopsis", ""),
+                " ".join(item.get("tags", [])),
+            ]
+            corpus.append(" ".join(part for part in text_parts if part))
+            # Use stored rating if available; otherwise fall back to 0
+            calificacion = item.get("calificacion", 0.0)
+            # Normalize ratings later with MinMaxScaler
+            ratings.append(float(calificacion) if calificacion else 0.0)
+        return corpus, ratings
+
+    def _fit(self) -> np.ndarray:
+        """Fit the TF‑IDF model and rating scaler; return the raw ratings."""
         # Flatten items across all categories to build a common vocabulary
         corpus: List[str] = []
         ratings: List[float] = []
-        self.items_index = []
         for cat in self.categories:
-            items = self.db.get(cat, [])
-            for idx, item in enumerate(items):
-                text_parts = [
-                    item.get("nombre", ""),
-                    item.get("reseña", ""),
-                    item.get("sinopsis", ""),
-                    " ".join(item.get("tags", [])),
-                ]
-                corpus.append(" ".join(part for part in text_parts if part))
-                # Use stored rating if available; otherwise fall back to 0
-                calificacion = item.get("calificacion", 0.0)
-                # Normalize ratings later with MinMaxScaler
-                ratings.append(float(calificacion) if calificacion else 0.0)
-                self.items_index.append((cat, idx))
+            cat_corpus, cat_ratings = self._corpus(self.db.get(cat, []))
+            corpus.extend(cat_corpus)
+            ratings.extend(cat_ratings)
 
         # Create TF‑IDF matrix
-            self.vectorizer = TfidfVectorizer(stop_words=None, max_features=5000)
+        self.vectorizer = TfidfVectorizer(stop_words=None, max_features=5000)
         self.tfidf_matrix = self.vectorizer.fit_transform(corpus)
 
         # Normalize ratings to 0–1 range
         ratings_np = np.array(ratings).reshape(-1, 1)
         scaler = MinMaxScaler()
         self.rating_array = scaler.fit_transform(ratings_np).flatten()
+        return ratings_np.ravel()
+
+    def _update_from_delta(self) -> Optional[np.ndarray]:
+        """Build the matrices from the previous catalog's bundle, if possible.
+
+        ``import_datasets.py`` leaves a delta naming the categories it
+        re-imported.  Their rows are re-vectorized with the previous
+        vocabulary and IDF weights; the rows of every other category are
+        copied from the previous bundle.  Returns the raw ratings, or ``None``
+        when no usable delta/bundle exists (the caller then refits).  Run the
+        import with ``--full`` to refresh the vocabulary itself.
+        """
+        if not self.artifacts_dir or not self.content_hash:
+            return None
+        delta = load_delta(self.artifacts_dir, self.content_hash)
+        if delta is None:
+            return None
+        base = load_bundle(self.artifacts_dir, delta["base_hash"])
+        if base is None:
+            return None
+        changed = set(delta["changed"])
+        base_matrix = base["tfidf_matrix"]
+        blocks = []
+        ratings = []
+        for cat in self.categories:
+            start, end = self.category_ranges[cat]
+            old = base["category_ranges"].get(cat)
+            if cat in changed or old is None:
+                corpus, cat_ratings = self._corpus(self.db.get(cat, []))
+                if corpus:
+                    blocks.append(base["vectorizer"].transform(corpus))
+                else:
+                    blocks.append(csr_matrix((0, base_matrix.shape[1])))
+                ratings.append(np.asarray(cat_ratings, dtype=float))
+            elif old[1] - old[0] == end - start:
+                blocks.append(base_matrix[old[0]:old[1]])
+                ratings.append(np.asarray(base["ratings_raw"][old[0]:old[1]], dtype=float))
+            else:
+                return None
+        self.vectorizer = base["vectorizer"]
+        self.tfidf_matrix = vstack(blocks, format="csr")
+        ratings_np = np.concatenate(ratings).reshape(-1, 1)
+        self.rating_array = MinMaxScaler().fit_transform(ratings_np).flatten()
+        return ratings_np.ravel()
+
+    def _row_block(self, start: int, end: int) -> csr_matrix:
+        """Return rows ``[start, end)`` of the TF‑IDF matrix without copying.
+
+        ``data`` and ``indices`` are views into the full matrix; only the
+        (small) ``indptr`` array is rebased.
+        """
+        m = self.tfidf_matrix
+        lo, hi = m.indptr[start], m.indptr[end]
+        return csr_matrix(
+            (m.data[lo:hi], m.indices[lo:hi], m.indptr[start:end + 1] - lo),
+            shape=(end - start, m.shape[1]),
+            copy=False,
+        )
+
+    def _get_indices_for_category(self, categoria: str) -> range:
+        """Return the global indices corresponding to a given category."""
+        start, end = self.category_ranges.get(categoria, (0, 0))
+        return range(start, end)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Bytes held by the arrays of the recommender, per component.
+
+        Arrays loaded from a bundle are memory-mapped: they are counted here
+        although their pages are shared by every process serving the bundle.
+        """
+        m = self.tfidf_matrix
+        usage = {
+            "tfidf_data": m.data.nbytes,
+            "tfidf_indices": m.indices.nbytes,
+            # Global row pointers plus the rebased ones of the category views
+            "tfidf_indptr": m.indptr.nbytes
+            + sum(view.indptr.nbytes for view in self.category_matrices.values()),
+            "ratings": self.rating_array.nbytes
+            + sum(order.nbytes for order in self.rating_order.values()),
+            "neighbours": 0,
+            "ann": 0,
+        }
+        if self.neighbour_ids is not None:
+            usage["neighbours"] = self.neighbour_ids.nbytes + self.neighbour_scores.nbytes
+        for projection, index in self.ann_indexes.values():
+            usage["ann"] += sum(
+                a.nbytes
+                for a in (projection.components, index.centroids, index.order, index.offsets, index.vectors)
+            )
+        usage["total"] = sum(usage.values())
+        return usage
+
+    def ensure_neighbours(self, n: int = NEIGHBOURS) -> bool:
+        """Load or build the neighbour lists unless they are already in memory.
+
+        This is the entry point for processes preparing a catalog (the
+        pre-fork master, ``import_datasets.py``): the check and the build
+        happen under :func:`bundle_lock` (see :meth:`build_neighbours`), so
+        concurrent processes compute them once.  Returns ``True`` if this
+        process computed them.
+        """
+        if self.neighbour_ids is not None and self.neighbour_ids.shape[1] >= n:
+            return False
+        return self.build_neighbours(n)
+
+    def build_neighbours(self, n: int = NEIGHBOURS, max_block: int = 1 << 24) -> bool:
+        """Precompute the ``n`` most similar items of every item.
+
+        Each category is processed in blocks of rows whose dense similarity
+        matrix holds at most ``max_block`` entries, so memory stays bounded
+        whatever the catalog size.  Results are stored as compact ``int32``
+        positions and ``float16`` scores and, when ``artifacts_dir`` is set,
+        saved in the bundle so the API serves them without recomputing.
+
+        With a bundle, the work runs under :func:`bundle_lock`: a process
+        that finds the lists already saved by another one loads them instead
+        of recomputing.  Returns ``True`` if the lists were computed here.
+        """
+        if not (self.artifacts_dir and self.content_hash):
+            self._compute_neighbours(n, max_block)
+            return True
+        with bundle_lock(self.artifacts_dir):
+            saved = load_neighbours(self.artifacts_dir, self.content_hash)
+            if saved is not None and saved[0].shape == (len(self.items_index), n):
+                self.neighbour_ids, self.neighbour_scores = saved
+                return False
+            self._compute_neighbours(n, max_block)
+            # The bundle may have been pruned by a newer catalog meanwhile
+            if os.path.isdir(bundle_path(self.artifacts_dir, self.content_hash)):
+                save_neighbours(self.artifacts_dir, self.content_hash, self.neighbour_ids, self.neighbour_scores)
+        return True
 
-    def _get_indices_for_category(self, categoria: str) -> List[int]:
-        """Return the list of global indices corresponding to a given category."""
-        indices = []
-        for global_idx, (cat, idx_in_cat) in enumerate(self.items_index):
-            if cat == categoria:
-                indices.append(global_idx)
-        return indices
+    def _compute_neighbours(self, n: int, max_block: int) -> None:
+        total = len(self.items_index)
+        ids = np.full((total, n), -1, dtype=np.int32)
+        scores = np.zeros((total, n), dtype=np.float16)
+        for cat, (start, end) in self.category_ranges.items():
+            size = end - start
+            k = min(n, size - 1)
+            if k <= 0:
+                continue
+            matrix = self.category_matrices[cat]
+            matrix_t = matrix.T.tocsr()
+            rows = max(1, max_block // size)
+            for lo in range(0, size, rows):
+                hi = min(lo + rows, size)
+                sims = (matrix[lo:hi] @ matrix_t).toarray()
+                # An item is not its own neighbour
+                sims[np.arange(hi - lo), np.arange(lo, hi)] = -1.0
+                best = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(sims, best, axis=1)
+                order = np.lexsort((best, -best_scores))
+                best = np.take_along_axis(best, order, axis=1)
+                best_scores = np.take_along_axis(best_scores, order, axis=1)
+                # Items sharing no term with this one are not neighbours
+                best[best_scores <= 0] = -1
+                ids[start + lo:start + hi, :k] = best
+                scores[start + lo:start + hi, :k] = np.maximum(best_scores, 0)
+        self.neighbour_ids = ids
+        self.neighbour_scores = scores
+
+    def item_position(self, categoria: str, item_id: str) -> Optional[int]:
+        """Position in its category of the item with stable id ``item_id``.
+
+        Catalogs imported before items had an ``id`` field are addressed by
+        position instead.
+        """
+        positions = self._lazy(
+            self._positions,
+            categoria,
+            lambda: {str(item.get("id") or idx): idx for idx, item in enumerate(self.db.get(categoria, []))},
+        )
+        return positions.get(item_id)
+
+    def _lazy(self, store: Dict[str, _T], categoria: str, build: Callable[[], _T]) -> _T:
+        """``store[categoria]``, calling ``build()`` the first time only.
+
+        Double-checked locking as in ``CsvSearchIndex.bm25``: concurrent
+        first requests (thread executor) build the index once, the others
+        wait for it; later lookups take no lock.
+        """
+        value = store.get(categoria)
+        if value is None:
+            with self._lazy_lock:
+                value = store.get(categoria)
+                if value is None:
+                    value = build()
+                    store[categoria] = value
+        return value
+
+    def neighbours(self, categoria: str, idx: int, n: int = 10) -> List[Tuple[int, float]]:
+        """Return ``(position, similarity)`` of the items most similar to ``idx``.
+
+        Read from the precomputed lists when available; otherwise the item's
+        row is scored against its category.
+        """
+        start, end = self.category_ranges.get(categoria, (0, 0))
+        if not 0 <= idx < end - start:
+            return []
+        if self.neighbour_ids is not None and n <= self.neighbour_ids.shape[1]:
+            ids = self.neighbour_ids[start + idx, :n]
+            sims = self.neighbour_scores[start + idx, :n]
+            return [(int(i), float(s)) for i, s in zip(ids, sims) if i >= 0]
+        matrix = self.category_matrices[categoria]
+        sims = matrix @ matrix[idx].toarray().ravel()
+        sims[idx] = -1.0
+        return [(int(i), float(sims[i])) for i in top_k_indices(sims, n) if sims[i] > 0]
+
+    def similar_items(self, categoria: str, item_id: str, n: int = 10) -> List[Dict]:
+        """Items most similar in content to the item ``item_id`` ("more like this")."""
+        idx = self.item_position(categoria, item_id)
+        if idx is None:
+            return []
+        items = self.db[categoria]
+        return [items[pos] for pos, _ in self.neighbours(categoria, idx, n)]
 
     def recommend(
         self,
@@ -91,6 +520,8 @@ class MultimodalRecommender:
         gustos: List[str],
         method: str = "multimodal",
         top_k: int = 10,
+        offset: int = 0,
+        exact: bool = False,
     ) -> List[Dict]:
         """Recommend items for a category given a list of user preferences.
 
@@ -106,72 +537,234 @@ class MultimodalRecommender:
             ``multimodal`` combines content similarity and normalized ratings.
         top_k: int, optional
             Number of recommendations to return (default is 10).
+        offset: int, optional
+            Number of ranked items to skip, for pagination (default is 0).
+        exact: bool, optional
+            Score every item even when the category has an ANN index.
 
         Returns
         -------
         List[Dict]
             List of item dictionaries sorted by relevance.
         """
+        if self.cache is None:
+            return self.recommend_batch(categoria, [gustos], method, top_k, offset, exact=exact)[0]
+        key = self.cache_key(categoria, gustos, method, top_k, offset, exact)
+        return self.cache.get_or_compute(
+            key, lambda: self.recommend_batch(categoria, [gustos], method, top_k, offset, exact=exact)[0]
+        )
+
+    @staticmethod
+    def cache_key(
+        categoria: str,
+        gustos: List[str],
+        method: str = "multimodal",
+        top_k: int = 10,
+        offset: int = 0,
+        exact: bool = False,
+    ) -> Tuple:
+        """Key of a ``recommend`` call in ``self.cache``."""
+        # Word order does not change the TF‑IDF vector, so sorted tastes share an entry
+        return ("recommend", categoria, normalize_gustos(gustos), method, top_k, offset, exact)
+
+    def recommend_batch(
+        self,
+        categoria: str,
+        gustos_list: List[List[str]],
+        method: str = "multimodal",
+        top_k: int = 10,
+        offset: int = 0,
+        block_size: int = 256,
+        exact: bool = False,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> List[List[Dict]]:
+        """Recommend items for many users of the same category at once.
+
+        All tastes are vectorized with a single ``vectorizer.transform`` call
+        and scored against the category TF‑IDF block with one sparse matrix
+        product per ``block_size`` users (which bounds the size of the dense
+        score matrix).  ``recommend`` is this method with a single user, so
+        both return exactly the same items.
+
+        Categories with an ANN index (and ``exact=False``) only score a
+        candidate pool instead, see ``_recommend_ann``.
+
+        When a ``timings`` dict is given, the seconds spent in each stage
+        (``vectorize``, ``similarity`` or ``ann``, ``ranking``, ``items``) are
+        added to it.
+
+        Returns
+        -------
+        List[List[Dict]]
+            One recommendation list per entry of ``gustos_list``, in order.
+        """
+        results: List[List[Dict]] = [[] for _ in gustos_list]
         if categoria not in self.db:
-            return []
-        gustos_text = " ".join([g.strip().lower() for g in gustos])
-        if not gustos_text:
-            # If no tastes provided, fallback to top items by rating
-            return self.top10(categoria)
-
-        # Compute content similarity
-        gustos_vec = self.vectorizer.transform([gustos_text])
-        # Filter indices for this category
-        cat_indices = self._get_indices_for_category(categoria)
-        if not cat_indices:
-            return []
-        cat_tfidf = self.tfidf_matrix[cat_indices]
-        similarity_scores = cosine_similarity(gustos_vec, cat_tfidf).flatten()
+            return results
+        watch = Stopwatch(timings)
+        texts = [" ".join([g.strip().lower() for g in gustos]) for gustos in gustos_list]
+        scored: List[int] = []
+        for pos, gustos_text in enumerate(texts):
+            if not gustos_text or method == "cf":
+                # Rating-only ranking (also the fallback when no tastes are given)
+                results[pos] = self.top10(categoria, offset=offset, limit=top_k)
+            else:
+                scored.append(pos)
+        # Rows of this category (precomputed in _load_data)
+        start, end = self.category_ranges.get(categoria, (0, 0))
+        if not scored or start == end:
+            return results
+
+        # Compute content similarity (TF‑IDF rows are already L2-normalized)
+        gustos_vecs = normalize(self.vectorizer.transform([texts[pos] for pos in scored]))
+        gustos_vecs = gustos_vecs.astype(self.tfidf_matrix.dtype, copy=False)
+        cat_tfidf = self.category_matrices[categoria]
+        items = self.db[categoria]
+        watch.lap("vectorize")
+        if not exact and categoria in self.ann_indexes:
+            ranked = self._recommend_ann(categoria, gustos_vecs, method, top_k, offset)
+            watch.lap("ann")
+            for pos, ranked_indices in zip(scored, ranked):
+                results[pos] = [items[rank_idx] for rank_idx in ranked_indices]
+            watch.lap("items")
+            return results
+        for lo in range(0, len(scored), block_size):
+            # (items × users) product against the dense tastes block: the
+            # large matrix stays in CSR form and the result is dense anyway
+            block = gustos_vecs[lo:lo + block_size].T.toarray()
+            similarity_scores = np.ascontiguousarray((cat_tfidf @ block).T)
+            watch.lap("similarity")
+            combined_scores = self._combine_scores(similarity_scores, start, end, method)
+            # Partial selection of the best offset + top_k scores
+            ranked = [top_k_indices(row, top_k, offset) for row in combined_scores]
+            watch.lap("ranking")
+            for pos, ranked_indices in zip(scored[lo:lo + block_size], ranked):
+                results[pos] = [items[rank_idx] for rank_idx in ranked_indices]
+            watch.lap("items")
+        return results
+
+    def _recommend_ann(
+        self, categoria: str, gustos_vecs: csr_matrix, method: str, top_k: int, offset: int
+    ) -> List[np.ndarray]:
+        """Rank a candidate pool per user instead of the whole category.
 
-        # Normalize similarity scores to 0–1
-        sim_norm = (similarity_scores - similarity_scores.min())
-        if similarity_scores.max() > 0:
-            sim_norm = sim_norm / (similarity_scores.max() - similarity_scores.min())
+        The pool holds the nearest items in the low-rank space (IVF search)
+        and, for ``multimodal``, the best rated items, so high ratings can
+        still win with a modest similarity.  Candidates are then scored
+        exactly like ``recommend_batch`` does, except that similarities are
+        scaled by the pool maximum (the category minimum is 0 for any
+        catalog large enough to be indexed).  Returns positions in the
+        category.
+        """
+        start, _ = self.category_ranges[categoria]
+        projection, index = self.ann_indexes[categoria]
+        cat_tfidf = self.category_matrices[categoria]
+        pool = max(10 * (offset + top_k), 200)
+        rated = self.rating_order[categoria][:pool] if method == "multimodal" else np.empty(0, np.int64)
+        ranked = []
+        for vec, (ids, _) in zip(gustos_vecs, index.search(projection.transform(gustos_vecs), pool)):
+            # Sorted ids, so ties are still broken by the lower position
+            candidates = np.union1d(ids, rated)
+            similarity = (cat_tfidf[candidates] @ vec.T).toarray().ravel()
+            top = similarity.max()
+            if top > 0:
+                similarity /= top
+            if method == "multimodal":
+                scores = 0.7 * similarity + 0.3 * self.rating_array[start + candidates]
+            else:
+                scores = similarity
+            ranked.append(candidates[top_k_indices(scores, top_k, offset)])
+        return ranked
+
+    def _combine_scores(
+        self, similarity_scores: np.ndarray, start: int, end: int, method: str
+    ) -> np.ndarray:
+        """Turn a (users × items) similarity block into ranking scores."""
+        # Normalize similarity scores to 0–1, row by row
+        lo = similarity_scores.min(axis=1, keepdims=True)
+        span = similarity_scores.max(axis=1, keepdims=True) - lo
+        sim_norm = similarity_scores - lo
+        np.divide(sim_norm, span, out=sim_norm, where=span > 0)
 
         # Combine with ratings according to method
-        combined_scores = sim_norm.copy()
-        if method == "cf":
-            combined_scores = self.rating_array[cat_indices]
-        elif method == "multimodal":
-            rating_scores = self.rating_array[cat_indices]
+        if method == "multimodal":
+            rating_scores = self.rating_array[start:end]
             # Weighted sum: 0.7 content similarity + 0.3 rating
-            combined_scores = 0.7 * sim_norm + 0.3 * rating_scores
+            return 0.7 * sim_norm + 0.3 * rating_scores
         # else: default is cbf, so use sim_norm only
+        return sim_norm
+
+    def top10(self, categoria: str, offset: int = 0, limit: int = 10) -> List[Dict]:
+        """Return the top items in a category by rating (10 by default).
 
-        # Sort indices by score descending
-        ranked_indices = np.argsort(combined_scores)[::-1][:top_k]
-        recommendations: List[Dict] = []
-        for rank_idx in ranked_indices:
-            global_idx = cat_indices[rank_idx]
-            cat, idx_in_cat = self.items_index[global_idx]
-            item = self.db[cat][idx_in_cat]
-            recommendations.append(item)
-        return recommendations
-
-    def top10(self, categoria: str) -> List[Dict]:
-        """Return the top 10 items in a category by rating."""
-        items = self.db.get(categoria, [])
-        items_sorted = sorted(items, key=lambda x: x.get("calificacion", 0), reverse=True)
-        return items_sorted[:10]
+        Uses the order precomputed in ``_load_data``; ``offset`` and ``limit``
+        select a page of it.
+        """
+        order = self.rating_order.get(categoria)
+        if order is None:
+            return []
+        items = self.db[categoria]
+        return [items[idx] for idx in order[offset:offset + limit]]
+
+    def autocomplete(self, categoria: str, prefix: str, limit: int = 10) -> List[Dict]:
+        """Most reviewed (then best rated) items whose name starts with ``prefix``."""
+        if categoria not in self.db:
+            return []
+        items = self.db[categoria]
+        index = self._lazy(
+            self._prefixes,
+            categoria,
+            lambda: PrefixIndex(
+                [item.get("nombre", "") for item in items],
+                self._column(categoria, "num_reseñas"),
+                self._column(categoria, "calificacion"),
+            ),
+        )
+        return [items[idx] for idx in index.complete(prefix, limit)]
+
+    def _column(self, categoria: str, field: str) -> np.ndarray:
+        """Numeric field of every item of a category (read from the columnar
+        file without decoding items when possible)."""
+        items = self.db[categoria]
+        column = getattr(items, "column", None)
+        values = column(field) if column is not None else None
+        if values is None:
+            values = np.array([float(item.get(field) or 0) for item in items])
+        return values
 
     def get_categorias(self) -> List[str]:
         return self.categories.copy()
 
-    def search(self, categoria: str, query: str) -> List[Dict]:
-        """Perform a simple case‑insensitive search by name, author or title."""
-        items = self.db.get(categoria, [])
+    def search(self, categoria: str, query: str, top_k: int = 20) -> List[Dict]:
+        """Return the ``top_k`` items of a category ranked by BM25.
+
+        Name, author/artist/director, genre and tags are indexed with the
+        TF‑IDF tokenizer (see ``bm25.py``).
+        """
         q = query.lower()
-        resultados = []
-        for item in items:
-            if (
-                q in item.get("nombre", "").lower()
-                or q in item.get("autor", "").lower()
-                or q in item.get("titulo", "").lower()
-            ):
-                resultados.append(item)
-        return resultados
+        if self.cache is None:
+            return self._search(categoria, q, top_k)
+        return self.cache.get_or_compute(
+            ("search", categoria, q, top_k), lambda: self._search(categoria, q, top_k)
+        )
+
+    def _search(self, categoria: str, q: str, top_k: int) -> List[Dict]:
+        if categoria not in self.db:
+            return []
+        index = self._lazy(
+            self._bm25,
+            categoria,
+            lambda: BM25Index(
+                (
+                    " ".join(
+                        [str(item.get(field) or "") for field in SEARCH_FIELDS]
+                        + list(item.get("tags") or [])
+                    )
+                    for item in self.db[categoria]
+                ),
+                analyzer=self.vectorizer.build_analyzer(),
+            ),
+        )
+        items = self.db[categoria]
+        ids, _ = index.top_k(q, top_k)
+        return [items[idx] for idx in ids]
@@ -0,0 +1,81 @@
+"""Recommendation scoring in worker processes.
+
+Scoring a request is CPU-bound NumPy/SciPy work.  The API runs it in a
+``ProcessPoolExecutor`` whose workers call :func:`init_worker` once: each
+opens the catalog with its own :class:`catalog.CatalogStore` and builds a
+:class:`recommender.MultimodalRecommender` from the persisted artifacts
+(no refit).  Workers reload on their own when the catalog file changes.
+
+Results cross the process boundary, so items are returned as plain dicts,
+together with the content hash of the catalog they were computed on.  The
+recommender of a worker has no result cache: the API process keeps the
+cache and only stores results computed on its own catalog version.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+from catalog import CatalogSnapshot, CatalogStore
+from metrics import Stopwatch
+from recommender import MultimodalRecommender
+
+_store: Optional[CatalogStore] = None
+_recommender: Optional[MultimodalRecommender] = None
+_options: Dict = {}
+
+
+def init_worker(db_path: str, options: Dict) -> None:
+    """Load the catalog and the recommender of this worker process.
+
+    ``options`` are keyword arguments of ``MultimodalRecommender`` (e.g.
+    ``artifacts_dir``, ``ann``).
+    """
+    global _store, _options
+    _options = dict(options, cache_size=0)
+    _store = CatalogStore(db_path)
+    _store.add_listener(_build)
+    _build(_store.snapshot())
+
+
+def _build(snapshot: CatalogSnapshot) -> None:
+    global _recommender
+    if not any(snapshot.items.values()):
+        _recommender = None
+        return
+    _recommender = MultimodalRecommender(
+        _store.db_path, db=snapshot.items, content_hash=snapshot.content_hash, **_options
+    )
+
+
+def ready() -> bool:
+    """No-op task; submitting one per worker starts the whole pool."""
+    return _store is not None
+
+
+def recommend_batch(
+    categoria: str,
+    gustos_list: List[List[str]],
+    method: str = "multimodal",
+    top_k: int = 10,
+    offset: int = 0,
+    exact: bool = False,
+    timed: bool = False,
+) -> Tuple[Optional[str], List[List[Dict]], Optional[Dict[str, float]]]:
+    """``MultimodalRecommender.recommend_batch`` in the worker.
+
+    Returns ``(content hash of the catalog used, results, timings)``; with
+    ``timed=True`` timings holds the seconds of each stage (see
+    ``recommend_batch``, plus ``copy`` for turning items into dicts),
+    otherwise it is ``None``.
+    """
+    timings: Optional[Dict[str, float]] = {} if timed else None
+    _store.snapshot()  # reload if the catalog changed
+    rec = _recommender
+    if rec is None:
+        return None, [[] for _ in gustos_list], timings
+    results = rec.recommend_batch(categoria, gustos_list, method, top_k, offset, exact=exact, timings=timings)
+    watch = Stopwatch(timings)
+    results = [[dict(item) for item in items] for items in results]
+    watch.lap("copy")
+    return rec.content_hash, results, timings
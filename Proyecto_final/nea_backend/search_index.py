@@ -0,0 +1,327 @@
+"""Inverted indexes over the dataset CSV files used by ``/buscar``.
+
+``buscar_en_csv`` used to reopen the CSV and test every relevant column of
+every row for each query.  :class:`CsvSearchIndex` reads the file once and
+keeps:
+
+* n-gram postings (1, 2 and 3 characters) over the lower-cased values of the
+  searchable fields.  Grams are generated per field, so a query of up to
+  three characters is answered exactly by a single posting list; longer
+  queries intersect the postings of their trigrams and verify the few
+  surviving candidates with a plain substring test.  Results are therefore
+  identical to the old linear scan.
+* column indexes for the filter fields, mapping each distinct value to the
+  rows holding it.  Substring filters only scan the distinct values, which
+  are far fewer than the rows.
+
+Posting lists are sorted ``int32`` NumPy arrays, so every result comes back
+in file order, as before.  Each index also memoises the matching row numbers
+in a :class:`cache.QueryCache`; a changed CSV gets a new index and thus an
+empty cache.  :meth:`CsvSearchIndex.iter_search` turns them into rows lazily,
+starting after a cursor (a row number), for paginated or streamed responses.
+
+:meth:`CsvSearchIndex.ranked` ranks by BM25 (``bm25.py``) over the
+``campos_relevancia`` columns instead of returning file order; the BM25
+index is built on the first ranked query.  Its filters are boolean masks
+over the rows, memoised per filter value.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from bm25 import BM25Index
+from cache import QueryCache
+
+NGRAM_MAX = 3
+
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+def _ngrams(text: str, n: int) -> Iterable[str]:
+    return (text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def _postings(index: Dict[str, List[int]]) -> Dict[str, np.ndarray]:
+    return {key: np.asarray(rows, dtype=np.int32) for key, rows in index.items()}
+
+
+class CsvSearchIndex:
+    """Searchable, in-memory copy of one dataset CSV.
+
+    Parameters
+    ----------
+    path: str
+        CSV file to index.
+    campos: List[str]
+        Columns matched by the free-text query.
+    filtros: Dict[str, str]
+        Filter name -> column, as accepted in ``SearchQuery.filtros``.
+    filtros_exactos: Iterable[str], optional
+        Filter names compared by exact (stripped) equality instead of
+        case-insensitive substring.
+    proyeccion: Dict[str, str], optional
+        Output key -> column.  When given, only these fields of each row are
+        kept and returned (what the frontend renders).
+    cache_size: int, optional
+        Entries of the result cache (``0`` disables it).
+    campos_relevancia: List[str], optional
+        Columns indexed for BM25 ranking (name, author, genre...).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        campos: List[str],
+        filtros: Dict[str, str],
+        filtros_exactos: Iterable[str] = (),
+        proyeccion: Optional[Dict[str, str]] = None,
+        cache_size: int = 256,
+        campos_relevancia: Optional[List[str]] = None,
+    ) -> None:
+        self.path = path
+        self.campos_relevancia = campos_relevancia or []
+        self.campos = campos
+        self.filtros = filtros
+        self.filtros_exactos = set(filtros_exactos)
+        self.proyeccion = proyeccion
+        self.cache: Optional[QueryCache] = QueryCache(cache_size) if cache_size else None
+        self.rows: List[Dict] = []
+        # Lower-cased searchable values of each row, for verifying long queries
+        self.valores: List[Tuple[str, ...]] = []
+        self.ngrams: Dict[str, np.ndarray] = {}
+        # filtro -> {valor de la columna -> filas}
+        self.columnas: Dict[str, Dict[str, np.ndarray]] = {}
+        # Text of the campos_relevancia of each row, until the BM25 index exists
+        self._textos: List[str] = []
+        self._bm25: Optional[BM25Index] = None
+        self._bitsets = QueryCache(256, ttl=None)
+        self._lock = threading.Lock()
+        self._build()
+
+    def _build(self) -> None:
+        grams: Dict[str, List[int]] = {}
+        columnas: Dict[str, Dict[str, List[int]]] = {}
+        with open(self.path, encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            fieldnames = reader.fieldnames or []
+            filtros = {k: v for k, v in self.filtros.items() if v in fieldnames}
+            for n, row in enumerate(reader):
+                if self.proyeccion is None:
+                    self.rows.append(row)
+                else:
+                    self.rows.append({k: row.get(v, "") for k, v in self.proyeccion.items()})
+                valores = tuple(
+                    str(row[campo]).lower()
+                    for campo in self.campos
+                    if campo in row and row[campo]
+                )
+                self.valores.append(valores)
+                if self.campos_relevancia:
+                    self._textos.append(" ".join(str(row.get(c) or "") for c in self.campos_relevancia))
+                seen = set()
+                for valor in valores:
+                    for size in range(1, NGRAM_MAX + 1):
+                        seen.update(_ngrams(valor, size))
+                for gram in seen:
+                    grams.setdefault(gram, []).append(n)
+                for filtro, campo in filtros.items():
+                    if filtro in self.filtros_exactos:
+                        key = str(row[campo]).strip()
+                    else:
+                        key = str(row[campo]).lower()
+                    columnas.setdefault(filtro, {}).setdefault(key, []).append(n)
+        self.ngrams = _postings(grams)
+        self.columnas = {filtro: _postings(values) for filtro, values in columnas.items()}
+
+    def _match_query(self, q: str) -> Optional[np.ndarray]:
+        """Rows whose searchable fields contain ``q`` (``None`` means all)."""
+        if not q:
+            return None
+        if len(q) <= NGRAM_MAX:
+            return self.ngrams.get(q, _EMPTY)
+        candidates: Optional[np.ndarray] = None
+        # Intersect the rarest trigrams first so the candidate set shrinks fast
+        postings = sorted(
+            (self.ngrams.get(gram, _EMPTY) for gram in set(_ngrams(q, NGRAM_MAX))),
+            key=len,
+        )
+        for posting in postings:
+            candidates = posting if candidates is None else np.intersect1d(candidates, posting, assume_unique=True)
+            if not len(candidates):
+                return _EMPTY
+        return np.fromiter(
+            (n for n in candidates if any(q in v for v in self.valores[n])),
+            dtype=np.int32,
+        )
+
+    def _match_filter(self, filtro: str, valor) -> Optional[np.ndarray]:
+        """Rows accepted by one filter (``None`` means the filter is ignored)."""
+        columna = self.columnas.get(filtro)
+        if columna is None:
+            return None
+        if filtro in self.filtros_exactos:
+            return columna.get(str(valor).strip(), _EMPTY)
+        v = str(valor).lower()
+        matches = [rows for key, rows in columna.items() if v in key]
+        if not matches:
+            return _EMPTY
+        if len(matches) == 1:
+            return matches[0]
+        return np.unique(np.concatenate(matches))
+
+    def _bitset(self, filtro: str, valor) -> Optional[np.ndarray]:
+        """Boolean mask of the rows accepted by one filter (memoised)."""
+        def compute() -> Optional[np.ndarray]:
+            rows = self._match_filter(filtro, valor)
+            if rows is None:
+                return None
+            mask = np.zeros(len(self.rows), dtype=bool)
+            mask[rows] = True
+            return mask
+
+        return self._bitsets.get_or_compute(self._cache_key("", {filtro: valor}), compute)
+
+    def bm25(self) -> BM25Index:
+        """The BM25 index of the ``campos_relevancia``, built on first use."""
+        if self._bm25 is None:
+            with self._lock:
+                if self._bm25 is None:
+                    self._bm25 = BM25Index(self._textos)
+                    self._textos = []
+        return self._bm25
+
+    def ranked(self, query: str, filtros: Optional[dict] = None, k: int = 20) -> np.ndarray:
+        """Row numbers of the ``k`` best BM25 matches, best first."""
+        def compute() -> np.ndarray:
+            mask = None
+            for filtro, valor in (filtros or {}).items():
+                if not valor:
+                    continue
+                bitset = self._bitset(filtro, valor)
+                if bitset is not None:
+                    mask = bitset if mask is None else mask & bitset
+            return self.bm25().top_k(query, k, mask)[0]
+
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(("bm25", k) + self._cache_key((query or "").lower(), filtros), compute)
+
+    def iter_ranked(
+        self,
+        query: str,
+        filtros: Optional[dict] = None,
+        after: int = -1,
+        limit: int = 20,
+        fields: Optional[List[str]] = None,
+    ) -> Iterator[Tuple[int, Dict]]:
+        """Yield ``(rank, row)`` for ranks ``after + 1 .. after + limit``."""
+        selected = self.ranked(query, filtros, after + 1 + limit)
+        for rank in range(after + 1, len(selected)):
+            row = self.rows[selected[rank]]
+            if fields is not None:
+                row = {field: row.get(field) for field in fields}
+            yield rank, row
+
+    def _cache_key(self, q: str, filtros: Optional[dict]) -> Tuple:
+        """Normalised query: lower-cased text and sorted, canonical filters."""
+        canonical = []
+        for filtro, valor in (filtros or {}).items():
+            if not valor:
+                continue
+            if filtro in self.filtros_exactos:
+                canonical.append((filtro, str(valor).strip()))
+            else:
+                canonical.append((filtro, str(valor).lower()))
+        return (q, tuple(sorted(canonical)))
+
+    def matches(self, query: str, filtros: Optional[dict] = None) -> np.ndarray:
+        """Sorted row numbers matching ``query`` and every filter."""
+        q = (query or "").lower()
+        if self.cache is None:
+            return self._matches(q, filtros)
+        return self.cache.get_or_compute(self._cache_key(q, filtros), lambda: self._matches(q, filtros))
+
+    def search(self, query: str, filtros: Optional[dict] = None) -> List[Dict]:
+        """Return the rows matching ``query`` and every filter, in file order."""
+        return [self.rows[n] for n in self.matches(query, filtros)]
+
+    def iter_search(
+        self,
+        query: str,
+        filtros: Optional[dict] = None,
+        after: int = -1,
+        fields: Optional[List[str]] = None,
+    ) -> Iterator[Tuple[int, Dict]]:
+        """Yield ``(row number, row)`` of the matches after row ``after``.
+
+        ``fields`` limits each row to those keys (projection).
+        """
+        selected = self.matches(query, filtros)
+        for n in selected[np.searchsorted(selected, after, side="right"):]:
+            row = self.rows[n]
+            if fields is not None:
+                row = {field: row.get(field) for field in fields}
+            yield int(n), row
+
+    def _matches(self, q: str, filtros: Optional[dict]) -> np.ndarray:
+        selected = self._match_query(q)
+        for filtro, valor in (filtros or {}).items():
+            if not valor:
+                continue
+            rows = self._match_filter(filtro, valor)
+            if rows is None:
+                continue
+            selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+        if selected is None:
+            return np.arange(len(self.rows), dtype=np.int32)
+        return selected
+
+
+class CsvIndexRegistry:
+    """Builds each category's :class:`CsvSearchIndex` once and reuses it.
+
+    An index is rebuilt only when the CSV file's ``mtime``/size change.
+    """
+
+    def __init__(self) -> None:
+        self._indexes: Dict[str, Tuple[Tuple[int, int], CsvSearchIndex]] = {}
+        self._lock = threading.Lock()
+
+    def indexes(self) -> List[CsvSearchIndex]:
+        return [index for _, index in self._indexes.values()]
+
+    def caches(self) -> List[QueryCache]:
+        return [index.cache for index in self.indexes() if index.cache is not None]
+
+    def get(
+        self,
+        path: str,
+        campos: List[str],
+        filtros: Dict[str, str],
+        filtros_exactos: Iterable[str] = (),
+        proyeccion: Optional[Dict[str, str]] = None,
+        campos_relevancia: Optional[List[str]] = None,
+    ) -> CsvSearchIndex:
+        st = os.stat(path)
+        signature = (st.st_mtime_ns, st.st_size)
+        cached = self._indexes.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with self._lock:
+            cached = self._indexes.get(path)
+            if cached is None or cached[0] != signature:
+                cached = (
+                    signature,
+                    CsvSearchIndex(
+                        path, campos, filtros, filtros_exactos, proyeccion,
+                        campos_relevancia=campos_relevancia,
+                    ),
+                )
+                self._indexes[path] = cached
+        return cached[1]
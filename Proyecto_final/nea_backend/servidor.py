@@ -0,0 +1,125 @@
+"""Pre-fork launcher of the NEA API (POSIX only).
+
+``uvicorn main:app --workers N`` starts N independent interpreters, each one
+opening the catalog and loading (or, on a new catalog, fitting) the
+recommender by itself.  This script does that work once, in a master
+process, and then forks the workers:
+
+* the catalog (``entertainment_db.col``) and the recommender artifacts are
+  memory-mapped read-only files, so after the fork every worker reads the
+  same physical pages: memory and startup cost do not grow with N;
+* workers share one listening socket;
+* workers never poll the catalog.  The master does, and when the file
+  changes it loads the new catalog and prepares its artifacts (fit or delta
+  update, neighbour lists) first; only then it sends ``SIGUSR1`` to every
+  worker, which switch to the new, already prepared files at their next
+  request.  A worker that dies is replaced.
+
+Recommendations are scored in threads of each worker (``NEA_PROCESOS=0``),
+since the workers are already separate processes.
+
+Usage:
+    python servidor.py --workers 4 --port 8000
+"""
+
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Servidor pre-fork del backend NEA")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--check-interval", type=float, default=1.0,
+                        help="segundos entre revisiones del catálogo")
+    return parser.parse_args()
+
+
+def main() -> None:
+    if not hasattr(os, "fork"):
+        sys.exit("[ERROR] servidor.py necesita os.fork(); usa uvicorn main:app en este sistema")
+    args = parse_args()
+    os.environ["NEA_PREFORK"] = "1"
+    os.environ.setdefault("NEA_PROCESOS", "0")
+
+    import uvicorn
+
+    # El maestro carga el catálogo y el recomendador antes de crear los workers
+    import main as api
+
+    def prepare() -> None:
+        # Con el candado del bundle: si import_datasets.py u otro proceso ya
+        # guardó los vecinos, se cargan en vez de recalcularlos
+        rec = api.recomendador
+        if rec is not None:
+            rec.ensure_neighbours()
+
+    prepare()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    workers = set()
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            # Solo marca la recarga; se hace en la siguiente petición
+            signal.signal(signal.SIGUSR1, lambda *_: api.catalogo.request_reload())
+            uvicorn.Server(uvicorn.Config(api.app)).run(sockets=[sock])
+            os._exit(0)
+        workers.add(pid)
+
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for _ in range(args.workers):
+        spawn()
+    print(f"[OK] {args.workers} workers escuchando en http://{args.host}:{args.port}")
+
+    while not stopping:
+        time.sleep(args.check_interval)
+        # Reemplaza los workers que terminaron
+        while workers:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            workers.discard(pid)
+            if not stopping:
+                print(f"[ADVERTENCIA] El worker {pid} terminó; se inicia otro")
+                spawn()
+        # Recarga coordinada: el maestro prepara todo y luego avisa a los workers
+        if api.catalogo.reload():
+            prepare()
+            print("[INFO] Catálogo nuevo listo; avisando a los workers")
+            for pid in workers:
+                os.kill(pid, signal.SIGUSR1)
+
+    for pid in workers:
+        os.kill(pid, signal.SIGTERM)
+    for pid in workers:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+
+
+if __name__ == "__main__":
+    main()
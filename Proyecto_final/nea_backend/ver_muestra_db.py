@@ -1,14 +1,17 @@
 import json
 import os
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "entertainment_db.json")
+from catalog import load_catalog
 
-with open(DB_PATH, "r", encoding="utf-8") as f:
-    db = json.load(f)
+DB_PATH = os.path.join(os.path.dirname(__file__), "entertainment_db.col")
+
+# El catálogo columnar se abre con memory-map: contar o leer un elemento no
+# obliga a cargar toda la base
+db, _ = load_catalog(DB_PATH)
 
 for categoria in db:
     print(f"{categoria}: {len(db[categoria])} elementos")
     print("Primer elemento:")
     if db[categoria]:
-        print(json.dumps(db[categoria][0], ensure_ascii=False, indent=2))
+        print(json.dumps(dict(db[categoria][0]), ensure_ascii=False, indent=2))
     print("-")